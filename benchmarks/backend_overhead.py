@@ -0,0 +1,59 @@
+"""
+Measures the per-invitation overhead of resolving the invitation backend.
+
+Compares resolving the backend the way ``invitation_backend()`` used to, by
+importing and instantiating the backend class and introspecting
+``create_user`` on every call, against the cached backend.
+
+Run from the repository root:
+
+    python benchmarks/backend_overhead.py [--number N]
+"""
+
+import argparse
+import inspect
+import os
+import sys
+import timeit
+from importlib import import_module
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "src")]
+
+
+def uncached():
+    from organizations.app_settings import ORGS_INVITATION_BACKEND
+
+    class_module, class_name = ORGS_INVITATION_BACKEND.rsplit(".", 1)
+    backend = getattr(import_module(class_module), class_name)()
+    return (
+        "username"
+        in inspect.getfullargspec(backend.user_model.objects.create_user).args
+    )
+
+
+def cached():
+    from organizations.backends import invitation_backend
+    from organizations.backends.defaults import create_user_takes_username
+
+    backend = invitation_backend()
+    return create_user_takes_username(backend.user_model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=20000)
+    number = parser.parse_args().number
+
+    from conftest import pytest_configure
+
+    pytest_configure()
+
+    for name, func in (("uncached", uncached), ("cached", cached)):
+        func()
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print("{0:>9}: {1:8.2f} us per invitation".format(name, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
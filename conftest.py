@@ -14,7 +14,14 @@ def pytest_configure():
         DEBUG=True,
         USE_TZ=True,
         DATABASES={
-            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": "test.sqlite3"}
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": "test.sqlite3",
+                # A file-backed test database, so that tests may exercise
+                # concurrent connections from multiple threads.
+                "TEST": {"NAME": "test_organizations.sqlite3"},
+                "OPTIONS": {"timeout": 20},
+            }
         },
         DEFAULT_AUTO_FIELD="django.db.models.AutoField",
         INSTALLED_APPS=[
@@ -39,6 +46,7 @@ def pytest_configure():
             "django.middleware.common.CommonMiddleware",
             "django.middleware.csrf.CsrfViewMiddleware",
             "django.contrib.auth.middleware.AuthenticationMiddleware",
+            "organizations.middleware.OrganizationRolesMiddleware",
             "django.contrib.messages.middleware.MessageMiddleware",
             "django.middleware.clickjacking.XFrameOptionsMiddleware",
         ],
@@ -1,23 +1,49 @@
 from django.conf import settings
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
 from django.urls import reverse
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
+from asgiref.sync import sync_to_async
+
 from organizations.base import AbstractBaseInvitation
 from organizations.base import AbstractBaseOrganization
 from organizations.base import AbstractBaseOrganizationOwner
 from organizations.base import AbstractBaseOrganizationUser
 from organizations.base import OrgMeta
 from organizations.base import with_metaclass
+from organizations.counters import refresh_counters
+from organizations.counters import update_counters
+from organizations.dispatch import ADDED
+from organizations.dispatch import OWNER_CHANGED
+from organizations.dispatch import REMOVED
+from organizations.dispatch import Change
+from organizations.dispatch import anotify
+from organizations.dispatch import notify
 from organizations.fields import AutoCreatedField
 from organizations.fields import AutoLastModifiedField
+from organizations.fields import CounterField
 from organizations.fields import SlugField
-from organizations.signals import owner_changed
-from organizations.signals import user_added
-from organizations.signals import user_removed
+from organizations.registry import registry
+from organizations.roles import roles_for
 
 USER_MODEL = getattr(settings, "AUTH_USER_MODEL", "auth.User")
 
+# Attempts made to insert an organization whose generated slug is taken by a
+# concurrent insert
+SLUG_INSERT_ATTEMPTS = 3
+
+
+def _atomic_call(using, func, *args, **kwargs):
+    """
+    Calls the function within a transaction on the ``using`` database, for
+    use with sync_to_async
+    """
+    with transaction.atomic(using=using):
+        return func(*args, **kwargs)
+
 
 class SharedBaseModel(models.Model):
     """
@@ -31,25 +57,33 @@ class SharedBaseModel(models.Model):
 
     @property
     def _org_user_model(self):
-        model = self.__class__.module_registry[self.__class__.__module__][
-            "OrgUserModel"
-        ]
-        if model is None:
-            model = self.__class__.module_registry["organizations.models"][
-                "OrgUserModel"
-            ]
-        return model
+        return registry.family(self.__class__).organization_user
 
     @property
     def _org_owner_model(self):
-        model = self.__class__.module_registry[self.__class__.__module__][
-            "OrgOwnerModel"
-        ]
-        if model is None:
-            model = self.__class__.module_registry["organizations.models"][
-                "OrgOwnerModel"
-            ]
-        return model
+        return registry.family(self.__class__).owner
+
+    class Meta:
+        abstract = True
+
+
+class MembershipCountersMixin(models.Model):
+    """
+    Adds denormalized member, admin, and pending invitation counters to an
+    organization model extending ``AbstractOrganization``, e.g.
+    ``class Team(AbstractOrganization, MembershipCountersMixin)``.
+
+    The counters are kept up to date with F-expression updates as members
+    and invitations are added, changed, and deleted, including by cascades
+    and queryset deletes. Changes which bypass the models (e.g. raw SQL or
+    ``QuerySet.update``) are not counted; the ``rebuild_org_counters``
+    command recomputes the counters from the membership and invitation
+    tables, which are the source of truth.
+    """
+
+    member_count = CounterField()
+    admin_count = CounterField()
+    pending_invitation_count = CounterField()
 
     class Meta:
         abstract = True
@@ -79,48 +113,228 @@ class AbstractOrganization(
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Extends the default save method so that new organizations are
+        inserted within a savepoint, so that the insert can be retried with a
+        new slug if a concurrent insert took its slug.
+        """
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        # A concurrent insert may take the generated slug between it being
+        # found free and this insert; if so, generate another and retry.
+        for attempt in range(SLUG_INSERT_ATTEMPTS):
+            try:
+                with transaction.atomic(using=kwargs.get("using")):
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if attempt == SLUG_INSERT_ATTEMPTS - 1 or not self._slug_taken():
+                    raise
+                # Fall back to probing for a slug, one candidate at a time
+                self._slug_probe = True
+
+    def _slug_taken(self):
+        return (
+            type(self)
+            ._base_manager.using(self._state.db)
+            .filter(slug=self.slug)
+            .exists()
+        )
+
     def get_absolute_url(self):
         return reverse("organization_detail", kwargs={"organization_pk": self.pk})
 
-    def add_user(self, user, is_admin=False):
+    def _lock_for_membership_change(self):
         """
-        Adds a new user and if the first user makes the user an admin and
-        the owner.
+        Locks the organization row for the rest of the transaction so that
+        concurrent membership changes to the organization are serialized.
+
+        Backends without ``SELECT ... FOR UPDATE`` (SQLite) already serialize
+        writers, provided the transaction's first statement is a write, which
+        is why the membership row is inserted before the first-member check.
         """
-        users_count = self.users.all().count()
-        if users_count == 0:
-            is_admin = True
-        # TODO get specific org user?
+        using = self._state.db
+        if transaction.get_connection(using).features.has_select_for_update:
+            list(
+                type(self)
+                ._base_manager.using(using)
+                .select_for_update()
+                .filter(pk=self.pk)
+                .values_list("pk", flat=True)
+            )
+
+    def _create_org_user(self, user, is_admin=False):
+        """
+        Inserts the organization user and, if it is the organization's first
+        member, makes it an admin and the owner.
+
+        Must be called within a transaction. Issues a constant number of
+        statements regardless of the size of the organization.
+        """
+        self._lock_for_membership_change()
         org_user = self._org_user_model.objects.create(
             user=user, organization=self, is_admin=is_admin
         )
-        if users_count == 0:
-            # TODO get specific org user?
+        if not self.organization_users.exclude(pk=org_user.pk).exists():
+            if not org_user.is_admin:
+                org_user.is_admin = True
+                org_user.save(update_fields=["is_admin"])
             self._org_owner_model.objects.create(
                 organization=self, organization_user=org_user
             )
+        return org_user
+
+    def _get_or_create_org_user(self, user, is_admin):
+        """
+        Returns a tuple of the organization user and whether it was created.
+
+        The insert is attempted first, rather than looking the member up, so
+        that concurrent calls are decided by the unique constraint.
+        """
+        try:
+            with transaction.atomic(using=self._state.db):
+                return self._create_org_user(user, is_admin), True
+        except IntegrityError:
+            org_user = self._org_user_model.objects.filter(
+                organization=self, user=user
+            ).first()
+            if org_user is None:
+                raise
+            return org_user, False
+
+    def add_user(self, user, is_admin=False):
+        """
+        Adds a new user and if the first user makes the user an admin and
+        the owner.
+        """
+        with transaction.atomic(using=self._state.db):
+            org_user = self._create_org_user(user, is_admin)
 
         # User added signal
-        user_added.send(sender=self, user=user)
+        notify(Change(ADDED, self, [user], [org_user]))
         return org_user
 
     async def aadd_user(self, user, is_admin=False):
         """Async version of ``add_user``."""
-        users_count = await self.users.acount()
-        if users_count == 0:
-            is_admin = True
-        org_user = await self._org_user_model.objects.acreate(
-            user=user, organization=self, is_admin=is_admin
+        org_user = await sync_to_async(_atomic_call)(
+            self._state.db, self._create_org_user, user, is_admin
         )
-        if users_count == 0:
-            await self._org_owner_model.objects.acreate(
-                organization=self, organization_user=org_user
-            )
 
         # User added signal
-        await user_added.asend(sender=self, user=user)
+        await anotify(Change(ADDED, self, [user], [org_user]))
         return org_user
 
+    def _create_org_users(self, users, is_admin):
+        """
+        Inserts organization users for those of the users who are not yet
+        members, with a constant number of statements, and returns the new
+        organization users.
+
+        If the organization has no members the first of the users is added as
+        the owner, as with ``add_user``. Must be called within a transaction.
+        """
+        users = list({user.pk: user for user in users}.values())
+        if not users:
+            return []
+        self._lock_for_membership_change()
+        existing = set(
+            self.organization_users.filter(
+                user_id__in=[user.pk for user in users]
+            ).values_list("user_id", flat=True)
+        )
+        new_users = [user for user in users if user.pk not in existing]
+        if not new_users:
+            return []
+        if not existing and not self.organization_users.exists():
+            self._create_org_user(new_users[0], is_admin)
+        self._org_user_model.objects.bulk_create(
+            [
+                self._org_user_model(user=user, organization=self, is_admin=is_admin)
+                for user in new_users
+            ],
+            ignore_conflicts=True,
+        )
+        # The bulk insert bypasses ``save`` and may have skipped rows added
+        # concurrently, so the counters are recomputed rather than adjusted.
+        refresh_counters(self._org_user_model, [self.pk])
+        return list(
+            self.organization_users.filter(
+                user_id__in=[user.pk for user in new_users]
+            ).select_related("user")
+        )
+
+    def add_users(self, users, is_admin=False):
+        """
+        Adds the users who are not already members with a single bulk insert,
+        and returns the new organization users.
+
+        If the organization has no members, the first user becomes an admin
+        and the owner.
+        """
+        with transaction.atomic(using=self._state.db):
+            org_users = self._create_org_users(users, is_admin)
+
+        # User added signals
+        notify(Change(ADDED, self, [ou.user for ou in org_users], org_users))
+        return org_users
+
+    async def aadd_users(self, users, is_admin=False):
+        """Async version of ``add_users``."""
+        org_users = await sync_to_async(_atomic_call)(
+            self._state.db, self._create_org_users, users, is_admin
+        )
+
+        # User added signals
+        await anotify(Change(ADDED, self, [ou.user for ou in org_users], org_users))
+        return org_users
+
+    def _delete_org_users(self, users):
+        """
+        Deletes the organization users for the users with a single set-based
+        delete and returns the deleted organization users.
+
+        Raises ``OwnershipRequired`` if the owner is among the users. Must be
+        called within a transaction.
+        """
+        users = {user.pk: user for user in users}
+        if not users:
+            return []
+        self._lock_for_membership_change()
+        org_users = self.organization_users.filter(user_id__in=list(users))
+        removed = list(org_users)
+        org_users.delete()
+        for org_user in removed:
+            org_user.user = users[org_user.user_id]
+        return removed
+
+    def remove_users(self, users):
+        """
+        Removes the users from the organization with a single set-based
+        delete. The owner cannot be removed; ``OwnershipRequired`` is raised
+        and no users are removed if the owner is included.
+        """
+        with transaction.atomic(using=self._state.db):
+            org_users = self._delete_org_users(users)
+
+        removed = [org_user.user for org_user in org_users]
+        # User removed signals
+        notify(Change(REMOVED, self, removed, org_users))
+        return removed
+
+    async def aremove_users(self, users):
+        """Async version of ``remove_users``."""
+        org_users = await sync_to_async(_atomic_call)(
+            self._state.db, self._delete_org_users, users
+        )
+
+        removed = [org_user.user for org_user in org_users]
+        # User removed signals
+        await anotify(Change(REMOVED, self, removed, org_users))
+        return removed
+
     def remove_user(self, user):
         """
         Deletes a user from an organization.
@@ -129,7 +343,7 @@ class AbstractOrganization(
         org_user.delete()
 
         # User removed signal
-        user_removed.send(sender=self, user=user)
+        notify(Change(REMOVED, self, [user], [org_user]))
 
     async def aremove_user(self, user):
         """
@@ -139,13 +353,13 @@ class AbstractOrganization(
         await org_user.adelete()
 
         # User removed signal
-        await user_removed.asend(sender=self, user=user)
+        await anotify(Change(REMOVED, self, [user], [org_user]))
 
     def get_or_add_user(self, user, **kwargs):
         """
         Adds a new user to the organization, and if it's the first user makes
-        the user an admin and the owner. Uses the `get_or_create` method to
-        create or return the existing user.
+        the user an admin and the owner. Like the `get_or_create` method, it
+        creates or returns the existing user.
 
         `user` should be a user instance, e.g. `auth.User`.
 
@@ -154,20 +368,11 @@ class AbstractOrganization(
         OrganizationUser was created or not.
         """
         is_admin = kwargs.pop("is_admin", False)
-        users_count = self.users.all().count()
-        if users_count == 0:
-            is_admin = True
-
-        org_user, created = self._org_user_model.objects.get_or_create(
-            organization=self, user=user, defaults={"is_admin": is_admin}
-        )
-        if users_count == 0:
-            self._org_owner_model.objects.create(
-                organization=self, organization_user=org_user
-            )
+        with transaction.atomic(using=self._state.db):
+            org_user, created = self._get_or_create_org_user(user, is_admin)
         if created:
             # User added signal
-            user_added.send(sender=self, user=user)
+            notify(Change(ADDED, self, [user], [org_user]))
         return org_user, created
 
     async def aget_or_add_user(self, user, **kwargs):
@@ -175,20 +380,12 @@ class AbstractOrganization(
         Async version of ``get_or_add_user``.
         """
         is_admin = kwargs.pop("is_admin", False)
-        users_count = await self.users.acount()
-        if users_count == 0:
-            is_admin = True
-
-        org_user, created = await self._org_user_model.objects.aget_or_create(
-            organization=self, user=user, defaults={"is_admin": is_admin}
+        org_user, created = await sync_to_async(_atomic_call)(
+            self._state.db, self._get_or_create_org_user, user, is_admin
         )
-        if users_count == 0:
-            await self._org_owner_model.objects.acreate(
-                organization=self, organization_user=org_user
-            )
         if created:
             # User added signal
-            await user_added.asend(sender=self, user=user)
+            await anotify(Change(ADDED, self, [user], [org_user]))
         return org_user, created
 
     def change_owner(self, new_owner):
@@ -200,7 +397,7 @@ class AbstractOrganization(
         self.owner.save()
 
         # Owner changed signal
-        owner_changed.send(sender=self, old=old_owner, new=new_owner)
+        notify(Change(OWNER_CHANGED, self, [], [old_owner, new_owner]))
 
     async def achange_owner(self, new_owner):
         """Async version of ``change_owner``."""
@@ -214,32 +411,48 @@ class AbstractOrganization(
         await owner.asave()
 
         # Owner changed signal
-        await owner_changed.asend(sender=self, old=old_owner, new=new_owner)
+        await anotify(Change(OWNER_CHANGED, self, [], [old_owner, new_owner]))
 
     def is_admin(self, user):
         """
         Returns True is user is an admin in the organization, otherwise false
         """
-        return (
-            True if self.organization_users.filter(user=user, is_admin=True) else False
-        )
+        if getattr(user, "pk", None) is None:
+            return False
+        roles = roles_for(user)
+        if roles is not None:
+            return roles.is_admin(self)
+        return self.organization_users.filter(user_id=user.pk, is_admin=True).exists()
 
     async def ais_admin(self, user):
         """
         Async version of ``is_admin``.
         """
-        return await self.organization_users.filter(user=user, is_admin=True).aexists()
+        if getattr(user, "pk", None) is None:
+            return False
+        roles = roles_for(user)
+        if roles is not None:
+            return await roles.ais_admin(self)
+        return await self.organization_users.filter(
+            user_id=user.pk, is_admin=True
+        ).aexists()
 
     def is_owner(self, user):
         """
         Returns True is user is the organization's owner, otherwise false
         """
+        roles = roles_for(user)
+        if roles is not None:
+            return roles.is_owner(self)
         return self.owner.organization_user.user == user
 
     async def ais_owner(self, user):
         """
         Async version of ``is_owner``.
         """
+        roles = roles_for(user)
+        if roles is not None:
+            return await roles.ais_owner(self)
         owner = await self._org_owner_model.objects.select_related(
             "organization_user"
         ).aget(organization=self)
@@ -260,6 +473,53 @@ class AbstractOrganizationUser(
         verbose_name = _("organization user")
         verbose_name_plural = _("organization users")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Track the stored admin status for maintaining the admin counter
+        if "is_admin" in field_names:
+            instance._loaded_is_admin = instance.is_admin
+        return instance
+
+    @property
+    def _org_model(self):
+        return registry.family(self.__class__).organization
+
+    def save(self, *args, **kwargs):
+        """
+        Extends the default save method by keeping the organization's member
+        and admin counters up to date.
+        """
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        previous = getattr(self, "_loaded_is_admin", None)
+        if (
+            not adding
+            and previous is None
+            and (update_fields is None or "is_admin" in update_fields)
+        ):
+            previous = (
+                type(self)
+                ._base_manager.filter(pk=self.pk)
+                .values_list("is_admin", flat=True)
+                .first()
+            )
+        super().save(*args, **kwargs)
+        if adding:
+            update_counters(
+                self._org_model,
+                self.organization_id,
+                member_count=1,
+                admin_count=1 if self.is_admin else 0,
+            )
+        elif previous is not None and previous != self.is_admin:
+            update_counters(
+                self._org_model,
+                self.organization_id,
+                admin_count=1 if self.is_admin else -1,
+            )
+        self._loaded_is_admin = self.is_admin
+
     def __str__(self):
         return "{0} ({1})".format(
             self.name if self.user.is_active else self.user.email,
@@ -335,5 +595,44 @@ class AbstractOrganizationInvitation(
     Abstract OrganizationInvitationBase model
     """
 
-    class Meta:
+    class Meta(AbstractBaseInvitation.Meta):
         abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Track whether the stored invitation is pending for maintaining the
+        # organization's pending invitation counter
+        if "invitee_id" in field_names:
+            instance._loaded_pending = instance.invitee_id is None
+        return instance
+
+    def save(self, **kwargs):
+        """
+        Extends the default save method by keeping the organization's pending
+        invitation counter up to date.
+        """
+        adding = self._state.adding
+        was_pending = getattr(self, "_loaded_pending", None)
+        super().save(**kwargs)
+        is_pending = self.invitee_id is None
+        org_model = registry.family(self.__class__).organization
+        if adding and is_pending:
+            update_counters(org_model, self.organization_id, pending_invitation_count=1)
+        elif was_pending is not None and was_pending != is_pending:
+            update_counters(
+                org_model,
+                self.organization_id,
+                pending_invitation_count=1 if is_pending else -1,
+            )
+        self._loaded_pending = is_pending
+
+    def _claim(self, user, **updates):
+        """
+        Extends the claim by updating the modification time and the
+        organization's pending invitation counter.
+        """
+        super()._claim(user, modified=now(), **updates)
+        org_model = registry.family(self.__class__).organization
+        update_counters(org_model, self.organization_id, pending_invitation_count=-1)
+        self._loaded_pending = False
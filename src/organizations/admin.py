@@ -29,3 +29,9 @@ class OrganizationOwnerAdmin(BaseOrganizationOwnerAdmin):
 @admin.register(models.OrganizationInvitation)
 class OrganizationInvitationAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(models.OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ["subject", "created", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["sent_at"]
@@ -5,3 +5,26 @@ class OrganizationsConfig(AppConfig):
     name = "organizations"
     verbose_name = "Organizations"
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from organizations.registry import registry
+
+        registry.build()
+
+        # Model signal receivers are connected by sender, so that saves and
+        # deletes of other models neither run them nor lose fast deletes
+        from organizations import cache
+        from organizations import counters
+        from organizations import roles
+
+        roles.connect_model_signals()
+        cache.connect_model_signals()
+        counters.connect_model_signals()
+
+        # Imports and instantiates the default backends now rather than on
+        # the first request which needs them.
+        from organizations.backends import invitation_backend
+        from organizations.backends import registration_backend
+
+        invitation_backend()
+        registration_backend()
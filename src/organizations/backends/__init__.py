@@ -1,3 +1,4 @@
+import threading
 from importlib import import_module
 from typing import Optional  # noqa
 from typing import Text  # noqa
@@ -6,12 +7,41 @@ from organizations.app_settings import ORGS_INVITATION_BACKEND
 from organizations.app_settings import ORGS_REGISTRATION_BACKEND
 from organizations.backends.defaults import BaseBackend  # noqa
 
+# Backend instances hold no per-request state, so one instance per class path
+# and URL namespace is shared by all callers (and threads).
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def _get_backend(backend, namespace):
+    # type: (Text, Optional[Text]) -> BaseBackend
+    key = (backend, namespace)
+    try:
+        return _backends[key]
+    except KeyError:
+        pass
+    with _backends_lock:
+        if key not in _backends:
+            class_module, class_name = backend.rsplit(".", 1)
+            mod = import_module(class_module)
+            _backends[key] = getattr(mod, class_name)(namespace=namespace)
+        return _backends[key]
+
+
+def clear_backend_cache():
+    """Discards the cached backend instances"""
+    with _backends_lock:
+        _backends.clear()
+
 
 def invitation_backend(backend=None, namespace=None):
     # type: (Optional[Text], Optional[Text]) -> BaseBackend
     """
     Returns a specified invitation backend
 
+    The backend is instantiated on first use and the same instance is returned
+    for subsequent calls with the same backend and namespace.
+
     Args:
         backend: dotted path to the invitation backend class
         namespace: URL namespace to use
@@ -20,10 +50,7 @@ def invitation_backend(backend=None, namespace=None):
         an instance of an InvitationBackend
 
     """
-    backend = backend or ORGS_INVITATION_BACKEND
-    class_module, class_name = backend.rsplit(".", 1)
-    mod = import_module(class_module)
-    return getattr(mod, class_name)(namespace=namespace)
+    return _get_backend(backend or ORGS_INVITATION_BACKEND, namespace)
 
 
 def registration_backend(backend=None, namespace=None):
@@ -31,6 +58,9 @@ def registration_backend(backend=None, namespace=None):
     """
     Returns a specified registration backend
 
+    The backend is instantiated on first use and the same instance is returned
+    for subsequent calls with the same backend and namespace.
+
     Args:
         backend: dotted path to the registration backend class
         namespace: URL namespace to use
@@ -39,7 +69,4 @@ def registration_backend(backend=None, namespace=None):
         an instance of an RegistrationBackend
 
     """
-    backend = backend or ORGS_REGISTRATION_BACKEND
-    class_module, class_name = backend.rsplit(".", 1)
-    mod = import_module(class_module)
-    return getattr(mod, class_name)(namespace=namespace)
+    return _get_backend(backend or ORGS_REGISTRATION_BACKEND, namespace)
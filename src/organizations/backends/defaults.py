@@ -1,8 +1,11 @@
 """Backend classes should provide common interface"""
 
+import contextvars
 import email.utils
+import functools
 import inspect
 import uuid
+from datetime import timedelta
 from typing import ClassVar  # noqa
 from typing import Optional  # noqa
 from typing import Text  # noqa
@@ -12,6 +15,7 @@ from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 from django.contrib.auth import login
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core import signing
 from django.core.mail import EmailMessage
 from django.http import Http404
 from django.shortcuts import redirect
@@ -19,9 +23,14 @@ from django.shortcuts import render
 from django.template import loader
 from django.urls import path
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.crypto import get_random_string
 from django.utils.translation import gettext as _
 
+from asgiref.sync import sync_to_async
+
+from organizations import outbox
+from organizations import tokens
 from organizations.backends.forms import UserRegistrationForm
 from organizations.backends.forms import org_registration_form
 from organizations.utils import create_organization
@@ -43,6 +52,20 @@ def make_random_password(
     return get_random_string(length, allowed_chars)
 
 
+# The email messages of a view run by `BaseBackend.arun_view`, which are sent
+# once the view returns
+_view_messages = contextvars.ContextVar("view_messages", default=None)
+
+
+@functools.lru_cache(maxsize=None)
+def create_user_takes_username(user_model):
+    """
+    Returns True if the user model's `create_user` manager method takes a
+    `username` argument. Cached per user model.
+    """
+    return "username" in inspect.getfullargspec(user_model.objects.create_user).args
+
+
 class BaseBackend:
     """
     Base backend class for registering and inviting users to an organization
@@ -56,6 +79,7 @@ class BaseBackend:
         self.user_model = get_user_model()
         self.org_model = org_model or default_org_model()
         self.namespace = namespace
+        self._templates = {}
 
     def namespace_preface(self):
         return "" if not self.namespace else "{}:".format(self.namespace)
@@ -74,8 +98,46 @@ class BaseBackend:
         return self.form_class(**kwargs)
 
     def get_token(self, user, **kwargs):
-        """Returns a unique token for the given user"""
-        return PasswordResetTokenGenerator().make_token(user)
+        """
+        Returns a unique token for the given user
+
+        With `ORGS_SIGNED_INVITATION_LINKS` enabled the token is signed, and
+        carries the user's and the `organization` keyword argument's primary
+        keys and an expiry time, so that `activate_view` can reject bad links
+        without querying the database.
+        """
+        token = PasswordResetTokenGenerator().make_token(user)
+        if not tokens.signed_links_enabled():
+            return token
+        organization = kwargs.get("organization")
+        expiry = getattr(settings, "ORGS_INVITATION_EXPIRY", None)
+        if expiry is None:
+            expiry = settings.PASSWORD_RESET_TIMEOUT
+        return tokens.make_token(
+            tokens.USER,
+            user.pk,
+            getattr(organization, "pk", None),
+            expires=timezone.now() + timedelta(seconds=expiry),
+            value=token,
+        )
+
+    def check_token(self, user_id, token):
+        """
+        Returns the one-time token carried by a signed token, or the token
+        itself when links are not signed
+
+        Raises Http404 for a signed token which is invalid, has expired, or
+        is for another user, without querying the database.
+        """
+        if not tokens.signed_links_enabled():
+            return token
+        try:
+            signed = tokens.read_token(tokens.USER, token)
+        except signing.BadSignature:
+            raise Http404(_("Your URL may have expired."))
+        if str(signed.pk) != str(user_id):
+            raise Http404(_("Your URL may have expired."))
+        return signed.value
 
     def get_username(self):
         """
@@ -111,6 +173,7 @@ class BaseBackend:
         View function that activates the given User by setting `is_active` to
         true if the provided information is verified.
         """
+        token = self.check_token(user_id, token)
         try:
             user = self.user_model.objects.get(id=user_id, is_active=False)
         except self.user_model.DoesNotExist:
@@ -137,15 +200,108 @@ class BaseBackend:
             return redirect(self.get_success_url())
         return render(request, self.registration_form_template, {"form": form, **(extra_context or {})})
 
-    def send_reminder(self, user, sender=None, **kwargs):
-        """Sends a reminder email to the specified user"""
+    def reminder_message(self, user, sender=None, **kwargs):
+        """
+        Returns the reminder email message for the user, or None if the user
+        is already active
+        """
         if user.is_active:
-            return False
-        token = PasswordResetTokenGenerator().make_token(user)
+            return None
+        token = self.get_token(user, **kwargs)
         kwargs.update({"token": token})
         return self.email_message(
             user, self.reminder_subject, self.reminder_body, sender, **kwargs
-        ).send()
+        )
+
+    def send_reminder(self, user, sender=None, **kwargs):
+        """Sends a reminder email to the specified user"""
+        message = self.reminder_message(user, sender, **kwargs)
+        if message is None:
+            return False
+        return self.send_messages([message])
+
+    def send_reminders(self, users, sender=None, **kwargs):
+        """
+        Sends reminder emails to the inactive users among `users` over a
+        single email connection. Returns the number of messages sent.
+        """
+        return self.send_messages(
+            self._build_messages(self.reminder_message, users, sender, **kwargs)
+        )
+
+    def send_messages(self, messages):
+        """
+        Sends the email messages, skipping any which are None, through one
+        email connection, or stores them in the outbox when
+        `ORGS_EMAIL_OUTBOX` is enabled. Returns the number of messages sent.
+        """
+        collected = _view_messages.get()
+        if collected is not None:
+            messages = [message for message in messages if message is not None]
+            collected.extend(messages)
+            return len(messages)
+        return outbox.send_messages(messages)
+
+    async def asend_messages(self, messages):
+        """
+        Async version of `send_messages`. The messages are sent from a
+        separate thread, or stored in the outbox with the async ORM.
+        """
+        return await outbox.asend_messages(messages)
+
+    async def asend_reminder(self, user, sender=None, **kwargs):
+        """Async version of `send_reminder`."""
+        message = await sync_to_async(self.reminder_message)(user, sender, **kwargs)
+        if message is None:
+            return False
+        return await self.asend_messages([message])
+
+    async def asend_reminders(self, users, sender=None, **kwargs):
+        """Async version of `send_reminders`."""
+        return await self.asend_messages(
+            await sync_to_async(self._build_messages)(
+                self.reminder_message, users, sender, **kwargs
+            )
+        )
+
+    def _build_messages(self, build, recipients, *args, **kwargs):
+        return [build(recipient, *args, **kwargs) for recipient in recipients]
+
+    async def arun_view(self, view, request, *args, **kwargs):
+        """
+        Runs a synchronous backend view in a thread and returns its response,
+        sending the email messages the view produced once it has returned so
+        that the view's thread is not held up by the email transport.
+        """
+        messages = []
+        token = _view_messages.set(messages)
+        try:
+            response = await sync_to_async(view)(request, *args, **kwargs)
+        finally:
+            _view_messages.reset(token)
+        await self.asend_messages(messages)
+        return response
+
+    async def aactivate_view(self, request, user_id, token, extra_context=None):
+        """Async version of `activate_view`."""
+        return await self.arun_view(
+            self.activate_view, request, user_id, token, extra_context
+        )
+
+    def get_template(self, template_name):
+        """
+        Returns the compiled template. Templates are loaded once per backend
+        instance, or on every call when DEBUG is on so that template changes
+        are picked up.
+        """
+        if settings.DEBUG:
+            return loader.get_template(template_name)
+        try:
+            return self._templates[template_name]
+        except KeyError:
+            return self._templates.setdefault(
+                template_name, loader.get_template(template_name)
+            )
 
     def email_message(
         self,
@@ -178,8 +334,8 @@ class BaseBackend:
         headers = {"Reply-To": reply_to}
         kwargs.update({"sender": sender, "user": user})
 
-        subject_template = loader.get_template(subject_template)
-        body_template = loader.get_template(body_template)
+        subject_template = self.get_template(subject_template)
+        body_template = self.get_template(body_template)
         subject = subject_template.render(
             kwargs
         ).strip()  # Remove stray newline characters
@@ -237,17 +393,53 @@ class RegistrationBackend(BaseBackend):
         self.send_activation(user, sender, **kwargs)
         return user
 
-    def send_activation(self, user, sender=None, **kwargs):
+    async def aregister_by_email(self, email, sender=None, request=None, **kwargs):
+        """Async version of `register_by_email`."""
+        try:
+            user = await self.user_model.objects.aget(email=email)
+        except self.user_model.DoesNotExist:
+            user = await self.user_model.objects.acreate(
+                username=self.get_username(),
+                email=email,
+                password=make_random_password(),
+            )
+            user.is_active = False
+            await user.asave()
+        await self.asend_activation(user, sender, **kwargs)
+        return user
+
+    def activation_message(self, user, sender=None, **kwargs):
         """
-        Invites a user to join the site
+        Returns the activation email message for the user, or None if the
+        user is already active
         """
         if user.is_active:
-            return False
-        token = self.get_token(user)
+            return None
+        token = self.get_token(user, **kwargs)
         kwargs.update({"token": token})
         return self.email_message(
             user, self.activation_subject, self.activation_body, sender, **kwargs
-        ).send()
+        )
+
+    def send_activation(self, user, sender=None, **kwargs):
+        """
+        Invites a user to join the site
+        """
+        message = self.activation_message(user, sender, **kwargs)
+        if message is None:
+            return False
+        return self.send_messages([message])
+
+    async def asend_activation(self, user, sender=None, **kwargs):
+        """Async version of `send_activation`."""
+        message = await sync_to_async(self.activation_message)(user, sender, **kwargs)
+        if message is None:
+            return False
+        return await self.asend_messages([message])
+
+    async def acreate_view(self, request, extra_context=None):
+        """Async version of `create_view`."""
+        return await self.arun_view(self.create_view, request, extra_context)
 
     def create_view(self, request, extra_context=None):
         """
@@ -325,10 +517,7 @@ class InvitationBackend(BaseBackend):
             user = self.user_model.objects.get(email=email)
         except self.user_model.DoesNotExist:
             # TODO break out user creation process
-            if (
-                "username"
-                in inspect.getfullargspec(self.user_model.objects.create_user).args
-            ):
+            if create_user_takes_username(self.user_model):
                 user = self.user_model.objects.create(
                     username=self.get_username(),
                     email=email,
@@ -343,18 +532,83 @@ class InvitationBackend(BaseBackend):
         self.send_invitation(user, sender, **kwargs)
         return user
 
+    async def ainvite_by_email(self, email, sender=None, request=None, **kwargs):
+        """Async version of `invite_by_email`."""
+        try:
+            user = await self.user_model.objects.aget(email=email)
+        except self.user_model.DoesNotExist:
+            if create_user_takes_username(self.user_model):
+                user = await self.user_model.objects.acreate(
+                    username=self.get_username(),
+                    email=email,
+                    password=make_random_password(),
+                )
+            else:
+                user = await self.user_model.objects.acreate(
+                    email=email, password=make_random_password()
+                )
+            user.is_active = False
+            await user.asave()
+        await self.asend_invitation(user, sender, **kwargs)
+        return user
+
+    def invitation_message(self, user, sender=None, **kwargs):
+        """
+        Returns the invitation email message for the user, or None if the
+        user has already joined the site
+        """
+        if user.is_active:
+            return None
+        token = self.get_token(user, **kwargs)
+        kwargs.update({"token": token})
+        return self.email_message(
+            user, self.invitation_subject, self.invitation_body, sender, **kwargs
+        )
+
     def send_invitation(self, user, sender=None, **kwargs):
         """An intermediary function for sending an invitation email that
         selects the templates, generating the token, and ensuring that the user
         has not already joined the site.
         """
-        if user.is_active:
+        message = self.invitation_message(user, sender, **kwargs)
+        if message is None:
             return False
-        token = self.get_token(user)
-        kwargs.update({"token": token})
+        return self.send_messages([message])
+
+    def send_invitations(self, users, sender=None, **kwargs):
+        """
+        Sends invitation emails to the users who have not yet joined the site
+        over a single email connection. Returns the number of messages sent.
+        """
+        return self.send_messages(
+            self._build_messages(self.invitation_message, users, sender, **kwargs)
+        )
+
+    async def asend_invitation(self, user, sender=None, **kwargs):
+        """Async version of `send_invitation`."""
+        message = await sync_to_async(self.invitation_message)(user, sender, **kwargs)
+        if message is None:
+            return False
+        return await self.asend_messages([message])
+
+    async def asend_invitations(self, users, sender=None, **kwargs):
+        """Async version of `send_invitations`."""
+        return await self.asend_messages(
+            await sync_to_async(self._build_messages)(
+                self.invitation_message, users, sender, **kwargs
+            )
+        )
+
+    def notification_message(self, user, sender=None, **kwargs):
+        """
+        Returns the notification email message for the user, or None if the
+        user has not yet joined the site
+        """
+        if not user.is_active:
+            return None
         return self.email_message(
-            user, self.invitation_subject, self.invitation_body, sender, **kwargs
-        ).send()
+            user, self.notification_subject, self.notification_body, sender, **kwargs
+        )
 
     def send_notification(self, user, sender=None, **kwargs):
         """
@@ -362,8 +616,16 @@ class InvitationBackend(BaseBackend):
         a pre-existing, active user that they have been added to a new
         organization.
         """
-        if not user.is_active:
+        message = self.notification_message(user, sender, **kwargs)
+        if message is None:
             return False
-        return self.email_message(
-            user, self.notification_subject, self.notification_body, sender, **kwargs
-        ).send()
+        return self.send_messages([message])
+
+    async def asend_notification(self, user, sender=None, **kwargs):
+        """Async version of `send_notification`."""
+        message = await sync_to_async(self.notification_message)(
+            user, sender, **kwargs
+        )
+        if message is None:
+            return False
+        return await self.asend_messages([message])
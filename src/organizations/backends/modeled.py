@@ -3,6 +3,7 @@ Invitations that use an invitation model
 """
 
 import email.utils
+from collections import namedtuple
 from typing import List  # noqa
 from typing import Optional  # noqa
 from typing import Text  # noqa
@@ -10,21 +11,54 @@ from typing import Tuple  # noqa
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser  # noqa
+from django.core import signing
 from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.http import Http404
 from django.http import HttpRequest  # noqa
 from django.http import HttpResponse  # noqa
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
-from django.template import loader
 from django.urls import path
+from django.urls import resolve
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from asgiref.sync import sync_to_async
+
+from organizations import tokens
 from organizations.backends.defaults import InvitationBackend
 from organizations.backends.forms import UserRegistrationForm
 from organizations.base import AbstractBaseOrganization  # noqa
 from organizations.base import OrganizationInvitationBase  # noqa
+from organizations.counters import refresh_counters
+from organizations.exceptions import InvitationAlreadyAccepted
+from organizations.invitations import aaccept_pending_invitations
+from organizations.invitations import accept_pending_invitations
+from organizations.invitations import default_expires_at
+from organizations.invitations import identifier_key
+from organizations.invitations import normalize_identifier
+from organizations.invitations import pending_invitations
+from organizations.invitations import unexpired
+from organizations.invitations import user_identifier
+from organizations.registry import registry
+
+# The result of `ModelInvitation.invite_many`: the new invitations, and the
+# addresses skipped because they belong to members or have pending invitations
+BulkInvitation = namedtuple("BulkInvitation", ["invitations", "members", "invited"])
+
+
+def normalize_emails(emails):
+    """Returns the stripped, lowercased, distinct addresses in order"""
+    return list(
+        dict.fromkeys(
+            normalize_identifier(address) for address in emails if address.strip()
+        )
+    )
 
 
 class ModelInvitation(InvitationBackend):
@@ -42,14 +76,33 @@ class ModelInvitation(InvitationBackend):
 
     def __init__(self, org_model=None, namespace=None):
         super().__init__(org_model=org_model, namespace=namespace)
-        self.invitation_model = self.org_model.invitation_model  # type: OrganizationInvitationBase  # noqa: E501
+        self.invitation_model = registry.family(self.org_model).invitation  # type: OrganizationInvitationBase  # noqa: E501
 
     def get_invitation_queryset(self):
         """Return available invitations.
 
-        Use a custom queryset that checks for expiration, for example.
+        Excludes invitations whose `expires_at` has passed. Override this for
+        further conditions.
+        """
+        return self.invitation_model.objects.filter(unexpired())
+
+    def get_pending_invitations(self, user):
+        """Returns the user's pending invitations to any organization"""
+        return pending_invitations(self.invitation_model, user_identifier(user))
+
+    def accept_pending_invitations(self, user):
+        """
+        Accepts all of the user's pending invitations, e.g. when they sign up
+        or log in, and returns the new organization users.
+
+        The memberships are inserted, and the invitations updated, in bulk in
+        a single transaction.
         """
-        return self.invitation_model.objects.all()
+        return accept_pending_invitations(self.invitation_model, user)
+
+    async def aaccept_pending_invitations(self, user):
+        """Async version of `accept_pending_invitations`."""
+        return await aaccept_pending_invitations(self.invitation_model, user)
 
     def get_invitation_accepted_url(self):
         """Returns the redirect URL after user accepts invitation"""
@@ -61,7 +114,44 @@ class ModelInvitation(InvitationBackend):
 
     def activation_router(self, request, guid):
         """"""
-        invitation = get_object_or_404(self.get_invitation_queryset(), guid=guid)
+        invitation = get_object_or_404(
+            self.get_invitation_queryset().select_related(
+                "organization", "invited_by", "invitee"
+            ),
+            guid=guid,
+        )
+        return self.route_invitation(request, invitation)
+
+    async def aactivation_router(self, request, guid):
+        """Async version of `activation_router`."""
+        return await self.arun_view(self.activation_router, request, guid)
+
+    def token_activation_router(self, request, token):
+        """
+        Routes a signed invitation link (see `get_invitation_url`)
+
+        Invalid and expired tokens are rejected before any database query;
+        the invitation of a valid token is loaded by its primary key.
+        """
+        try:
+            signed = tokens.read_token(tokens.INVITATION, token)
+        except signing.BadSignature:
+            raise Http404(_("Your URL may have expired."))
+        invitation = get_object_or_404(
+            self.get_invitation_queryset().select_related(
+                "organization", "invited_by", "invitee"
+            ),
+            pk=signed.pk,
+            organization_id=signed.organization_pk,
+        )
+        return self.route_invitation(request, invitation)
+
+    async def atoken_activation_router(self, request, token):
+        """Async version of `token_activation_router`."""
+        return await self.arun_view(self.token_activation_router, request, token)
+
+    def route_invitation(self, request, invitation):
+        """Returns the response for a user following the invitation's link"""
         if invitation.invitee:
             return redirect(self.get_invitation_accepted_url())
 
@@ -70,13 +160,35 @@ class ModelInvitation(InvitationBackend):
         else:
             return self.activate_new_user_view(request, invitation)
 
+    def get_invitation_url(self, invitation):
+        """
+        Returns the path of the invitation's link: its `get_absolute_url`,
+        or with `ORGS_SIGNED_INVITATION_LINKS` enabled the same URL pattern's
+        signed token alternative, which carries the invitation's and the
+        organization's primary keys and the invitation's expiry. Unsaved
+        invitations, which have no primary key to sign, keep the GUID link.
+        """
+        url = invitation.get_absolute_url()
+        if not tokens.signed_links_enabled() or invitation.pk is None:
+            return url
+        token = tokens.make_token(
+            tokens.INVITATION,
+            invitation.pk,
+            invitation.organization_id,
+            expires=invitation.expires_at,
+        )
+        return reverse(resolve(url).view_name, kwargs={"token": token})
+
     def activate_existing_user_view(self, request, invitation):
         # type: (HttpRequest, OrganizationInvitationBase) -> HttpResponse
         """"""
         if request.user == invitation.invited_by:
             return HttpResponseForbidden(_("This is not your invitation"))
         if request.method == "POST":
-            invitation.activate(request.user)
+            try:
+                invitation.activate(request.user)
+            except InvitationAlreadyAccepted:
+                pass
             return redirect(self.get_invitation_accepted_url())
         return render(
             request, self.invitation_join_template, {"invitation": invitation}
@@ -87,8 +199,14 @@ class ModelInvitation(InvitationBackend):
         """"""
         form = self.get_form(data=request.POST or None)
         if request.method == "POST" and form.is_valid():
-            new_user = form.save()  # type: AbstractUser
-            invitation.activate(new_user)
+            try:
+                # The new user is not kept if the invitation was accepted
+                # concurrently
+                with transaction.atomic():
+                    new_user = form.save()  # type: AbstractUser
+                    invitation.activate(new_user)
+            except InvitationAlreadyAccepted:
+                return redirect(self.get_invitation_accepted_url())
             return redirect(self.get_invitation_accepted_registered_url())
         return render(
             request,
@@ -101,7 +219,12 @@ class ModelInvitation(InvitationBackend):
         return [
             path(
                 "<uuid:guid>/", view=self.activation_router, name="invitations_register"
-            )
+            ),
+            path(
+                "<str:token>/",
+                view=self.token_activation_router,
+                name="invitations_register",
+            ),
         ]
 
     @property
@@ -113,6 +236,12 @@ class ModelInvitation(InvitationBackend):
         """
         Primary interface method by which one user invites another to join
 
+        Inviting an address which already has a pending invitation to the
+        organization refreshes that invitation (its inviter and expiry) and
+        sends it again, rather than creating another. Concurrent invitations
+        for the same address are resolved by the unique constraint on the
+        invitation's `invitee_key`.
+
         Args:
             email:
             request:
@@ -132,14 +261,174 @@ class ModelInvitation(InvitationBackend):
         #     invitee = None
 
         # TODO allow sending just the OrganizationUser instance
-        user_invitation = self.invitation_model.objects.create(
-            invitee_identifier=email.lower(),
-            invited_by=user,
-            organization=organization,
+        user_invitation, _created = self.invitation_model.objects.update_or_create(
+            **self.invitation_lookup(email, organization),
+            defaults=self.invitation_defaults(email, user),
         )
         self.send_invitation(user_invitation)
         return user_invitation
 
+    async def ainvite_by_email(self, email, user, organization, **kwargs):
+        """Async version of `invite_by_email`."""
+        manager = self.invitation_model.objects
+        user_invitation, _created = await manager.aupdate_or_create(
+            **self.invitation_lookup(email, organization),
+            defaults=self.invitation_defaults(email, user),
+        )
+        await self.asend_invitation(user_invitation)
+        return user_invitation
+
+    def invitation_lookup(self, email, organization):
+        """Returns the filter for a pending invitation of the address"""
+        return {
+            "organization": organization,
+            "invitee_key": identifier_key(email),
+            "invitee__isnull": True,
+        }
+
+    def invitation_defaults(self, email, user):
+        """Returns the values set on a new or refreshed invitation"""
+        return {
+            "invitee_identifier": normalize_identifier(email),
+            "invited_by": user,
+            "expires_at": default_expires_at(),
+            "last_sent_at": timezone.now(),
+        }
+
+    def create_invitations(self, emails, user, organization):
+        """
+        Creates pending invitations to the organization for the addresses
+        which belong neither to a member nor to a pending invitation, with
+        one query for each check and a single insert, and returns a
+        `BulkInvitation` without sending any email.
+
+        Addresses invited concurrently, whose inserts conflict, are returned
+        as already invited rather than as new invitations.
+        """
+        emails = normalize_emails(emails)
+        email_field = self.user_model.get_email_field_name()
+        members = set(
+            organization.users.annotate(email_lower=Lower(email_field))
+            .filter(email_lower__in=emails)
+            .values_list("email_lower", flat=True)
+        )
+        keys = {address: identifier_key(address) for address in emails}
+        invited_keys = set(
+            self.invitation_model._base_manager.filter(
+                organization=organization,
+                invitee__isnull=True,
+                invitee_key__in=keys.values(),
+            ).values_list("invitee_key", flat=True)
+        )
+        invited = {address for address in emails if keys[address] in invited_keys}
+        invitations = [
+            self.invitation_model(
+                invitee_identifier=address,
+                invitee_key=keys[address],
+                invited_by=user,
+                organization=organization,
+            )
+            for address in emails
+            if address not in members and address not in invited
+        ]
+        created = self.insert_invitations(invitations, organization)
+        # Addresses invited concurrently since the check are skipped
+        invited.update(
+            {invitation.invitee_identifier for invitation in invitations}
+            - {invitation.invitee_identifier for invitation in created}
+        )
+        return BulkInvitation(
+            created,
+            [address for address in emails if address in members],
+            [address for address in emails if address in invited],
+        )
+
+    def insert_invitations(self, invitations, organization):
+        """
+        Bulk inserts the new invitations to the organization and returns
+        those inserted, with their primary keys, skipping any which conflict
+        with invitations created concurrently.
+        """
+        if not invitations:
+            return []
+        manager = self.invitation_model._base_manager
+        with transaction.atomic():
+            manager.bulk_create(invitations, ignore_conflicts=True)
+            # Conflicting inserts leave no primary key to tell them by, so
+            # the inserted rows are found by their GUIDs
+            pks = dict(
+                manager.filter(
+                    guid__in=[invitation.guid for invitation in invitations]
+                ).values_list("guid", "pk")
+            )
+            # Bulk inserts bypass the invitation model's counter updates
+            refresh_counters(
+                registry.family(self.invitation_model).organization_user,
+                {organization.pk},
+            )
+        created = []
+        for invitation in invitations:
+            if invitation.guid in pks:
+                invitation.pk = pks[invitation.guid]
+                invitation._state.adding = False
+                created.append(invitation)
+        return created
+
+    def invite_many(self, emails, user, organization, **kwargs):
+        """
+        Invites each of the email addresses to join the organization
+
+        Addresses are compared case-insensitively. Members of the
+        organization, addresses with a pending invitation, and repeated
+        addresses are skipped. The invitation messages are sent over a single
+        email connection.
+
+        Args:
+            emails: an iterable of email addresses
+            user: the inviting user
+            organization: the organization to join
+            **kwargs: extra context for the invitation templates
+
+        Returns:
+            a `BulkInvitation` of the new invitations and the addresses
+            skipped as members or as already invited
+
+        """
+        result = self.create_invitations(emails, user, organization)
+        kwargs.setdefault("organization", organization)
+        self.send_invitations(result.invitations, **kwargs)
+        return result
+
+    async def ainvite_many(self, emails, user, organization, **kwargs):
+        """Async version of `invite_many`."""
+        result = await sync_to_async(self.create_invitations)(
+            emails, user, organization
+        )
+        kwargs.setdefault("organization", organization)
+        await self.asend_invitations(result.invitations, **kwargs)
+        return result
+
+    def invitation_message(self, invitation, **kwargs):
+        """
+        Returns the invitation email message for a specific invitation.
+
+        Args:
+            invitation:
+
+        Returns:
+            an email message
+
+        """
+        if tokens.signed_links_enabled():
+            kwargs.setdefault("invitation", self.get_invitation_url(invitation))
+        return self.email_message(
+            invitation.invitee_identifier,
+            self.invitation_subject,
+            self.invitation_body,
+            invitation.invited_by,
+            **kwargs,
+        )
+
     def send_invitation(self, invitation, **kwargs):
         """
         Sends an invitation message for a specific invitation.
@@ -153,13 +442,75 @@ class ModelInvitation(InvitationBackend):
         Returns:
 
         """
+        return self.send_messages([self.invitation_message(invitation, **kwargs)])
+
+    async def asend_invitation(self, invitation, **kwargs):
+        """Async version of `send_invitation`."""
+        message = await sync_to_async(self.invitation_message)(invitation, **kwargs)
+        return await self.asend_messages([message])
+
+    def send_invitations(self, invitations, **kwargs):
+        """
+        Sends the invitation messages for the invitations over a single email
+        connection.
+
+        Args:
+            invitations: an iterable of invitation instances
+
+        Returns:
+            the number of messages sent
+
+        """
+        return self.send_messages(
+            self._build_messages(self.invitation_message, invitations, **kwargs)
+        )
+
+    async def asend_invitations(self, invitations, **kwargs):
+        """Async version of `send_invitations`."""
+        return await self.asend_messages(
+            await sync_to_async(self._build_messages)(
+                self.invitation_message, invitations, **kwargs
+            )
+        )
+
+    def invitation_reminder_message(self, invitation, **kwargs):
+        """
+        Returns the reminder email message for a pending invitation.
+
+        Args:
+            invitation:
+
+        Returns:
+            an email message
+
+        """
+        kwargs.setdefault("organization", invitation.organization)
+        kwargs.setdefault("invitation", self.get_invitation_url(invitation))
         return self.email_message(
             invitation.invitee_identifier,
-            self.invitation_subject,
-            self.invitation_body,
+            self.reminder_subject,
+            self.reminder_body,
             invitation.invited_by,
             **kwargs,
-        ).send()
+        )
+
+    def send_invitation_reminders(self, invitations, **kwargs):
+        """
+        Sends reminder messages for the invitations over a single email
+        connection.
+
+        Args:
+            invitations: an iterable of invitation instances
+
+        Returns:
+            the number of messages sent
+
+        """
+        return self.send_messages(
+            self._build_messages(
+                self.invitation_reminder_message, invitations, **kwargs
+            )
+        )
 
     def email_message(
         self,
@@ -185,8 +536,8 @@ class ModelInvitation(InvitationBackend):
         headers = {"Reply-To": reply_to}
         kwargs.update({"sender": sender, "recipient": recipient})
 
-        subject_template = loader.get_template(subject_template)
-        body_template = loader.get_template(body_template)
+        subject_template = self.get_template(subject_template)
+        body_template = self.get_template(body_template)
 
         subject = subject_template.render(
             kwargs
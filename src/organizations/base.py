@@ -1,15 +1,27 @@
-import uuid
-
 from django.conf import settings
 from django.core.exceptions import FieldDoesNotExist
 from django.db import models
+from django.db import transaction
 from django.db.models.base import ModelBase
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from organizations import signals
+from asgiref.sync import sync_to_async
+
+from organizations.dispatch import ADDED
+from organizations.dispatch import Change
+from organizations.dispatch import anotify
+from organizations.dispatch import notify
+from organizations.exceptions import InvitationAlreadyAccepted
+from organizations.guids import new_guid
+from organizations.invitations import default_expires_at
+from organizations.invitations import identifier_key
 from organizations.managers import ActiveOrgManager
+from organizations.managers import OrganizationUserManager
 from organizations.managers import OrgManager
+from organizations.registry import registry
+from organizations.roles import roles_for
 
 USER_MODEL = getattr(settings, "AUTH_USER_MODEL", "auth.User")
 
@@ -235,13 +247,31 @@ class AbstractBaseOrganization(models.Model):
         )
 
     def is_member(self, user):
-        return True if user in self.users.all() else False
+        """
+        Returns True if the user is a member of the organization, otherwise
+        false.
+
+        This is a single EXISTS query against the indexed ``(user,
+        organization)`` pair rather than loading the organization's users, or
+        no query at all when the request's role resolver is available.
+        """
+        if getattr(user, "pk", None) is None:
+            return False
+        roles = roles_for(user)
+        if roles is not None:
+            return roles.is_member(self)
+        return self.organization_users.filter(user_id=user.pk).exists()
 
     async def ais_member(self, user):
         """
         Async version of ``is_member``.
         """
-        return await self.users.filter(pk=user.pk).aexists()
+        if getattr(user, "pk", None) is None:
+            return False
+        roles = roles_for(user)
+        if roles is not None:
+            return await roles.ais_member(self)
+        return await self.organization_users.filter(user_id=user.pk).aexists()
 
 
 class OrganizationBase(with_metaclass(OrgMeta, AbstractBaseOrganization)):
@@ -250,13 +280,16 @@ class OrganizationBase(with_metaclass(OrgMeta, AbstractBaseOrganization)):
 
     @property
     def _org_user_model(self):
-        return self.__class__.module_registry[self.__class__.__module__]["OrgUserModel"]
+        return registry.family(self.__class__).organization_user
 
-    def add_user(self, user, **kwargs):
-        org_user = self._org_user_model.objects.create(
+    def _create_org_user(self, user, **kwargs):
+        return self._org_user_model.objects.create(
             user=user, organization=self, **kwargs
         )
-        signals.user_added.send(sender=self, user=user)
+
+    def add_user(self, user, **kwargs):
+        org_user = self._create_org_user(user, **kwargs)
+        notify(Change(ADDED, self, [user], [org_user]))
         return org_user
 
     async def aadd_user(self, user, **kwargs):
@@ -266,7 +299,7 @@ class OrganizationBase(with_metaclass(OrgMeta, AbstractBaseOrganization)):
         org_user = await self._org_user_model.objects.acreate(
             user=user, organization=self, **kwargs
         )
-        await signals.user_added.asend(sender=self, user=user)
+        await anotify(Change(ADDED, self, [user], [org_user]))
         return org_user
 
 
@@ -282,10 +315,21 @@ class AbstractBaseOrganizationUser(models.Model):
     and the contrib.auth application.
     """
 
+    last_reminded_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("When the user was last reminded of their invitation"),
+    )
+
+    objects = OrganizationUserManager()
+
     class Meta:
         abstract = True
         ordering = ["organization", "user"]
-        unique_together = ("user", "organization")
+        # Led by the organization, so that its index serves member lists
+        # ordered by user
+        unique_together = ("organization", "user")
 
     def __str__(self):
         return "{name} {org}".format(
@@ -336,7 +380,7 @@ class AbstractBaseInvitation(models.Model):
     are no longer members of the organization.
     """
 
-    guid = models.UUIDField(editable=False)
+    guid = models.UUIDField(default=new_guid, editable=False, unique=True)
     invitee_identifier = models.CharField(
         max_length=1000,
         help_text=_(
@@ -344,16 +388,51 @@ class AbstractBaseInvitation(models.Model):
             " social media handle, etc."
         ),
     )
+    invitee_key = models.CharField(
+        max_length=64,
+        null=True,
+        editable=False,
+        db_index=True,
+        help_text=_("A hash of the normalized invitee identifier"),
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=default_expires_at,
+        db_index=True,
+        help_text=_("The invitation cannot be accepted after this time"),
+    )
+    last_sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=timezone.now,
+        editable=False,
+        db_index=True,
+        help_text=_("When the invitation, or a reminder of it, was last sent"),
+    )
 
     class Meta:
         abstract = True
+        constraints = [
+            # An organization has at most one pending invitation for each
+            # invitee
+            models.UniqueConstraint(
+                fields=["organization", "invitee_key"],
+                condition=models.Q(invitee__isnull=True),
+                name="%(app_label)s_%(class)s_pending_invitee",
+            )
+        ]
 
     def __str__(self):
         return "{0}: {1}".format(self.organization, self.invitee_identifier)
 
     def save(self, **kwargs):
         if not self.guid:
-            self.guid = str(uuid.uuid4())
+            self.guid = new_guid()
+        # Invitations left without a key when duplicates were removed from
+        # the constraint keep it that way
+        if self._state.adding or self.invitee_key:
+            self.invitee_key = identifier_key(self.invitee_identifier)
         return super().save(**kwargs)
 
     def get_absolute_url(self):
@@ -366,7 +445,12 @@ class AbstractBaseInvitation(models.Model):
 
     def activate(self, user):
         """
-        Updates the `invitee` value and saves the instance
+        Claims the invitation for the user and adds them to the organization
+
+        The invitation is claimed with a single conditional update, which
+        only succeeds while the invitation is pending, and the membership is
+        created in the same transaction, so that an invitation is accepted
+        exactly once even by concurrent requests.
 
         Provided as a way of extending the behavior.
 
@@ -376,23 +460,47 @@ class AbstractBaseInvitation(models.Model):
         Returns:
             the linking organization user
 
+        Raises:
+            InvitationAlreadyAccepted if the invitation has been accepted
+
         """
-        org_user = self.organization.add_user(user, **self.activation_kwargs())
-        self.invitee = user
-        self.save()
-        return org_user
+        with transaction.atomic():
+            self._claim(user)
+            return self.organization.add_user(user, **self.activation_kwargs())
 
     async def aactivate(self, user):
-        """Async version of ``activate``."""
-        # Load the organization explicitly; the lazy ``self.organization``
-        # accessor would raise SynchronousOnlyOperation here.
-        org_model = self._meta.get_field("organization").related_model
-        organization = await org_model.objects.aget(pk=self.organization_id)
-        org_user = await organization.aadd_user(user, **self.activation_kwargs())
-        self.invitee = user
-        await self.asave()
+        """
+        Async version of ``activate``.
+
+        Only the claim and the membership insert, which must share a
+        transaction, run in a thread; the membership signals are sent from
+        the event loop.
+        """
+        org_user = await sync_to_async(self._claim_and_create)(user)
+        await anotify(Change(ADDED, self.organization, [user], [org_user]))
         return org_user
 
+    def _claim_and_create(self, user):
+        with transaction.atomic():
+            self._claim(user)
+            return self.organization._create_org_user(user, **self.activation_kwargs())
+
+    def _claim(self, user, **updates):
+        """
+        Sets the invitee of the pending invitation with a conditional update,
+        raising ``InvitationAlreadyAccepted`` if it is no longer pending
+        """
+        claimed = (
+            type(self)
+            ._base_manager.filter(pk=self.pk, invitee__isnull=True)
+            .update(invitee=user, **updates)
+        )
+        if not claimed:
+            raise InvitationAlreadyAccepted("The invitation has already been accepted")
+        self.invitee = user
+        for name, value in updates.items():
+            setattr(self, name, value)
+
     def invitation_token(self):
         """
         Returns a unique token for the user
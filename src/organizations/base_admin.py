@@ -1,4 +1,9 @@
 from django.contrib import admin
+from django.contrib import messages
+from django.contrib.admin import actions as admin_actions
+from django.utils.translation import gettext as _
+
+from organizations.exceptions import OwnershipRequired
 
 
 class BaseOwnerInline(admin.StackedInline):
@@ -12,9 +17,38 @@ class BaseOrganizationAdmin(admin.ModelAdmin):
     list_filter = ("is_active",)
 
 
+@admin.action(
+    permissions=["delete"],
+    description=admin_actions.delete_selected.short_description,
+)
+def delete_selected(modeladmin, request, queryset):
+    """
+    Replaces the admin's delete action for organization users, refusing a
+    selection which includes an organization's owner with a message
+    """
+    if queryset.owners().exists():
+        modeladmin.message_user(
+            request,
+            _(
+                "Cannot delete organization owner "
+                "before organization or transferring ownership."
+            ),
+            messages.ERROR,
+        )
+        return None
+    return admin_actions.delete_selected(modeladmin, request, queryset)
+
+
 class BaseOrganizationUserAdmin(admin.ModelAdmin):
     list_display = ["user", "organization", "is_admin"]
     raw_id_fields = ("user", "organization")
+    actions = [delete_selected]
+
+    def delete_queryset(self, request, queryset):
+        try:
+            super().delete_queryset(request, queryset)
+        except OwnershipRequired as e:
+            self.message_user(request, str(e), messages.ERROR)
 
 
 class BaseOrganizationOwnerAdmin(admin.ModelAdmin):
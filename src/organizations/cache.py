@@ -0,0 +1,229 @@
+"""
+Optional cross-request cache of users' organization memberships.
+
+When ``ORGS_MEMBERSHIP_CACHE`` names a configured cache alias, each user's
+memberships in an organization model family are stored in that cache as a
+single entry, and the membership, admin, and owner checks are answered from
+it instead of the database.
+
+Entries are keyed by a per-user *generation* which is bumped, rather than the
+entry deleted, whenever the user's memberships change. A reader that loaded
+stale rows concurrently with a change therefore writes them under a
+generation no one will read again.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from organizations.registry import registry
+from organizations.signals import owner_changed
+from organizations.signals import user_added
+from organizations.signals import user_removed
+
+# Bump when the structure of cached entries changes
+CACHE_SCHEMA_VERSION = 1
+
+
+class MembershipCache:
+    """Reads, writes, and invalidates cached membership entries"""
+
+    prefix = "orgs:memberships"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def alias(self):
+        return getattr(settings, "ORGS_MEMBERSHIP_CACHE", None)
+
+    @property
+    def enabled(self):
+        return bool(self.alias)
+
+    @property
+    def timeout(self):
+        return getattr(settings, "ORGS_MEMBERSHIP_CACHE_TIMEOUT", 300)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def stats(self):
+        """Returns the hit and miss counts since the last reset"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _label(self, org_user_model):
+        return org_user_model._meta.concrete_model._meta.label_lower
+
+    def _generation_key(self, org_user_model, user_pk):
+        return "{0}:gen:{1}:{2}".format(
+            self.prefix, self._label(org_user_model), user_pk
+        )
+
+    def _entry_key(self, org_user_model, user_pk, generation):
+        return "{0}:{1}:{2}:{3}:{4}".format(
+            self.prefix,
+            CACHE_SCHEMA_VERSION,
+            self._label(org_user_model),
+            user_pk,
+            generation,
+        )
+
+    @staticmethod
+    def _new_generation():
+        # Seeded from the clock so that an evicted generation counter can never
+        # be re-seeded to a value whose entries are still cached.
+        return time.time_ns()
+
+    def _generation(self, org_user_model, user_pk):
+        key = self._generation_key(org_user_model, user_pk)
+        generation = self.cache.get(key)
+        if generation is None:
+            self.cache.add(key, self._new_generation(), timeout=None)
+            generation = self.cache.get(key)
+        return generation
+
+    async def _ageneration(self, org_user_model, user_pk):
+        key = self._generation_key(org_user_model, user_pk)
+        generation = await self.cache.aget(key)
+        if generation is None:
+            await self.cache.aadd(key, self._new_generation(), timeout=None)
+            generation = await self.cache.aget(key)
+        return generation
+
+    def get_or_load(self, org_user_model, user_pk, loader):
+        """
+        Returns the cached memberships for the user, calling ``loader`` and
+        caching its result on a miss.
+        """
+        generation = self._generation(org_user_model, user_pk)
+        key = self._entry_key(org_user_model, user_pk, generation)
+        memberships = self.cache.get(key)
+        self._record(memberships is not None)
+        if memberships is None:
+            memberships = loader()
+            self.cache.set(key, memberships, timeout=self.timeout)
+        return memberships
+
+    async def aget_or_load(self, org_user_model, user_pk, loader):
+        """Async version of ``get_or_load``; ``loader`` must be awaitable."""
+        generation = await self._ageneration(org_user_model, user_pk)
+        key = self._entry_key(org_user_model, user_pk, generation)
+        memberships = await self.cache.aget(key)
+        self._record(memberships is not None)
+        if memberships is None:
+            memberships = await loader()
+            await self.cache.aset(key, memberships, timeout=self.timeout)
+        return memberships
+
+    def invalidate(self, org_user_model, user_pk):
+        """Retires the user's cached memberships in the model family"""
+        if not self.enabled or user_pk is None:
+            return
+        key = self._generation_key(org_user_model, user_pk)
+        self._bump(key)
+        # Bump again once the change is visible to other connections, in case
+        # another request cached the pre-change rows in the meantime.
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._bump(key))
+
+    def invalidate_users(self, org_user_model, org_users):
+        """
+        Retires the cached memberships of the organization users' users, for
+        changes made without the membership signals, such as bulk inserts
+        """
+        if not self.enabled:
+            return
+        for user_pk in {org_user.user_id for org_user in org_users}:
+            self.invalidate(org_user_model, user_pk)
+
+    def _bump(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, self._new_generation(), timeout=None)
+
+
+membership_cache = MembershipCache()
+
+
+def _invalidate_added_or_removed(sender, user, **kwargs):
+    if not membership_cache.enabled:
+        return
+    membership_cache.invalidate(
+        registry.family(type(sender)).organization_user, user.pk
+    )
+
+
+def _invalidate_owner_changed(sender, old, new, **kwargs):
+    if not membership_cache.enabled:
+        return
+    for org_user in (old, new):
+        membership_cache.invalidate(type(org_user), org_user.user_id)
+
+
+def _invalidate_on_model_change(sender, instance, **kwargs):
+    from organizations.base import AbstractBaseOrganizationOwner
+
+    if not membership_cache.enabled:
+        return
+    if isinstance(instance, AbstractBaseOrganizationOwner):
+        try:
+            instance = instance.organization_user
+        except ObjectDoesNotExist:
+            return
+    membership_cache.invalidate(type(instance), instance.user_id)
+
+
+def connect_model_signals():
+    """
+    Connects the receiver which invalidates cached memberships when an
+    organization user or owner is saved or deleted, by sender, to each
+    registered organization user and owner model if the cache is enabled,
+    and disconnects it otherwise. Called once the registry is built, and
+    again if ``ORGS_MEMBERSHIP_CACHE`` is changed.
+    """
+    for model in registry.membership_models():
+        for signal in (post_save, post_delete):
+            if membership_cache.enabled:
+                signal.connect(
+                    _invalidate_on_model_change,
+                    sender=model,
+                    dispatch_uid="orgs_cache_model_change",
+                )
+            else:
+                signal.disconnect(sender=model, dispatch_uid="orgs_cache_model_change")
+
+
+def _cache_setting_changed(setting, **kwargs):
+    if setting == "ORGS_MEMBERSHIP_CACHE":
+        connect_model_signals()
+
+
+user_added.connect(_invalidate_added_or_removed, dispatch_uid="orgs_cache_added")
+user_removed.connect(_invalidate_added_or_removed, dispatch_uid="orgs_cache_removed")
+owner_changed.connect(_invalidate_owner_changed, dispatch_uid="orgs_cache_owner")
+setting_changed.connect(_cache_setting_changed, dispatch_uid="orgs_cache_setting")
@@ -0,0 +1,157 @@
+"""
+Maintenance of the denormalized membership counters on organizations.
+
+Organization models which include ``MembershipCountersMixin`` carry
+``member_count``, ``admin_count``, and ``pending_invitation_count`` columns.
+These are kept up to date with F-expression updates as members and
+invitations are saved and deleted, and can be rebuilt from the membership
+and invitation tables with ``rebuild_counters`` (or the
+``rebuild_org_counters`` management command).
+"""
+
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import IntegerField
+from django.db.models import OuterRef
+from django.db.models import QuerySet
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+
+from organizations.registry import registry
+
+COUNTER_FIELDS = ("member_count", "admin_count", "pending_invitation_count")
+
+
+def has_counters(org_model):
+    """Returns True if the organization model has denormalized counters"""
+    return all(registry.has_field(org_model, name) for name in COUNTER_FIELDS)
+
+
+def update_counters(org_model, org_pk, **deltas):
+    """
+    Applies the deltas to the organization's counters with a single
+    F-expression update. Counters are never decremented below zero.
+
+    Does nothing if the organization model does not have the counter fields.
+    """
+    if not has_counters(org_model):
+        return
+    updates = {}
+    for field, delta in deltas.items():
+        if delta > 0:
+            updates[field] = F(field) + delta
+        elif delta < 0:
+            updates[field] = Greatest(F(field) + delta, Value(0))
+    if updates:
+        org_model._base_manager.filter(pk=org_pk).update(**updates)
+
+
+def _count_subquery(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.filter(organization=OuterRef("pk"))
+            .order_by()
+            .values("organization")
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def rebuild_counters(org_model, org_user_model, invitation_model=None, queryset=None):
+    """
+    Recomputes the counters for the organizations in ``queryset`` (default:
+    all organizations of the model) with a single set-based update.
+
+    Returns the number of organizations updated.
+    """
+    if queryset is None:
+        queryset = org_model._base_manager.all()
+    updates = {
+        "member_count": _count_subquery(org_user_model._base_manager.all()),
+        "admin_count": _count_subquery(
+            org_user_model._base_manager.filter(is_admin=True)
+        ),
+    }
+    if invitation_model is not None:
+        updates["pending_invitation_count"] = _count_subquery(
+            invitation_model._base_manager.filter(invitee__isnull=True)
+        )
+    return queryset.update(**updates)
+
+
+def refresh_counters(org_user_model, org_pks):
+    """
+    Recomputes the counters of the organizations with the given primary keys
+    in the organization user model's family, e.g. after bulk changes which
+    bypass ``save`` and ``delete``.
+    """
+    family = registry.family(org_user_model)
+    if not org_pks or not has_counters(family.organization):
+        return
+    rebuild_counters(
+        family.organization,
+        org_user_model,
+        family.invitation,
+        queryset=family.organization._base_manager.filter(pk__in=org_pks),
+    )
+
+
+def _deleting_organization(org_model, origin):
+    """Returns True if the delete was of organizations, not their members"""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, org_model)
+    return isinstance(origin, org_model)
+
+
+def _org_user_deleted(sender, instance, origin=None, **kwargs):
+    org_model = registry.family(sender).organization
+    if _deleting_organization(org_model, origin):
+        return
+    was_admin = getattr(instance, "_loaded_is_admin", instance.is_admin)
+    update_counters(
+        org_model,
+        instance.organization_id,
+        member_count=-1,
+        admin_count=-1 if was_admin else 0,
+    )
+
+
+def _invitation_deleted(sender, instance, origin=None, **kwargs):
+    org_model = registry.family(sender).organization
+    if _deleting_organization(org_model, origin):
+        return
+    if getattr(instance, "_loaded_pending", instance.invitee_id is None):
+        update_counters(
+            org_model, instance.organization_id, pending_invitation_count=-1
+        )
+
+
+def connect_model_signals():
+    """
+    Connects the receivers which decrement the counters when organization
+    users and invitations are deleted, whether directly, by a queryset, or
+    by a cascade, by sender to the models of each registered family whose
+    organization model has counters. Called once the registry is built.
+
+    Deletes cascading from the organization itself are not counted.
+    """
+    for family in registry.families():
+        if not has_counters(family.organization):
+            continue
+        post_delete.connect(
+            _org_user_deleted,
+            sender=family.organization_user,
+            dispatch_uid="organizations_counters_org_user",
+        )
+        if family.invitation is not None:
+            post_delete.connect(
+                _invitation_deleted,
+                sender=family.invitation,
+                dispatch_uid="organizations_counters_invitation",
+            )
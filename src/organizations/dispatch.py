@@ -0,0 +1,181 @@
+"""
+Dispatch of the membership change signals.
+
+By default a change is announced as soon as it is made: ``user_added`` or
+``user_removed`` is sent once per user, followed by a single ``users_added``
+or ``users_removed`` batch signal, and ``change_owner`` sends
+``owner_changed``.
+
+When ``ORGS_DEFER_SIGNALS`` is True the signals are instead queued and sent
+once the surrounding transaction commits, and never if it rolls back.
+Consecutive changes of the same kind to the same organization made within the
+transaction are coalesced into a single batch signal.
+"""
+
+import threading
+import weakref
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+
+from asgiref.sync import sync_to_async
+
+from organizations import signals
+from organizations.cache import membership_cache
+from organizations.roles import _clear_current_roles
+
+ADDED = "added"
+REMOVED = "removed"
+OWNER_CHANGED = "owner_changed"
+
+# For ADDED and REMOVED changes ``users`` and ``organization_users`` are
+# parallel lists; for OWNER_CHANGED ``organization_users`` is (old, new).
+Change = namedtuple("Change", ["kind", "organization", "users", "organization_users"])
+
+_SIGNALS = {
+    ADDED: (signals.user_added, signals.users_added),
+    REMOVED: (signals.user_removed, signals.users_removed),
+}
+
+
+def defer_signals():
+    return getattr(settings, "ORGS_DEFER_SIGNALS", False)
+
+
+def _coalesce(changes):
+    coalesced = []
+    for change in changes:
+        if coalesced:
+            last = coalesced[-1]
+            if (
+                change.kind != OWNER_CHANGED
+                and change.kind == last.kind
+                and type(change.organization) is type(last.organization)
+                and change.organization.pk == last.organization.pk
+            ):
+                coalesced[-1] = last._replace(
+                    users=last.users + change.users,
+                    organization_users=last.organization_users
+                    + change.organization_users,
+                )
+                continue
+        coalesced.append(change)
+    return coalesced
+
+
+def send_changes(changes):
+    """Sends the signals for the changes, coalescing consecutive changes"""
+    for change in _coalesce(changes):
+        organization = change.organization
+        if change.kind == OWNER_CHANGED:
+            old, new = change.organization_users
+            signals.owner_changed.send(sender=organization, old=old, new=new)
+            continue
+        user_signal, batch_signal = _SIGNALS[change.kind]
+        for user in change.users:
+            user_signal.send(sender=organization, user=user)
+        batch_signal.send(
+            sender=organization,
+            users=change.users,
+            organization_users=change.organization_users,
+        )
+
+
+async def asend_changes(changes):
+    """Async version of ``send_changes``."""
+    for change in _coalesce(changes):
+        organization = change.organization
+        if change.kind == OWNER_CHANGED:
+            old, new = change.organization_users
+            await signals.owner_changed.asend(sender=organization, old=old, new=new)
+            continue
+        user_signal, batch_signal = _SIGNALS[change.kind]
+        for user in change.users:
+            await user_signal.asend(sender=organization, user=user)
+        await batch_signal.asend(
+            sender=organization,
+            users=change.users,
+            organization_users=change.organization_users,
+        )
+
+
+# Weak references to each thread's deferred changes callbacks waiting to run,
+# by database alias, in the order they were registered. Callbacks discarded by
+# a rollback are released by the connection, and so drop out.
+_queued = threading.local()
+
+
+def _queued_callbacks(using):
+    queued = getattr(_queued, "callbacks", None)
+    if queued is None:
+        queued = _queued.callbacks = {}
+    return queued.setdefault(using, [])
+
+
+class DeferredChanges:
+    """
+    An ``on_commit`` callback which sends the signals for its changes.
+
+    If further deferred changes are waiting to run, the changes are handed to
+    the next of them instead, so that all of a transaction's changes are sent
+    together by the last callback.
+    """
+
+    def __init__(self, using, changes):
+        self.using = using
+        self.changes = list(changes)
+
+    def register(self):
+        queued = _queued_callbacks(self.using)
+        queued[:] = [ref for ref in queued if ref() is not None]
+        queued.append(weakref.ref(self))
+        transaction.on_commit(self, using=self.using)
+
+    def __call__(self):
+        queued = _queued_callbacks(self.using)
+        position = next((i for i, ref in enumerate(queued) if ref() is self), None)
+        if position is not None:
+            # Callbacks run in the order they were registered, so any
+            # registered before this one were discarded
+            del queued[: position + 1]
+            queued[:] = [ref for ref in queued if ref() is not None]
+            if queued:
+                queued[0]().changes[:0] = self.changes
+                return
+        send_changes(self.changes)
+
+
+def _forget_memberships(change):
+    # The cache and role receivers only run when the deferred signals are
+    # sent, and bulk inserts send no ``post_save``, so discard the changed
+    # users' memberships now for reads made later in the transaction.
+    _clear_current_roles(change.organization)
+    for org_user in change.organization_users:
+        membership_cache.invalidate(type(org_user), org_user.user_id)
+
+
+def _defer(change):
+    using = change.organization._state.db
+    _forget_memberships(change)
+    DeferredChanges(using, [change]).register()
+
+
+def notify(change):
+    """Sends, or when deferral is enabled queues, the signals for a change"""
+    if change.kind != OWNER_CHANGED and not change.users:
+        return
+    if defer_signals():
+        _defer(change)
+    else:
+        send_changes([change])
+
+
+async def anotify(change):
+    """Async version of ``notify``."""
+    if change.kind != OWNER_CHANGED and not change.users:
+        return
+    if defer_signals():
+        await sync_to_async(_defer)(change)
+    else:
+        await asend_changes([change])
@@ -14,3 +14,12 @@ class OrganizationMismatch(Exception):
     """
 
     pass
+
+
+class InvitationAlreadyAccepted(Exception):
+    """
+    Exception to raise if an invitation being accepted has already been
+    accepted, e.g. by a concurrent request.
+    """
+
+    pass
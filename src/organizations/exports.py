@@ -0,0 +1,90 @@
+"""
+Streaming export of organizations and their memberships, owners, and
+invitations.
+
+Rows are read with ``values()`` projections through ``QuerySet.iterator``, so
+no model instances are built and, on backends supporting server-side cursors,
+no table is held in memory.
+"""
+
+from organizations.registry import registry
+from organizations.utils import default_org_model
+
+RECORD_TYPES = ("organization", "organization_user", "owner", "invitation")
+
+
+def _field_names(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def export_querysets(org_model=None, active=None):
+    """
+    Returns a list of ``(record_type, model, queryset)`` tuples for the
+    organizations of the model, optionally only the active or inactive ones,
+    and their organization users, owners, and invitations.
+    """
+    org_model = org_model or default_org_model()
+    family = registry.family(org_model)
+    org_user_model, org_owner_model = family.organization_user, family.owner
+    invitation_model = family.invitation
+
+    organizations = org_model._base_manager.all()
+    if active is not None:
+        organizations = organizations.filter(is_active=active)
+    querysets = [
+        ("organization", org_model, organizations),
+        (
+            "organization_user",
+            org_user_model,
+            org_user_model._base_manager.filter(organization__in=organizations),
+        ),
+        (
+            "owner",
+            org_owner_model,
+            org_owner_model._base_manager.filter(organization__in=organizations),
+        ),
+    ]
+    if invitation_model is not None:
+        querysets.append(
+            (
+                "invitation",
+                invitation_model,
+                invitation_model._base_manager.filter(organization__in=organizations),
+            )
+        )
+    return querysets
+
+
+def iter_export(
+    org_model=None, types=None, active=None, modified_since=None, chunk_size=2000
+):
+    """
+    Yields a dictionary of field values, with a ``type`` key naming the record
+    type, for each of the organizations of the model and their organization
+    users, owners, and invitations, one record type after another.
+
+    ``types`` limits the export to the given record types. ``modified_since``
+    limits it to records whose ``modified`` time is at or after the given
+    time, for incremental exports; it raises ``ValueError`` for models without
+    a ``modified`` field.
+    """
+    querysets = [
+        (record_type, model, queryset)
+        for record_type, model, queryset in export_querysets(org_model, active)
+        if types is None or record_type in types
+    ]
+    if modified_since is not None:
+        for record_type, model, queryset in querysets:
+            if "modified" not in _field_names(model):
+                raise ValueError("{0} has no modified field".format(model._meta.label))
+
+    for record_type, model, queryset in querysets:
+        if modified_since is not None:
+            queryset = queryset.filter(modified__gte=modified_since)
+        rows = (
+            queryset.order_by("pk")
+            .values(*_field_names(model))
+            .iterator(chunk_size=chunk_size)
+        )
+        for row in rows:
+            yield {"type": record_type, **row}
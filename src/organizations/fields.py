@@ -32,6 +32,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 from importlib import import_module
+from itertools import chain
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -68,6 +69,27 @@ class AutoLastModifiedField(AutoCreatedField):
         return value
 
 
+class CounterField(models.PositiveIntegerField):
+    """
+    A denormalized counter, maintained with F-expression updates.
+
+    By default, sets editable=False and default=0. Saving an existing row
+    leaves the stored count as it is rather than writing the in-memory value,
+    which may be stale, while inserts write the value as usual.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("default", 0)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
+
+
 ORGS_SLUGFIELD = getattr(
     settings, "ORGS_SLUGFIELD", "django_extensions.db.fields.AutoSlugField"
 )
@@ -84,3 +106,39 @@ except (ImportError, ValueError, AttributeError):
 
 class SlugField(BaseSlugField):
     """Class redefinition for migrations"""
+
+    def pre_save(self, model_instance, add):
+        # Keep slugs allocated in bulk by ``organizations.slugs.allocate_slugs``
+        if getattr(model_instance, "_slug_allocated", False):
+            return getattr(model_instance, self.attname)
+        return super().pre_save(model_instance, add)
+
+    if hasattr(BaseSlugField, "find_unique"):
+
+        def find_unique(self, model_instance, field, iterator, *args):
+            """
+            Picks the first free candidate slug from a single query for the
+            taken candidates, rather than the query per candidate made by
+            django-extensions.
+            """
+            from organizations.slugs import first_free
+            from organizations.slugs import taken_slugs
+
+            opts = model_instance._meta
+            if (
+                getattr(model_instance, "_slug_probe", False)
+                or opts.unique_together
+                or opts.constraints
+            ):
+                return super().find_unique(model_instance, field, iterator, *args)
+
+            candidates = iter(iterator)
+            base = next(candidates)
+            queryset = self.get_queryset(model_instance.__class__, field)
+            if model_instance.pk:
+                queryset = queryset.exclude(pk=model_instance.pk)
+            slug = first_free(
+                chain([base], candidates), taken_slugs(queryset, field, [base])
+            )
+            setattr(model_instance, self.attname, slug)
+            return slug
@@ -1,6 +1,11 @@
+import re
+from email.utils import parseaddr
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.sites.shortcuts import get_current_site
+from django.core.exceptions import ImproperlyConfigured
+from django.core.validators import validate_email
 from django.utils.translation import gettext_lazy as _
 
 from organizations.backends import invitation_backend
@@ -34,7 +39,7 @@ class OrganizationForm(forms.ModelForm):
     def clean_owner(self):
         owner = self.cleaned_data["owner"]
         if owner != self.instance.owner.organization_user:
-            if self.request.user != self.instance.owner.organization_user.user:
+            if not self.instance.is_owner(self.request.user):
                 raise forms.ValidationError(
                     _("Only the organization owner can change ownerhip")
                 )
@@ -79,12 +84,13 @@ class OrganizationUserAddForm(forms.ModelForm):
         should kick off the registration process. It needs to create a User in
         order to link it to the Organization.
         """
+        backend = invitation_backend()
         try:
             user = get_user_model().objects.get(
                 email__iexact=self.cleaned_data["email"]
             )
         except get_user_model().DoesNotExist:
-            user = invitation_backend().invite_by_email(
+            user = backend.invite_by_email(
                 self.cleaned_data["email"],
                 **{
                     "domain": get_current_site(self.request),
@@ -94,7 +100,7 @@ class OrganizationUserAddForm(forms.ModelForm):
             )
         # Send a notification email to this user to inform them that they
         # have been added to a new organization.
-        invitation_backend().send_notification(
+        backend.send_notification(
             user,
             **{
                 "domain": get_current_site(self.request),
@@ -121,6 +127,74 @@ class OrganizationUserAddForm(forms.ModelForm):
         return email
 
 
+class OrganizationInvitationsForm(forms.Form):
+    """
+    Form class for inviting a pasted list of email addresses to an existing
+    Organization, using an invitation backend with `invite_many` such as
+    `ModelInvitation`. Raises `ImproperlyConfigured` for other backends.
+    """
+
+    emails = forms.CharField(
+        widget=forms.Textarea,
+        help_text=_("Email addresses separated by commas, semicolons, or new lines"),
+    )
+    max_emails = 1000
+
+    def __init__(self, request, organization, backend=None, *args, **kwargs):
+        self.request = request
+        self.organization = organization
+        self.backend = backend or invitation_backend()
+        if not callable(getattr(self.backend, "invite_many", None)):
+            raise ImproperlyConfigured(
+                "{cls} requires an invitation backend with `invite_many`, such as "
+                "`ModelInvitation`, not {backend}".format(
+                    cls=self.__class__.__name__,
+                    backend=self.backend.__class__.__name__,
+                )
+            )
+        super().__init__(*args, **kwargs)
+
+    def clean_emails(self):
+        emails, invalid = [], []
+        for entry in re.split(r"[,;\n]", self.cleaned_data["emails"]):
+            entry = entry.strip()
+            if not entry:
+                continue
+            address = parseaddr(entry)[1]
+            try:
+                validate_email(address)
+            except forms.ValidationError:
+                invalid.append(entry)
+            else:
+                emails.append(address.lower())
+        if invalid:
+            raise forms.ValidationError(
+                _("Invalid email addresses: %(emails)s"),
+                params={"emails": ", ".join(invalid[:10])},
+            )
+        emails = list(dict.fromkeys(emails))
+        if not emails:
+            raise forms.ValidationError(_("Enter at least one email address."))
+        if len(emails) > self.max_emails:
+            raise forms.ValidationError(
+                _("Enter at most %(max)d email addresses."),
+                params={"max": self.max_emails},
+            )
+        return emails
+
+    def save(self):
+        """
+        Invites the addresses which are not already members or invited and
+        returns the backend's `BulkInvitation` result.
+        """
+        return self.backend.invite_many(
+            self.cleaned_data["emails"],
+            self.request.user,
+            self.organization,
+            domain=get_current_site(self.request),
+        )
+
+
 class OrganizationAddForm(forms.ModelForm):
     """
     Form class for creating a new organization, complete with new owner, including a
@@ -0,0 +1,34 @@
+"""
+Generation of invitation GUIDs.
+
+Invitation GUIDs are random (version 4) UUIDs by default. With
+``ORGS_TIME_ORDERED_GUIDS`` enabled they are instead time-ordered (version 7)
+UUIDs, which begin with a millisecond timestamp so that new invitations are
+inserted at the end of the GUID index rather than at random positions in it.
+"""
+
+import os
+import time
+import uuid
+
+from django.conf import settings
+
+
+def uuid7():
+    """
+    Returns a version 7 UUID: a 48 bit Unix timestamp in milliseconds
+    followed by 74 random bits (RFC 9562)
+    """
+    value = int.from_bytes(os.urandom(10), "big")
+    value |= (time.time_ns() // 1_000_000) << 80
+    # Version 7 and the RFC 4122 variant
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def new_guid():
+    """Returns a new invitation GUID"""
+    if getattr(settings, "ORGS_TIME_ORDERED_GUIDS", False):
+        return uuid7()
+    return uuid.uuid4()
@@ -0,0 +1,205 @@
+"""
+Bulk import of organizations and their memberships.
+
+Rows are dictionaries with the keys:
+
+``organization``
+    The organization's slug, or its name for organization models without a
+    slug field.
+``user``
+    The value of the user's ``USERNAME_FIELD`` (or of another unique user
+    field).
+``role``
+    One of ``owner``, ``admin``, or ``member``. Defaults to ``member``.
+``name``
+    Optional; the name of an organization created from an ``owner`` row.
+    Defaults to the ``organization`` value.
+
+An organization that does not exist yet is created, with the row's user as
+its owner, from its ``owner`` row. Other rows add the user as a member (an
+admin for ``owner`` and ``admin`` rows, where the organization user model has
+``is_admin``); existing memberships are left unchanged, so importing the same
+rows again is harmless.
+
+Imported rows do not send the membership signals, though the new members'
+cached memberships are invalidated.
+"""
+
+import csv
+import json
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from organizations.cache import membership_cache
+from organizations.counters import refresh_counters
+from organizations.registry import registry
+from organizations.slugs import get_slug_field
+from organizations.utils import create_organizations
+from organizations.utils import default_org_model
+
+ROLES = ("owner", "admin", "member")
+
+FORMATS = ("csv", "jsonl")
+
+BatchResult = namedtuple("BatchResult", ["created", "added", "skipped"])
+
+# Stands in for a line of a JSON lines stream which is not a valid row, so
+# that it is skipped, with the reason, like other invalid rows
+InvalidRow = namedtuple("InvalidRow", ["reason"])
+
+
+def read_rows(stream, format):
+    """
+    Yields a dictionary for each row of the CSV (with a header row) or JSON
+    lines stream, reading one line at a time. A JSON line which cannot be
+    decoded yields an ``InvalidRow`` giving its line number.
+    """
+    if format == "csv":
+        yield from csv.DictReader(stream)
+    elif format == "jsonl":
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield InvalidRow("invalid JSON on line {0}: {1}".format(number, e.msg))
+    else:
+        raise ValueError("Unknown import format '{0}'".format(format))
+
+
+def organization_key_field(org_model):
+    """Returns the name of the field identifying organizations in rows"""
+    slug_field = get_slug_field(org_model)
+    return slug_field.attname if slug_field is not None else "name"
+
+
+def _key(value):
+    return "" if value is None else str(value).strip()
+
+
+def _valid_rows(rows, skipped):
+    """
+    Returns ``(index, org_key, user_key, role, row)`` tuples for the rows with
+    an organization, a user, and a known role, adding the others to skipped
+    """
+    valid = []
+    for index, row in enumerate(rows):
+        if isinstance(row, InvalidRow):
+            skipped.append((index, row.reason))
+            continue
+        if not isinstance(row, dict):
+            skipped.append((index, "not an object"))
+            continue
+        org_key, user_key = _key(row.get("organization")), _key(row.get("user"))
+        role = _key(row.get("role")).lower() or "member"
+        if not org_key or not user_key:
+            skipped.append((index, "missing organization or user"))
+        elif role not in ROLES:
+            skipped.append((index, "unknown role '{0}'".format(role)))
+        else:
+            valid.append((index, org_key, user_key, role, row))
+    return valid
+
+
+def _in_bulk(model, field, keys):
+    """Returns the model's instances with the field values, by value"""
+    return {
+        _key(getattr(instance, field)): instance
+        for instance in model._default_manager.filter(**{"{0}__in".format(field): keys})
+    }
+
+
+def _plan(valid, users, organizations, key_field, skipped):
+    """
+    Returns the ``create_organizations`` specs of the new organizations, by
+    key, and the ``(index, org_key, user, role)`` memberships to add, adding
+    rows with an unknown user or organization to skipped
+    """
+    # Owner rows of new organizations are handled first, so that rows
+    # preceding them in the batch find the organization.
+    specs = {}
+    memberships = []
+    for index, org_key, user_key, role, row in sorted(
+        valid, key=lambda row: row[3] != "owner"
+    ):
+        user = users.get(user_key)
+        if user is None:
+            skipped.append((index, "unknown user '{0}'".format(user_key)))
+        elif org_key in organizations or org_key in specs:
+            memberships.append((index, org_key, user, role))
+        elif role == "owner":
+            spec = {"user": user, "name": _key(row.get("name")) or org_key}
+            if key_field != "name":
+                spec["slug"] = org_key
+            specs[org_key] = spec
+        else:
+            skipped.append((index, "unknown organization '{0}'".format(org_key)))
+    return specs, memberships
+
+
+def _add_memberships(org_user_model, organizations, memberships):
+    """
+    Bulk inserts the memberships which do not exist yet and returns the new
+    organization users
+    """
+    has_is_admin = registry.has_field(org_user_model, "is_admin")
+    org_users = {}
+    for index, org_key, user, role in memberships:
+        organization = organizations[org_key]
+        if (organization.pk, user.pk) in org_users:
+            continue
+        fields = {"organization": organization, "user": user}
+        if has_is_admin:
+            fields["is_admin"] = role != "member"
+        org_users[organization.pk, user.pk] = org_user_model(**fields)
+    if not org_users:
+        return []
+
+    existing = set(
+        org_user_model._base_manager.filter(
+            organization_id__in={pk for pk, _ in org_users},
+            user_id__in={pk for _, pk in org_users},
+        ).values_list("organization_id", "user_id")
+    )
+    new_org_users = [
+        org_user for pks, org_user in org_users.items() if pks not in existing
+    ]
+    org_user_model._base_manager.bulk_create(new_org_users, ignore_conflicts=True)
+    refresh_counters(
+        org_user_model, {org_user.organization_id for org_user in new_org_users}
+    )
+    membership_cache.invalidate_users(org_user_model, new_org_users)
+    return new_org_users
+
+
+def import_batch(rows, org_model=None, user_field=None):
+    """
+    Imports the rows with a constant number of queries and returns a
+    ``BatchResult`` of the number of organizations created, the number of
+    memberships added, and a list of ``(index, reason)`` tuples for the rows
+    which were skipped.
+    """
+    org_model = org_model or default_org_model()
+    org_user_model = registry.family(org_model).organization_user
+    user_model = get_user_model()
+    user_field = user_field or user_model.USERNAME_FIELD
+    key_field = organization_key_field(org_model)
+
+    skipped = []
+    valid = _valid_rows(rows, skipped)
+    users = _in_bulk(user_model, user_field, {row[2] for row in valid})
+    organizations = _in_bulk(org_model, key_field, {row[1] for row in valid})
+
+    with transaction.atomic():
+        specs, memberships = _plan(valid, users, organizations, key_field, skipped)
+        for org_key, organization in zip(
+            specs, create_organizations(list(specs.values()), model=org_model)
+        ):
+            organizations[org_key] = organization
+        new_org_users = _add_memberships(org_user_model, organizations, memberships)
+
+    skipped.sort()
+    return BatchResult(len(specs), len(new_org_users), skipped)
@@ -0,0 +1,224 @@
+"""
+Lifecycle of model-tracked invitations.
+
+Invitations can be given an expiry: with ``ORGS_INVITATION_EXPIRY`` set to a
+number of seconds, new invitations' ``expires_at`` is set that far in the
+future, and the ``ModelInvitation`` backend no longer accepts them once it
+has passed. Expired and accepted invitations are removed with
+``purge_invitations`` (or the ``purge_org_invitations`` management command).
+
+Each pending invitation's identifier is unique within its organization. The
+identifiers are compared by ``invitee_key``, a fixed length hash of the
+normalized identifier, rather than by the long ``invitee_identifier`` column.
+The key is indexed, so that a user's pending invitations to all organizations
+are found with one query, and accepted together with
+``accept_pending_invitations``.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.utils import timezone
+
+from asgiref.sync import sync_to_async
+
+from organizations.counters import refresh_counters
+from organizations.dispatch import ADDED
+from organizations.dispatch import Change
+from organizations.dispatch import anotify
+from organizations.dispatch import notify
+from organizations.registry import registry
+
+
+def default_expires_at():
+    """
+    Returns the expiry time for a new invitation, or None if invitations do
+    not expire
+    """
+    expiry = getattr(settings, "ORGS_INVITATION_EXPIRY", None)
+    if expiry is None:
+        return None
+    return timezone.now() + timedelta(seconds=expiry)
+
+
+def normalize_identifier(identifier):
+    """Returns the invitee identifier stripped and lowercased"""
+    return identifier.strip().lower()
+
+
+def identifier_key(identifier):
+    """Returns the ``invitee_key`` for an invitee identifier"""
+    return hashlib.sha256(normalize_identifier(identifier).encode("utf-8")).hexdigest()
+
+
+def unexpired(now=None):
+    """Returns a filter matching invitations which have not expired"""
+    return Q(expires_at__isnull=True) | Q(expires_at__gt=now or timezone.now())
+
+
+def pending_invitations(invitation_model, identifier, now=None):
+    """
+    Returns the unexpired pending invitations, to any organization, for the
+    invitee identifier
+    """
+    return invitation_model.objects.filter(
+        unexpired(now), invitee_key=identifier_key(identifier), invitee__isnull=True
+    )
+
+
+def user_identifier(user):
+    """Returns the identifier by which the user is invited: their email"""
+    return getattr(user, user.get_email_field_name())
+
+
+def _accept_pending_invitations(invitation_model, user):
+    """
+    Accepts the user's pending invitations and returns the membership
+    changes, which are to be notified once the transaction is committed.
+
+    Must be called within a transaction.
+    """
+    org_user_model = registry.family(invitation_model).organization_user
+    members = org_user_model._base_manager.filter(organization=OuterRef("organization"))
+    queryset = (
+        pending_invitations(invitation_model, user_identifier(user))
+        .select_related("organization")
+        .annotate(
+            has_members=Exists(members), is_member=Exists(members.filter(user=user))
+        )
+        .order_by("organization_id")
+    )
+    features = transaction.get_connection().features
+    if features.has_select_for_update:
+        queryset = queryset.select_for_update(
+            of=("self", "organization") if features.has_select_for_update_of else ()
+        )
+    invitations = list(queryset)
+    if not invitations:
+        return []
+
+    new_org_users = []
+    for invitation in invitations:
+        invitation.invitee = user
+        if invitation.is_member:
+            continue
+        organization = invitation.organization
+        if not invitation.has_members and hasattr(organization, "_create_org_user"):
+            # The first member becomes the owner
+            organization._create_org_user(
+                user, invitation.activation_kwargs().get("is_admin", False)
+            )
+            continue
+        new_org_users.append(
+            org_user_model(
+                user=user, organization=organization, **invitation.activation_kwargs()
+            )
+        )
+    org_user_model._base_manager.bulk_create(new_org_users, ignore_conflicts=True)
+    updates = {"invitee": user}
+    if registry.has_field(invitation_model, "modified"):
+        updates["modified"] = timezone.now()
+    invitation_model._base_manager.filter(
+        pk__in=[invitation.pk for invitation in invitations]
+    ).update(**updates)
+    # The bulk statements bypass ``save``, so the counters are recomputed
+    org_pks = [invitation.organization_id for invitation in invitations]
+    refresh_counters(org_user_model, org_pks)
+
+    organizations = {
+        invitation.organization_id: invitation.organization
+        for invitation in invitations
+        if not invitation.is_member
+    }
+    return [
+        Change(ADDED, organizations[org_user.organization_id], [user], [org_user])
+        for org_user in org_user_model._base_manager.filter(
+            user=user, organization_id__in=list(organizations)
+        ).order_by("organization_id")
+    ]
+
+
+def accept_pending_invitations(invitation_model, user):
+    """
+    Accepts all of the user's pending, unexpired invitations of the invitation
+    model, adding the user to each organization they are not yet a member of.
+
+    The invitations are found by the user's email with a single indexed
+    query, and accepted in one transaction, with one bulk insert of the
+    memberships and one update of the invitations, rather than activating
+    them one by one. The ``user_added`` signals are sent for each new
+    membership.
+
+    Returns the new organization users.
+    """
+    with transaction.atomic():
+        changes = _accept_pending_invitations(invitation_model, user)
+    for change in changes:
+        notify(change)
+    return [change.organization_users[0] for change in changes]
+
+
+async def aaccept_pending_invitations(invitation_model, user):
+    """Async version of ``accept_pending_invitations``."""
+    changes = await sync_to_async(transaction.atomic()(_accept_pending_invitations))(
+        invitation_model, user
+    )
+    for change in changes:
+        await anotify(change)
+    return [change.organization_users[0] for change in changes]
+
+
+def invitation_models():
+    """Returns the installed invitation models"""
+    from organizations.base import AbstractBaseInvitation
+
+    return [
+        model
+        for model in apps.get_models()
+        if issubclass(model, AbstractBaseInvitation)
+    ]
+
+
+def purgeable(expired=True, accepted=False, now=None):
+    """Returns a filter matching expired and/or accepted invitations"""
+    condition = Q(pk__in=[])
+    if expired:
+        condition |= Q(expires_at__lte=now or timezone.now())
+    if accepted:
+        condition |= Q(invitee__isnull=False)
+    return condition
+
+
+def purge_invitations(
+    invitation_model, expired=True, accepted=False, batch_size=1000, now=None
+):
+    """
+    Deletes the invitation model's expired and/or accepted invitations, in
+    transactions of at most ``batch_size`` invitations so that no lock is held
+    for long.
+
+    Yields the number of invitations deleted by each batch.
+    """
+    now = now or timezone.now()
+    queryset = invitation_model._base_manager.filter(
+        purgeable(expired=expired, accepted=accepted, now=now)
+    )
+    while True:
+        with transaction.atomic():
+            batch = list(
+                queryset.order_by("pk").values_list("pk", "organization_id")[
+                    :batch_size
+                ]
+            )
+            if not batch:
+                return
+            invitation_model._base_manager.filter(
+                pk__in=[pk for pk, _ in batch]
+            ).delete()
+        yield len(batch)
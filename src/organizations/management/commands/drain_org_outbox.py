@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from organizations.outbox import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the email messages queued in the organizations outbox, in "
+        "batches, retrying failed messages with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="The number of times a message is attempted before it is given up on.",
+        )
+        parser.add_argument(
+            "--backoff",
+            type=float,
+            default=60,
+            help="The seconds to wait before retrying a failed message, "
+            "doubled after each further failure.",
+        )
+        parser.add_argument(
+            "--keep-sent",
+            action="store_true",
+            help="Keep sent messages in the outbox, marked as sent, instead of "
+            "deleting them.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling for new messages, instead of exiting "
+            "once the outbox has no messages due.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="The seconds to wait between polls with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["max_attempts"] < 1:
+            raise CommandError("--max-attempts must be at least 1")
+
+        sent = failed = 0
+        started = time.monotonic()
+        while True:
+            result = drain(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+                backoff=options["backoff"],
+                keep_sent=options["keep_sent"],
+            )
+            if result.sent or result.failed:
+                sent += result.sent
+                failed += result.failed
+                self.stdout.write(
+                    "Sent {0} messages, {1} failed ({2:.0f} messages/sec)".format(
+                        sent, failed, sent / max(time.monotonic() - started, 1e-6)
+                    )
+                )
+            elif options["loop"]:
+                time.sleep(options["interval"])
+            else:
+                break
+
+        self.stdout.write("Sent {0} messages; {1} failed".format(sent, failed))
@@ -0,0 +1,117 @@
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from organizations.exports import RECORD_TYPES
+from organizations.exports import iter_export
+from organizations.utils import default_org_model
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes organizations and their organization users, owners, and "
+        "invitations as JSON lines, streaming rows from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            metavar="app_label.ModelName",
+            help="The organization model to export. Defaults to "
+            "organizations.Organization.",
+        )
+        parser.add_argument(
+            "--types",
+            nargs="+",
+            choices=RECORD_TYPES,
+            help="The record types to export. Defaults to all of them.",
+        )
+        status = parser.add_mutually_exclusive_group()
+        status.add_argument(
+            "--active",
+            action="store_const",
+            const=True,
+            dest="active",
+            help="Only export active organizations.",
+        )
+        status.add_argument(
+            "--inactive",
+            action="store_const",
+            const=False,
+            dest="active",
+            help="Only export inactive organizations.",
+        )
+        parser.add_argument(
+            "--modified-since",
+            help="Only export records modified at or after this ISO 8601 time, "
+            "e.g. the latest modified time reported by a previous export.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "-o", "--output", help="The file to write to. Defaults to stdout."
+        )
+
+    def handle(self, *args, **options):
+        org_model = self.get_org_model(options["model"])
+        records = iter_export(
+            org_model,
+            types=options["types"],
+            active=options["active"],
+            modified_since=self.get_modified_since(options["modified_since"]),
+            chunk_size=options["chunk_size"],
+        )
+        output = (
+            open(options["output"], "w", encoding="utf-8")
+            if options["output"]
+            else self.stdout
+        )
+        try:
+            count, latest = self.write_records(records, output)
+        finally:
+            if output is not self.stdout:
+                output.close()
+
+        summary = "Exported {0} records".format(count)
+        if latest is not None:
+            summary += "; latest modified {0}".format(latest.isoformat())
+        (self.stderr if output is self.stdout else self.stdout).write(summary)
+
+    def get_org_model(self, label):
+        try:
+            return apps.get_model(label) if label else default_org_model()
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+    def get_modified_since(self, value):
+        if not value:
+            return None
+        modified_since = parse_datetime(value)
+        if modified_since is None:
+            raise CommandError("Invalid --modified-since time '{0}'".format(value))
+        if settings.USE_TZ and timezone.is_naive(modified_since):
+            modified_since = timezone.make_aware(modified_since)
+        return modified_since
+
+    def write_records(self, records, output):
+        """
+        Writes the records as JSON lines and returns the number written and
+        the latest modified time among them
+        """
+        count = 0
+        latest = None
+        try:
+            for record in records:
+                output.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
+                count += 1
+                modified = record.get("modified")
+                if modified is not None and (latest is None or modified > latest):
+                    latest = modified
+        except ValueError as e:
+            raise CommandError(str(e))
+        return count, latest
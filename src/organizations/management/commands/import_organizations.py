@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from itertools import islice
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from organizations.imports import FORMATS
+from organizations.imports import import_batch
+from organizations.imports import read_rows
+from organizations.utils import default_org_model
+
+FORMAT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports organizations and their members, admins, and owners from a "
+        "CSV or JSON lines file with 'organization', 'user', 'role', and "
+        "optional 'name' columns, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The CSV or JSON lines file to import.")
+        parser.add_argument(
+            "--model",
+            metavar="app_label.ModelName",
+            help="The organization model to import into. Defaults to "
+            "organizations.Organization.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="The file format. Defaults to the format of the file extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--user-field",
+            help="The unique user field the 'user' column holds. Defaults to "
+            "the user model's USERNAME_FIELD.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="A file recording the rows imported so far. An interrupted "
+            "import run with the same checkpoint resumes after the last "
+            "imported batch.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        org_model = self.get_org_model(options["model"])
+        format = self.get_format(path, options["format"])
+
+        checkpoint = options["checkpoint"]
+        done = self.read_checkpoint(checkpoint, path)
+        if done:
+            self.stdout.write("Resuming after row {0}".format(done))
+
+        try:
+            stream = open(path, newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(str(e))
+        with stream:
+            created, added, skipped, rows_imported = self.import_rows(
+                islice(read_rows(stream, format), done, None),
+                done,
+                org_model,
+                options,
+            )
+
+        self.stdout.write(
+            "Created {0} {1} and added {2} members from {3} rows; skipped {4} "
+            "rows".format(
+                created,
+                org_model._meta.verbose_name_plural,
+                added,
+                rows_imported,
+                skipped,
+            )
+        )
+
+    def get_org_model(self, label):
+        try:
+            return apps.get_model(label) if label else default_org_model()
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+    def get_format(self, path, format):
+        format = format or FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise CommandError(
+                "Cannot tell the format of '{0}'; use --format".format(path)
+            )
+        return format
+
+    def import_rows(self, rows, done, org_model, options):
+        """
+        Imports the rows in batches, following the ``done`` rows imported
+        before, and returns the numbers of organizations created, members
+        added, rows skipped, and rows imported
+        """
+        checkpoint, path = options["checkpoint"], options["path"]
+        created = added = skipped = rows_imported = 0
+        started = time.monotonic()
+        while True:
+            batch = list(islice(rows, options["batch_size"]))
+            if not batch:
+                break
+            result = import_batch(
+                batch, org_model=org_model, user_field=options["user_field"]
+            )
+            for index, reason in result.skipped:
+                self.stderr.write(
+                    "Skipped row {0}: {1}".format(done + index + 1, reason)
+                )
+            done += len(batch)
+            rows_imported += len(batch)
+            created += result.created
+            added += result.added
+            skipped += len(result.skipped)
+            self.write_checkpoint(checkpoint, path, done)
+            self.stdout.write(
+                "Imported {0} rows ({1:.0f} rows/sec)".format(
+                    done, rows_imported / max(time.monotonic() - started, 1e-6)
+                )
+            )
+        return created, added, skipped, rows_imported
+
+    def read_checkpoint(self, checkpoint, path):
+        """Returns the number of rows already imported from the file"""
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as f:
+            state = json.load(f)
+        if state.get("path") != os.path.abspath(path):
+            raise CommandError(
+                "The checkpoint '{0}' is for '{1}'".format(
+                    checkpoint, state.get("path")
+                )
+            )
+        return state["rows"]
+
+    def write_checkpoint(self, checkpoint, path, rows):
+        if not checkpoint:
+            return
+        # Written to a temporary file and renamed so that an interruption
+        # never leaves a partial checkpoint behind.
+        temporary = "{0}.tmp".format(checkpoint)
+        with open(temporary, "w") as f:
+            json.dump({"path": os.path.abspath(path), "rows": rows}, f)
+        os.replace(temporary, checkpoint)
@@ -0,0 +1,79 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from organizations.invitations import invitation_models
+from organizations.invitations import purge_invitations
+from organizations.invitations import purgeable
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired and/or accepted organization invitations in batches, "
+        "each in its own short transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.ModelName",
+            help="Invitation models to purge. Defaults to all of them.",
+        )
+        parser.add_argument(
+            "--expired",
+            action="store_true",
+            help="Delete invitations whose expiry time has passed.",
+        )
+        parser.add_argument(
+            "--accepted",
+            action="store_true",
+            help="Delete invitations which have been accepted.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the number of invitations to delete without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        expired, accepted = options["expired"], options["accepted"]
+        if not (expired or accepted):
+            raise CommandError("Specify --expired, --accepted, or both")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        for model in self.get_models(options["models"]):
+            name = model._meta.verbose_name_plural
+            if options["dry_run"]:
+                count = model._base_manager.filter(
+                    purgeable(expired=expired, accepted=accepted)
+                ).count()
+                self.stdout.write("Would delete {0} {1}".format(count, name))
+                continue
+            deleted = sum(
+                purge_invitations(
+                    model,
+                    expired=expired,
+                    accepted=accepted,
+                    batch_size=options["batch_size"],
+                )
+            )
+            self.stdout.write("Deleted {0} {1}".format(deleted, name))
+
+    def get_models(self, labels):
+        """Returns the invitation models with the labels, or all of them"""
+        models = invitation_models()
+        if not labels:
+            return models
+        try:
+            selected = [apps.get_model(label) for label in labels]
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        for model in selected:
+            if model not in models:
+                raise CommandError(
+                    "{0} is not an invitation model".format(model._meta.label)
+                )
+        return selected
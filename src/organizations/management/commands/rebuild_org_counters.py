@@ -0,0 +1,61 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from organizations.counters import has_counters
+from organizations.counters import rebuild_counters
+from organizations.registry import registry
+
+
+def counter_models():
+    """Returns the installed organization models that have counter fields"""
+    return sorted(
+        (
+            family.organization
+            for family in registry.families()
+            if has_counters(family.organization)
+        ),
+        key=lambda model: model._meta.label,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the denormalized member, admin, and pending invitation "
+        "counters of organizations from the membership and invitation tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.ModelName",
+            help="Organization models to rebuild. Defaults to all of them.",
+        )
+
+    def handle(self, *args, **options):
+        models = counter_models()
+        if options["models"]:
+            try:
+                selected = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            for model in selected:
+                if model not in models:
+                    raise CommandError(
+                        "{0} does not have membership counters".format(
+                            model._meta.label
+                        )
+                    )
+            models = selected
+
+        for org_model in models:
+            family = registry.family(org_model)
+            updated = rebuild_counters(
+                org_model, family.organization_user, family.invitation
+            )
+            self.stdout.write(
+                "Rebuilt counters for {0} {1}".format(
+                    updated, org_model._meta.verbose_name_plural
+                )
+            )
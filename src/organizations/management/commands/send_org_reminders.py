@@ -0,0 +1,72 @@
+import argparse
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from organizations.backends import invitation_backend
+from organizations.backends.modeled import ModelInvitation
+from organizations.invitations import invitation_models
+from organizations.registry import registry
+from organizations.reminders import parse_age
+from organizations.reminders import remind_inactive_members
+from organizations.reminders import remind_invitations
+
+
+def age(value):
+    try:
+        return parse_age(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends reminders for pending invitations which have not been sent, or "
+        "reminded of, recently, in batches over one email connection each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=age,
+            default="7d",
+            help="Remind invitees last contacted longer ago than this, e.g. 3d, "
+            "12h, or 2w. Defaults to 7d.",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the number of reminders to send without sending them.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        verb = "Would send" if options["dry_run"] else "Sent"
+        kwargs = {
+            "older_than": options["older_than"],
+            "batch_size": options["batch_size"],
+            "dry_run": options["dry_run"],
+        }
+
+        configured = invitation_backend()
+        for model in invitation_models():
+            backend = configured
+            if not (
+                isinstance(backend, ModelInvitation)
+                and backend.invitation_model is model
+            ):
+                backend = ModelInvitation(org_model=registry.family(model).organization)
+            sent = sum(remind_invitations(backend, **kwargs))
+            self.stdout.write(
+                "{0} {1} reminders for {2}".format(
+                    verb, sent, model._meta.verbose_name_plural
+                )
+            )
+
+        # Inactive users are only added to organizations, and reminded with
+        # token links, by user-based invitation backends
+        if not isinstance(configured, ModelInvitation):
+            sent = sum(remind_inactive_members(configured, **kwargs))
+            self.stdout.write("{0} {1} reminders to inactive users".format(verb, sent))
@@ -1,10 +1,61 @@
 from django.db import models
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.utils.translation import gettext_lazy as _
+
+from organizations.exceptions import OwnershipRequired
+from organizations.registry import registry
+
+
+def _pk(obj):
+    """Returns the primary key of a model instance, or the value itself"""
+    return getattr(obj, "pk", obj)
 
 
 class OrgManager(models.Manager):
     def get_for_user(self, user):
         return self.get_queryset().filter(users=user)
 
+    def _membership_query(self, users, orgs):
+        user_pks = {_pk(user) for user in users} - {None}
+        org_pks = {_pk(org) for org in orgs} - {None}
+        org_user_model = registry.family(self.model).organization_user
+        pairs = org_user_model.objects.filter(
+            user_id__in=user_pks, organization_id__in=org_pks
+        ).values_list("user_id", "organization_id")
+        return user_pks, org_pks, pairs
+
+    def membership_map(self, users, orgs):
+        """
+        Returns a dictionary mapping each ``(user_pk, organization_pk)`` pair
+        to a boolean indicating membership, answered with a single query.
+
+        Both ``users`` and ``orgs`` may be model instances or primary keys.
+
+        >>> Organization.objects.membership_map([kurt, dave], [nirvana, foo])
+        {(1, 2): True, (1, 1): False, (3, 2): True, (3, 1): True}
+
+        """
+        users, orgs = list(users), list(orgs)
+        user_pks, org_pks, pairs = self._membership_query(users, orgs)
+        members = set(pairs) if user_pks and org_pks else set()
+        return {
+            (user_pk, org_pk): (user_pk, org_pk) in members
+            for user_pk in user_pks
+            for org_pk in org_pks
+        }
+
+    async def amembership_map(self, users, orgs):
+        """Async version of ``membership_map``."""
+        users, orgs = list(users), list(orgs)
+        user_pks, org_pks, pairs = self._membership_query(users, orgs)
+        members = {pair async for pair in pairs} if user_pks and org_pks else set()
+        return {
+            (user_pk, org_pk): (user_pk, org_pk) in members
+            for user_pk in user_pks
+            for org_pk in org_pks
+        }
+
 
 class ActiveOrgManager(OrgManager):
     """
@@ -14,3 +65,31 @@ class ActiveOrgManager(OrgManager):
 
     def get_queryset(self):
         return super().get_queryset().filter(is_active=True)
+
+
+class OrganizationUserQuerySet(models.QuerySet):
+    def owners(self):
+        """Returns the organization users who are their organization's owner"""
+        owner_model = registry.family(self.model).owner
+        return self.filter(
+            Exists(owner_model.objects.filter(organization_user=OuterRef("pk")))
+        )
+
+    def delete(self):
+        """
+        Deletes the organization users.
+
+        Like ``OrganizationUser.delete``, refuses to delete any organization's
+        owner.
+        """
+        if self.owners().exists():
+            raise OwnershipRequired(
+                _(
+                    "Cannot delete organization owner "
+                    "before organization or transferring ownership."
+                )
+            )
+        return super().delete()
+
+
+OrganizationUserManager = models.Manager.from_queryset(OrganizationUserQuerySet)
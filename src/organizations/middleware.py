@@ -0,0 +1,46 @@
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+
+from organizations.roles import OrganizationRoles
+from organizations.roles import reset_current_roles
+from organizations.roles import set_current_roles
+
+
+class OrganizationRolesMiddleware:
+    """
+    Attaches a request-scoped ``OrganizationRoles`` resolver as
+    ``request.org_roles``.
+
+    The resolver loads the user's memberships the first time a membership,
+    admin, or owner check is made, so that a page makes a single role lookup
+    regardless of how many checks the views, forms, and templates perform.
+
+    Must be placed after ``AuthenticationMiddleware``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.org_roles = OrganizationRoles(request.user)
+        token = set_current_roles(request.org_roles)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_roles(token)
+
+    async def __acall__(self, request):
+        request.org_roles = OrganizationRoles(request.user)
+        token = set_current_roles(request.org_roles)
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_current_roles(token)
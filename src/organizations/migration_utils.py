@@ -0,0 +1,430 @@
+"""
+Migration operations for invitation and organization user models.
+
+The ``guid`` of invitation models is unique. Projects with their own
+invitation models, and large invitation tables, can use
+``unique_guid_operations`` in place of the ``AlterField`` operation that
+``makemigrations`` generates for it::
+
+    from organizations.migration_utils import unique_guid_operations
+
+    class Migration(migrations.Migration):
+        atomic = False
+        dependencies = [...]
+        operations = unique_guid_operations("myapp", "MyInvitation")
+
+The operations first give any duplicated GUIDs new values (keeping the
+oldest invitation's), then add the unique index. On PostgreSQL the index is
+built with ``CREATE UNIQUE INDEX CONCURRENTLY``, which does not block writes
+to the table while it is built, and is then attached as the unique constraint.
+This requires the migration to be non-atomic.
+
+Likewise, ``invitee_key_operations`` adds the ``invitee_key`` field and the
+unique constraint on pending invitations' organization and ``invitee_key``::
+
+    operations = invitee_key_operations("myapp", "MyInvitation")
+
+The keys of existing invitations are filled in batches. Where an organization
+has several pending invitations for the same invitee, only the oldest is
+given a key; the others are left without one, so that they are still valid
+but no longer match new invitations.
+
+``invitee_key_index_operations`` then indexes ``invitee_key``, in place of the
+``AlterField`` adding ``db_index`` to it, with ``CREATE INDEX CONCURRENTLY``
+on PostgreSQL::
+
+    operations = invitee_key_index_operations("myapp", "MyInvitation")
+
+Other indexed fields added to large tables, such as the invitations'
+``expires_at``, can be added without ``db_index`` and then indexed with
+``field_index_operations``, in place of the ``AlterField`` adding
+``db_index``, which likewise builds the index concurrently on PostgreSQL::
+
+    operations = [
+        migrations.AddField("myinvitation", "expires_at", field),
+        *field_index_operations("myapp", "MyInvitation", "expires_at", field),
+    ]
+
+The ``unique_together`` of organization user models is ordered
+``("organization", "user")``, so that its index serves lookups of an
+organization's users. ``organization_user_unique_operations`` reorders it, in
+place of the ``AlterUniqueTogether`` operation, building the new unique index
+concurrently on PostgreSQL before dropping the old constraint::
+
+    operations = organization_user_unique_operations("myapp", "MyOrgUser")
+"""
+
+import uuid
+
+from django.db import migrations
+from django.db import models
+from django.db.backends.utils import truncate_name
+
+from organizations.guids import new_guid
+from organizations.invitations import identifier_key
+
+
+def _guid_field(model, **kwargs):
+    field = models.UUIDField(editable=False, **kwargs)
+    field.set_attributes_from_name("guid")
+    field.model = model
+    return field
+
+
+def deduplicate_guids(app_label, model_name):
+    """
+    Returns a ``RunPython`` function giving new GUIDs to all but the first of
+    the invitations sharing a GUID
+    """
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        manager = model._base_manager.using(schema_editor.connection.alias)
+        duplicated = (
+            manager.values("guid")
+            .annotate(total=models.Count("pk"))
+            .filter(total__gt=1)
+            .values_list("guid", flat=True)
+        )
+        for guid in list(duplicated):
+            pks = manager.filter(guid=guid).order_by("pk").values_list("pk", flat=True)
+            for pk in list(pks)[1:]:
+                manager.filter(pk=pk).update(guid=uuid.uuid4())
+
+    return forwards
+
+
+def add_unique_guid(app_label, model_name):
+    """Returns ``RunPython`` functions adding and removing the unique index"""
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            schema_editor.alter_field(
+                model, _guid_field(model), _guid_field(model, unique=True)
+            )
+            return
+        quote = schema_editor.quote_name
+        table = model._meta.db_table
+        name = truncate_name(
+            "{0}_guid_uniq".format(table), connection.ops.max_name_length()
+        )
+        schema_editor.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {0} ON {1} (guid)".format(
+                quote(name), quote(table)
+            )
+        )
+        schema_editor.execute(
+            "ALTER TABLE {0} ADD CONSTRAINT {1} UNIQUE USING INDEX {1}".format(
+                quote(table), quote(name)
+            )
+        )
+
+    def backwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        schema_editor.alter_field(
+            model, _guid_field(model, unique=True), _guid_field(model)
+        )
+
+    return forwards, backwards
+
+
+def unique_guid_operations(app_label, model_name):
+    """
+    Returns the operations making the invitation model's ``guid`` unique, for
+    a migration with ``atomic = False``
+    """
+    forwards, backwards = add_unique_guid(app_label, model_name)
+    return [
+        migrations.RunPython(
+            deduplicate_guids(app_label, model_name), migrations.RunPython.noop
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(forwards, backwards)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name=model_name.lower(),
+                    name="guid",
+                    field=models.UUIDField(
+                        default=new_guid, editable=False, unique=True
+                    ),
+                )
+            ],
+        ),
+    ]
+
+
+def populate_invitee_keys(app_label, model_name, batch_size=1000):
+    """
+    Returns a ``RunPython`` function filling in the ``invitee_key`` of
+    existing invitations, leaving it unset for all but the oldest of an
+    organization's pending invitations for the same invitee
+    """
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        manager = model._base_manager.using(schema_editor.connection.alias)
+        pending = set()
+        last_pk = None
+        while True:
+            rows = manager.order_by("pk").values_list(
+                "pk", "organization_id", "invitee_id", "invitee_identifier"
+            )
+            if last_pk is not None:
+                rows = rows.filter(pk__gt=last_pk)
+            rows = list(rows[:batch_size])
+            if not rows:
+                return
+            invitations = []
+            for pk, organization_id, invitee_id, identifier in rows:
+                key = identifier_key(identifier)
+                if invitee_id is None:
+                    if (organization_id, key) in pending:
+                        continue
+                    pending.add((organization_id, key))
+                invitations.append(model(pk=pk, invitee_key=key))
+            manager.bulk_update(invitations, ["invitee_key"])
+            last_pk = rows[-1][0]
+
+    return forwards
+
+
+def pending_invitee_constraint(app_label, model_name):
+    """Returns the unique constraint on pending invitations' invitees"""
+    return models.UniqueConstraint(
+        fields=["organization", "invitee_key"],
+        condition=models.Q(invitee__isnull=True),
+        name="{0}_{1}_pending_invitee".format(app_label, model_name.lower()),
+    )
+
+
+def add_pending_invitee_constraint(app_label, model_name):
+    """Returns ``RunPython`` functions adding and removing the constraint"""
+    constraint = pending_invitee_constraint(app_label, model_name)
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        if schema_editor.connection.vendor != "postgresql":
+            schema_editor.add_constraint(model, constraint)
+            return
+        quote = schema_editor.quote_name
+        schema_editor.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {0} ON {1} ({2}, {3}) "
+            "WHERE {4} IS NULL".format(
+                quote(constraint.name),
+                quote(model._meta.db_table),
+                quote(model._meta.get_field("organization").column),
+                quote(model._meta.get_field("invitee_key").column),
+                quote(model._meta.get_field("invitee").column),
+            )
+        )
+
+    def backwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        schema_editor.remove_constraint(model, constraint)
+
+    return forwards, backwards
+
+
+def invitee_key_operations(app_label, model_name):
+    """
+    Returns the operations adding the invitation model's ``invitee_key`` and
+    the unique constraint on it, for a migration with ``atomic = False``
+    """
+    forwards, backwards = add_pending_invitee_constraint(app_label, model_name)
+    return [
+        migrations.AddField(
+            model_name=model_name.lower(),
+            name="invitee_key",
+            field=models.CharField(
+                editable=False,
+                help_text="A hash of the normalized invitee identifier",
+                max_length=64,
+                null=True,
+            ),
+        ),
+        migrations.RunPython(
+            populate_invitee_keys(app_label, model_name), migrations.RunPython.noop
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(forwards, backwards)],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name=model_name.lower(),
+                    constraint=pending_invitee_constraint(app_label, model_name),
+                )
+            ],
+        ),
+    ]
+
+
+def invitee_key_index_operations(app_label, model_name):
+    """
+    Returns the operations indexing the invitation model's ``invitee_key``,
+    for a migration with ``atomic = False``
+    """
+    return field_index_operations(
+        app_label,
+        model_name,
+        "invitee_key",
+        models.CharField(
+            editable=False,
+            help_text="A hash of the normalized invitee identifier",
+            max_length=64,
+            null=True,
+        ),
+    )
+
+
+def _unique_constraint_names(schema_editor, model, columns):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    return [
+        name
+        for name, constraint in constraints.items()
+        if constraint["unique"]
+        and not constraint["primary_key"]
+        and constraint["columns"] == columns
+    ]
+
+
+def alter_unique_together(app_label, model_name, old_fields, new_fields):
+    """
+    Returns a ``RunPython`` function replacing the unique constraint on the
+    old fields with one on the new fields
+    """
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            schema_editor.alter_unique_together(model, [old_fields], [new_fields])
+            return
+        quote = schema_editor.quote_name
+        table = model._meta.db_table
+        old_columns = [model._meta.get_field(field).column for field in old_fields]
+        columns = [model._meta.get_field(field).column for field in new_fields]
+        name = truncate_name(
+            "{0}_{1}_uniq".format(table, "_".join(columns)),
+            connection.ops.max_name_length(),
+        )
+        schema_editor.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {0} ON {1} ({2})".format(
+                quote(name), quote(table), ", ".join(quote(c) for c in columns)
+            )
+        )
+        schema_editor.execute(
+            "ALTER TABLE {0} ADD CONSTRAINT {1} UNIQUE USING INDEX {1}".format(
+                quote(table), quote(name)
+            )
+        )
+        for old_name in _unique_constraint_names(schema_editor, model, old_columns):
+            schema_editor.execute(
+                "ALTER TABLE {0} DROP CONSTRAINT {1}".format(
+                    quote(table), quote(old_name)
+                )
+            )
+
+    return forwards
+
+
+def organization_user_unique_operations(app_label, model_name):
+    """
+    Returns the operations ordering the organization user model's
+    ``unique_together`` as ``("organization", "user")``, for a migration with
+    ``atomic = False``
+    """
+    old_fields, new_fields = ("user", "organization"), ("organization", "user")
+    return [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    alter_unique_together(
+                        app_label, model_name, old_fields, new_fields
+                    ),
+                    alter_unique_together(
+                        app_label, model_name, new_fields, old_fields
+                    ),
+                )
+            ],
+            state_operations=[
+                migrations.AlterUniqueTogether(
+                    name=model_name.lower(), unique_together={new_fields}
+                )
+            ],
+        ),
+    ]
+
+
+def _with_db_index(field, db_index):
+    """Returns a copy of the unbound field with or without ``db_index``"""
+    _, _, args, kwargs = field.deconstruct()
+    kwargs["db_index"] = db_index
+    return field.__class__(*args, **kwargs)
+
+
+def _bound_field(model, name, field, db_index):
+    field = _with_db_index(field, db_index)
+    field.set_attributes_from_name(name)
+    field.model = model
+    return field
+
+
+def add_field_index(app_label, model_name, name, field):
+    """Returns ``RunPython`` functions adding and removing the field's index"""
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            schema_editor.alter_field(
+                model,
+                _bound_field(model, name, field, False),
+                _bound_field(model, name, field, True),
+            )
+            return
+        quote = schema_editor.quote_name
+        table = model._meta.db_table
+        column = model._meta.get_field(name).column
+        index_name = truncate_name(
+            "{0}_{1}_idx".format(table, column), connection.ops.max_name_length()
+        )
+        schema_editor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS {0} ON {1} ({2})".format(
+                quote(index_name), quote(table), quote(column)
+            )
+        )
+
+    def backwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        schema_editor.alter_field(
+            model,
+            _bound_field(model, name, field, True),
+            _bound_field(model, name, field, False),
+        )
+
+    return forwards, backwards
+
+
+def field_index_operations(app_label, model_name, name, field):
+    """
+    Returns the operations indexing the model's field, given as defined
+    without ``db_index``, for a migration with ``atomic = False``
+    """
+    forwards, backwards = add_field_index(app_label, model_name, name, field)
+    return [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(forwards, backwards)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name=model_name.lower(),
+                    name=name,
+                    field=_with_db_index(field, True),
+                )
+            ],
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from organizations.migration_utils import unique_guid_operations
+
+
+class Migration(migrations.Migration):
+    # The unique index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("organizations", "0008_outboxmessage"),
+    ]
+
+    operations = unique_guid_operations("organizations", "OrganizationInvitation")
@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organizations", "0014_alter_organizationuser_unique_together"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="bcc",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="cc",
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="reply_to",
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -1,3 +1,7 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
 from organizations.abstract import AbstractOrganization
 from organizations.abstract import AbstractOrganizationInvitation
 from organizations.abstract import AbstractOrganizationOwner
@@ -34,3 +38,43 @@ class OrganizationOwner(AbstractOrganizationOwner):
 class OrganizationInvitation(AbstractOrganizationInvitation):
     class Meta(AbstractOrganizationInvitation.Meta):
         abstract = False
+
+
+class OutboxMessage(models.Model):
+    """
+    An email message queued by the backends for delivery by the
+    `drain_org_outbox` command, when `ORGS_EMAIL_OUTBOX` is enabled.
+    """
+
+    created = models.DateTimeField(default=timezone.now, editable=False)
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    content_subtype = models.CharField(max_length=32, default="plain")
+    # (content, mimetype) pairs of EmailMultiAlternatives messages
+    alternatives = models.JSONField(default=list)
+    attempts = models.PositiveIntegerField(default=0)
+    # When the message is next due to be sent; None once it has been sent, if
+    # sent messages are kept, or has failed its final attempt
+    next_attempt_at = models.DateTimeField(null=True, default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = _("outbox message")
+        verbose_name_plural = _("outbox messages")
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(next_attempt_at__isnull=False),
+                name="organizations_outbox_due",
+            )
+        ]
+
+    def __str__(self):
+        return "{0}: {1}".format(", ".join(self.to), self.subject)
@@ -0,0 +1,235 @@
+"""
+Durable delivery of the backends' email messages.
+
+By default the backends send their messages while handling the request. When
+``ORGS_EMAIL_OUTBOX`` is True they instead store each message as an
+``OutboxMessage`` row, written in the request's transaction, and the
+``drain_org_outbox`` management command sends the stored messages in batches.
+Sent messages are deleted, unless the command is asked to keep them. Messages
+with attachments cannot be stored.
+
+A batch is claimed by moving its rows' ``next_attempt_at`` forward by a lease
+period, in a short transaction which skips rows locked by other workers where
+the database supports it, so that several workers may drain the outbox
+concurrently and a worker which dies mid-batch only delays its messages. Each
+batch is sent over a single email connection. Messages which fail are retried
+with exponential backoff until they have been attempted ``max_attempts``
+times.
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
+from django.db import connections
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from asgiref.sync import sync_to_async
+
+DrainResult = namedtuple("DrainResult", ["sent", "failed"])
+
+# Seconds for which a claimed batch is reserved for the claiming worker
+LEASE = 300
+
+
+def outbox_enabled():
+    return getattr(settings, "ORGS_EMAIL_OUTBOX", False)
+
+
+def _outbox_model():
+    from organizations.models import OutboxMessage
+
+    return OutboxMessage
+
+
+def _rows(messages):
+    outbox_model = _outbox_model()
+    if any(message.attachments for message in messages):
+        raise ValueError("Messages with attachments cannot be stored in the outbox")
+    return [
+        outbox_model(
+            subject=message.subject,
+            body=message.body,
+            from_email=message.from_email,
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            headers=dict(message.extra_headers),
+            content_subtype=message.content_subtype,
+            alternatives=[
+                list(alternative)
+                for alternative in getattr(message, "alternatives", [])
+            ],
+        )
+        for message in messages
+    ]
+
+
+def enqueue(messages):
+    """
+    Stores the email messages in the outbox with a single query and returns
+    the number stored.
+    """
+    rows = _outbox_model().objects.bulk_create(_rows(messages))
+    return len(rows)
+
+
+async def aenqueue(messages):
+    """Async version of ``enqueue``."""
+    rows = await _outbox_model().objects.abulk_create(_rows(messages))
+    return len(rows)
+
+
+def send_messages(messages):
+    """
+    Delivers the email messages, through the outbox when it is enabled, and
+    returns the number of messages sent or stored.
+    """
+    messages = [message for message in messages if message is not None]
+    if not messages:
+        return 0
+    if outbox_enabled():
+        return enqueue(messages)
+    return get_connection().send_messages(messages)
+
+
+async def asend_messages(messages):
+    """
+    Async version of ``send_messages``. Messages are sent from a thread of
+    their own, so that the email transport does not hold up the thread
+    serving the event loop's synchronous database calls.
+    """
+    messages = [message for message in messages if message is not None]
+    if not messages:
+        return 0
+    if outbox_enabled():
+        return await aenqueue(messages)
+    return await sync_to_async(get_connection().send_messages, thread_sensitive=False)(
+        messages
+    )
+
+
+def to_message(row, connection=None):
+    """Returns the email message stored in the outbox row"""
+    if row.alternatives:
+        message = EmailMultiAlternatives(
+            row.subject,
+            row.body,
+            row.from_email,
+            row.to,
+            bcc=row.bcc,
+            connection=connection,
+            headers=row.headers,
+            alternatives=[tuple(alternative) for alternative in row.alternatives],
+            cc=row.cc,
+            reply_to=row.reply_to,
+        )
+    else:
+        message = EmailMessage(
+            row.subject,
+            row.body,
+            row.from_email,
+            row.to,
+            bcc=row.bcc,
+            connection=connection,
+            headers=row.headers,
+            cc=row.cc,
+            reply_to=row.reply_to,
+        )
+    message.content_subtype = row.content_subtype
+    return message
+
+
+def retry_delay(attempts, backoff):
+    """Returns the delay before the next attempt after ``attempts`` attempts"""
+    return timedelta(seconds=backoff * 2 ** (attempts - 1))
+
+
+def claim(batch_size, using=None):
+    """
+    Reserves up to ``batch_size`` due messages for the calling worker and
+    returns them.
+    """
+    outbox_model = _outbox_model()
+    using = using or outbox_model.objects.db
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        due = outbox_model.objects.using(using).filter(next_attempt_at__lte=now)
+        if connections[using].features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        rows = list(due.order_by("next_attempt_at", "pk")[:batch_size])
+        if rows:
+            outbox_model.objects.using(using).filter(
+                pk__in=[row.pk for row in rows]
+            ).update(next_attempt_at=now + timedelta(seconds=LEASE))
+    return rows
+
+
+def _send(rows):
+    """
+    Sends the rows' messages over a single email connection and returns the
+    primary keys of those sent and ``(row, error)`` pairs for those which
+    failed.
+    """
+    sent, failures = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        return sent, [(row, e) for row in rows]
+    try:
+        for row in rows:
+            try:
+                connection.send_messages([to_message(row, connection)])
+            except Exception as e:
+                failures.append((row, e))
+            else:
+                sent.append(row.pk)
+    finally:
+        connection.close()
+    return sent, failures
+
+
+def drain(batch_size=100, max_attempts=5, backoff=60, keep_sent=False, using=None):
+    """
+    Claims and sends one batch of due messages over a single email connection
+    and returns a ``DrainResult`` of the number of messages sent and the
+    number which failed.
+
+    Sent messages are deleted, or with ``keep_sent`` marked as sent.
+    """
+    outbox_model = _outbox_model()
+    rows = claim(batch_size, using=using)
+    if not rows:
+        return DrainResult(0, 0)
+    manager = outbox_model.objects.db_manager(using)
+
+    sent, failures = _send(rows)
+    now = timezone.now()
+    if sent and not keep_sent:
+        manager.filter(pk__in=sent).delete()
+    elif sent:
+        manager.filter(pk__in=sent).update(
+            sent_at=now,
+            next_attempt_at=None,
+            attempts=F("attempts") + 1,
+            last_error="",
+        )
+    for row, error in failures:
+        attempts = row.attempts + 1
+        manager.filter(pk=row.pk).update(
+            attempts=attempts,
+            next_attempt_at=(
+                now + retry_delay(attempts, backoff)
+                if attempts < max_attempts
+                else None
+            ),
+            last_error="{0}: {1}".format(type(error).__name__, error),
+        )
+    return DrainResult(len(sent), len(failures))
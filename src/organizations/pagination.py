@@ -0,0 +1,189 @@
+"""
+Keyset pagination for organization and member lists.
+
+Rather than counting the rows and skipping to an offset, which gets slower
+the deeper the page, a keyset page continues from the last row of the page
+before it: the rows are ordered by a unique combination of fields, such as
+``("name", "pk")``, and the next page is filtered to the rows which sort
+after the last row's values. With an index on the fields every page costs
+the same.
+
+The position is carried in the query string as an opaque cursor, ``after``
+for the following page or ``before`` for the preceding one.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+AFTER = "after"
+BEFORE = "before"
+
+
+def encode_cursor(values):
+    """Returns the opaque cursor for the ordering values of a row"""
+    data = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, ordering):
+    """
+    Returns the ordering values of the cursor
+
+    Raises:
+        ValueError if the cursor was not made by ``encode_cursor`` for the
+        ordering
+
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor: {0!r}".format(cursor))
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValueError("Invalid cursor: {0!r}".format(cursor))
+    if not all(
+        value is None or isinstance(value, (str, int, float)) for value in values
+    ):
+        raise ValueError("Invalid cursor: {0!r}".format(cursor))
+    return values
+
+
+def seek(ordering, values, after=True):
+    """
+    Returns the filter for the rows which sort after (or before) the values
+    of the ordering fields
+
+    The leading field is also bounded on its own so that the database can
+    scan an index range rather than evaluate the disjunction for every row.
+    """
+    lookup = "gt" if after else "lt"
+    condition = Q()
+    for i, field in enumerate(ordering):
+        equal = dict(zip(ordering[:i], values[:i]))
+        condition |= Q(**{"{0}__{1}".format(field, lookup): values[i]}, **equal)
+    bound = Q(**{"{0}__{1}e".format(ordering[0], lookup): values[0]})
+    return bound & condition
+
+
+def _seek_cursor(queryset, ordering, cursor, after=True):
+    values = decode_cursor(cursor, ordering)
+    try:
+        return queryset.filter(seek(ordering, values, after=after))
+    except (TypeError, ValidationError):
+        # Values which are not valid for their fields
+        raise ValueError("Invalid cursor: {0!r}".format(cursor))
+
+
+class KeysetPage:
+    """
+    A page of rows, with cursors for the pages either side of it
+
+    It answers ``has_next``, ``has_previous``, and ``has_other_pages`` like a
+    Django ``Page``, but has no page number or count.
+    """
+
+    def __init__(self, object_list, ordering, has_next=False, has_previous=False):
+        self.object_list = object_list
+        self.ordering = ordering
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return "<KeysetPage of {0} rows>".format(len(self))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _cursor(self, row):
+        return encode_cursor(getattr(row, field) for field in self.ordering)
+
+    @property
+    def next_cursor(self):
+        """The ``after`` cursor of the next page, or None"""
+        if not (self.has_next() and self.object_list):
+            return None
+        return self._cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        """The ``before`` cursor of the previous page, or None"""
+        if not (self.has_previous() and self.object_list):
+            return None
+        return self._cursor(self.object_list[0])
+
+
+def keyset_page(queryset, ordering, per_page, after=None, before=None):
+    """
+    Returns the ``KeysetPage`` of up to ``per_page`` rows of the queryset
+
+    Args:
+        queryset: the rows to page through
+        ordering: the names of the fields, in order, which sort the rows
+            uniquely, ending with ``pk`` (or another unique field) and
+            matching the order of an index on them
+        per_page: the number of rows on a page
+        after: the cursor of the row which the page follows
+        before: the cursor of the row which the page precedes
+
+    Raises:
+        ValueError if the cursor is invalid
+
+    """
+    if before:
+        rows = list(
+            _seek_cursor(queryset, ordering, before, after=False).order_by(
+                *["-{0}".format(field) for field in ordering]
+            )[: per_page + 1]
+        )
+        return KeysetPage(
+            rows[:per_page][::-1],
+            ordering,
+            has_next=True,
+            has_previous=len(rows) > per_page,
+        )
+
+    if after:
+        queryset = _seek_cursor(queryset, ordering, after)
+    rows = list(queryset.order_by(*ordering)[: per_page + 1])
+    return KeysetPage(
+        rows[:per_page],
+        ordering,
+        has_next=len(rows) > per_page,
+        has_previous=bool(after),
+    )
+
+
+def request_page(request, queryset, ordering, per_page):
+    """
+    Returns the ``KeysetPage`` for the ``after`` or ``before`` cursor in the
+    request's query string
+
+    Raises:
+        ValueError if the cursor is invalid
+
+    """
+    return keyset_page(
+        queryset,
+        ordering,
+        per_page,
+        after=request.GET.get(AFTER),
+        before=request.GET.get(BEFORE),
+    )
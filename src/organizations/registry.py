@@ -0,0 +1,136 @@
+"""
+Registry of organization model families.
+
+Each concrete organization model is linked to its organization user, owner,
+and invitation models, and each of those models to its organization model's
+family. The registry is built once, when the app registry is ready, and is
+read-only thereafter, so that resolving a family or a model's field metadata
+does no introspection.
+
+Models which were not registered when the registry was built (e.g. models
+created at runtime) are introspected on first use and added to it.
+"""
+
+import threading
+from collections import namedtuple
+from itertools import chain
+from types import MappingProxyType
+
+from django.apps import apps
+
+ModelFamily = namedtuple(
+    "ModelFamily", ["organization", "organization_user", "owner", "invitation"]
+)
+
+FieldInfo = namedtuple("FieldInfo", ["names", "fields"])
+
+
+def _organization_family(org_model):
+    return ModelFamily(
+        org_model,
+        org_model.organization_users.rel.related_model,
+        org_model.owner.related.related_model,
+        getattr(org_model, "invitation_model", None),
+    )
+
+
+def _field_info(model):
+    names = frozenset(
+        chain.from_iterable(
+            (field.name, field.attname) if hasattr(field, "attname") else (field.name,)
+            for field in model._meta.get_fields()
+            if not (field.many_to_one and field.related_model is None)
+        )
+    )
+    fields = MappingProxyType({field.name: field for field in model._meta.fields})
+    return FieldInfo(names, fields)
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = MappingProxyType({})
+        self._field_info = MappingProxyType({})
+
+    def build(self):
+        """Registers the families of all installed organization models"""
+        from organizations.base import AbstractBaseOrganization
+
+        families = {}
+        for model in apps.get_models():
+            if issubclass(model, AbstractBaseOrganization):
+                families[model] = _organization_family(model)
+        for family in list(families.values()):
+            for member in family[1:]:
+                if member is not None and member not in families:
+                    families[member] = families[
+                        member._meta.get_field("organization").related_model
+                    ]
+        field_info = {
+            model: _field_info(model)
+            for model in chain(families, *(family[1:] for family in families.values()))
+            if model is not None
+        }
+        with self._lock:
+            self._families = MappingProxyType(families)
+            self._field_info = MappingProxyType(field_info)
+
+    def _add(self, attr, model, value):
+        # Copied rather than mutated, so that readers never need the lock
+        with self._lock:
+            entries = dict(getattr(self, attr))
+            entries.setdefault(model, value)
+            setattr(self, attr, MappingProxyType(entries))
+            return entries[model]
+
+    def family(self, model):
+        """
+        Returns the ``ModelFamily`` of an organization, organization user,
+        owner, or invitation model.
+        """
+        try:
+            return self._families[model]
+        except KeyError:
+            pass
+        from organizations.base import AbstractBaseOrganization
+
+        if issubclass(model, AbstractBaseOrganization):
+            family = _organization_family(model)
+        else:
+            family = self.family(model._meta.get_field("organization").related_model)
+        return self._add("_families", model, family)
+
+    def families(self):
+        """Returns the set of registered model families"""
+        return set(self._families.values())
+
+    def membership_models(self):
+        """
+        Returns the set of registered organization user and owner models,
+        e.g. for connecting model signal receivers by sender
+        """
+        return {
+            model
+            for family in self.families()
+            for model in (family.organization_user, family.owner)
+        }
+
+    def _info(self, model):
+        try:
+            return self._field_info[model]
+        except KeyError:
+            return self._add("_field_info", model, _field_info(model))
+
+    def field_names(self, model):
+        """Returns the set of the model's field names and attribute names"""
+        return self._info(model).names
+
+    def fields(self, model):
+        """Returns a mapping of the names of the model's fields to the fields"""
+        return self._info(model).fields
+
+    def has_field(self, model, name):
+        return name in self._info(model).names
+
+
+registry = ModelRegistry()
@@ -0,0 +1,157 @@
+"""
+Scheduled reminders for pending invitations.
+
+Two kinds of invitee are reminded: those with a pending, unexpired model
+invitation (``ModelInvitation``) which was last sent before a cutoff, and
+inactive users who were added to an organization by the default invitation
+backend and have not been reminded since the cutoff. Invitations track when
+they were last sent in ``last_sent_at`` and organization users when they were
+last reminded in ``last_reminded_at``.
+
+The rows are read in batches ordered by primary key, each batch continuing
+after the last key of the one before (rather than with an offset), the
+batch's messages are sent over a single email connection, and the batch is
+then marked as reminded with one update.
+"""
+
+from datetime import timedelta
+
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+from organizations.invitations import unexpired
+from organizations.registry import registry
+
+
+def current_site():
+    """Returns the current site, or None without the sites framework"""
+    if not apps.is_installed("django.contrib.sites"):
+        return None
+    from django.contrib.sites.models import Site
+
+    return Site.objects.get_current()
+
+
+def _not_since(model, field, cutoff):
+    condition = Q(**{"{0}__lt".format(field): cutoff})
+    never = Q(**{"{0}__isnull".format(field): True})
+    if registry.has_field(model, "created"):
+        never &= Q(created__lt=cutoff)
+    return condition | never
+
+
+def stale_invitations(invitation_model, older_than, now=None):
+    """
+    Returns the pending, unexpired invitations which were last sent more
+    than ``older_than`` (a timedelta) ago
+    """
+    now = now or timezone.now()
+    return invitation_model._base_manager.filter(
+        unexpired(now),
+        _not_since(invitation_model, "last_sent_at", now - older_than),
+        invitee__isnull=True,
+    )
+
+
+def inactive_members(org_user_model, older_than, now=None):
+    """
+    Returns the organization users whose users are inactive and who have not
+    been reminded in the last ``older_than`` (a timedelta)
+    """
+    now = now or timezone.now()
+    return org_user_model._base_manager.filter(
+        _not_since(org_user_model, "last_reminded_at", now - older_than),
+        user__is_active=False,
+    )
+
+
+def batches(queryset, batch_size):
+    """Yields lists of the queryset's rows in primary key order"""
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def remind_invitations(
+    backend, older_than, batch_size=100, now=None, dry_run=False, **kwargs
+):
+    """
+    Sends reminders of the stale invitations of the ``ModelInvitation``
+    backend's invitation model, and yields the number sent with each batch.
+
+    With ``dry_run`` nothing is sent, and the number of stale invitations is
+    yielded instead.
+    """
+    now = now or timezone.now()
+    invitation_model = backend.invitation_model
+    queryset = stale_invitations(invitation_model, older_than, now)
+    if dry_run:
+        yield queryset.count()
+        return
+    kwargs.setdefault("domain", current_site())
+    queryset = queryset.select_related("organization", "invited_by")
+    for batch in batches(queryset, batch_size):
+        sent = backend.send_invitation_reminders(batch, **kwargs)
+        invitation_model._base_manager.filter(
+            pk__in=[invitation.pk for invitation in batch]
+        ).update(last_sent_at=now)
+        yield sent
+
+
+def remind_inactive_members(
+    backend, older_than, batch_size=100, now=None, dry_run=False, **kwargs
+):
+    """
+    Sends reminders to the inactive users of the backend's organization
+    model, one for each organization they were added to, and yields the
+    number sent with each batch.
+
+    With ``dry_run`` nothing is sent, and the number of users to remind is
+    yielded instead.
+    """
+    now = now or timezone.now()
+    org_user_model = registry.family(backend.org_model).organization_user
+    queryset = inactive_members(org_user_model, older_than, now)
+    if dry_run:
+        yield queryset.count()
+        return
+    kwargs.setdefault("domain", current_site())
+    queryset = queryset.select_related("organization", "user")
+    for batch in batches(queryset, batch_size):
+        sent = backend.send_messages(
+            [
+                backend.reminder_message(
+                    org_user.user, organization=org_user.organization, **kwargs
+                )
+                for org_user in batch
+            ]
+        )
+        org_user_model._base_manager.filter(
+            pk__in=[org_user.pk for org_user in batch]
+        ).update(last_reminded_at=now)
+        yield sent
+
+
+def parse_age(value):
+    """
+    Returns the timedelta for an age such as ``3d``: a number followed by
+    ``s``, ``m``, ``h``, ``d`` (the default), or ``w``
+    """
+    units = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+    value = value.strip().lower()
+    unit = value[-1:] if value[-1:] in units else "d"
+    number = value[:-1] if value[-1:] in units else value
+    try:
+        number = float(number)
+    except ValueError:
+        raise ValueError("Invalid age: {0!r}".format(value))
+    if number < 0:
+        raise ValueError("Invalid age: {0!r}".format(value))
+    return timedelta(**{units[unit]: number})
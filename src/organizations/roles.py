@@ -0,0 +1,234 @@
+"""
+Request-scoped resolution of a user's organization memberships and roles.
+
+An ``OrganizationRoles`` instance loads all of a user's memberships for an
+organization model family in a single query the first time it is consulted,
+and answers every subsequent membership, admin, and owner check from memory.
+
+The ``OrganizationRolesMiddleware`` attaches one to each request as
+``request.org_roles`` and makes it the *current* resolver for the duration of
+the request, which is how the organization model methods and template filters
+find it without being handed the request.
+"""
+
+import contextvars
+from collections import namedtuple
+
+from django.db.models import BooleanField
+from django.db.models import Exists
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import Value
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from organizations.cache import membership_cache
+from organizations.registry import registry
+from organizations.signals import owner_changed
+from organizations.signals import user_added
+from organizations.signals import user_removed
+
+Membership = namedtuple("Membership", ["is_admin", "is_owner"])
+
+_current_roles = contextvars.ContextVar("organization_roles", default=None)
+
+
+def _org_user_model(organization):
+    return registry.family(type(organization)).organization_user
+
+
+def membership_queryset(org_user_model, user):
+    """
+    Returns a ``values_list`` queryset of ``(organization_id, is_admin,
+    is_owner)`` rows for each of the user's memberships in the model family.
+    """
+    owner_model = registry.family(org_user_model).owner
+    if registry.has_field(org_user_model, "is_admin"):
+        is_admin = F("is_admin")
+    else:
+        is_admin = Value(False, output_field=BooleanField())
+    return (
+        org_user_model.objects.filter(user_id=user.pk)
+        .annotate(
+            role_is_admin=is_admin,
+            role_is_owner=Exists(
+                owner_model.objects.filter(organization_user=OuterRef("pk"))
+            ),
+        )
+        .values_list("organization_id", "role_is_admin", "role_is_owner")
+        .order_by()
+    )
+
+
+def load_memberships(org_user_model, user):
+    """
+    Returns a dictionary mapping organization primary keys to ``Membership``
+    tuples for every membership the user has in the model family.
+
+    Served from the cross-request membership cache when it is enabled.
+    """
+
+    def loader():
+        return {
+            org_pk: Membership(bool(admin), bool(owner))
+            for org_pk, admin, owner in membership_queryset(org_user_model, user)
+        }
+
+    if membership_cache.enabled:
+        return membership_cache.get_or_load(org_user_model, user.pk, loader)
+    return loader()
+
+
+async def aload_memberships(org_user_model, user):
+    """Async version of ``load_memberships``."""
+
+    async def loader():
+        return {
+            org_pk: Membership(bool(admin), bool(owner))
+            async for org_pk, admin, owner in membership_queryset(org_user_model, user)
+        }
+
+    if membership_cache.enabled:
+        return await membership_cache.aget_or_load(org_user_model, user.pk, loader)
+    return await loader()
+
+
+class OrganizationRoles:
+    """
+    Lazily loads and caches a single user's organization memberships.
+
+    The user may be a lazy object (e.g. ``request.user``); it is not
+    evaluated until the first check.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._memberships = {}
+
+    def handles(self, user):
+        """Returns True if this resolver answers for the given user"""
+        pk = getattr(user, "pk", None)
+        return pk is not None and pk == self.user.pk
+
+    def clear(self):
+        """Discards loaded memberships so that the next check reloads them"""
+        self._memberships = {}
+
+    def memberships(self, org_user_model):
+        if org_user_model not in self._memberships:
+            if self.user.pk is None:
+                self._memberships[org_user_model] = {}
+            else:
+                self._memberships[org_user_model] = load_memberships(
+                    org_user_model, self.user
+                )
+        return self._memberships[org_user_model]
+
+    async def amemberships(self, org_user_model):
+        """Async version of ``memberships``."""
+        if org_user_model not in self._memberships:
+            if self.user.pk is None:
+                self._memberships[org_user_model] = {}
+            else:
+                self._memberships[org_user_model] = await aload_memberships(
+                    org_user_model, self.user
+                )
+        return self._memberships[org_user_model]
+
+    def membership(self, organization):
+        """Returns the user's ``Membership`` in the organization, or None"""
+        return self.memberships(_org_user_model(organization)).get(organization.pk)
+
+    async def amembership(self, organization):
+        """Async version of ``membership``."""
+        memberships = await self.amemberships(_org_user_model(organization))
+        return memberships.get(organization.pk)
+
+    def is_member(self, organization):
+        return self.membership(organization) is not None
+
+    def is_admin(self, organization):
+        membership = self.membership(organization)
+        return membership is not None and membership.is_admin
+
+    def is_owner(self, organization):
+        membership = self.membership(organization)
+        return membership is not None and membership.is_owner
+
+    async def ais_member(self, organization):
+        return await self.amembership(organization) is not None
+
+    async def ais_admin(self, organization):
+        membership = await self.amembership(organization)
+        return membership is not None and membership.is_admin
+
+    async def ais_owner(self, organization):
+        membership = await self.amembership(organization)
+        return membership is not None and membership.is_owner
+
+
+def set_current_roles(roles):
+    """Makes ``roles`` the current resolver; returns a token for resetting"""
+    return _current_roles.set(roles)
+
+
+def reset_current_roles(token):
+    _current_roles.reset(token)
+
+
+def current_roles(user):
+    """
+    Returns the current resolver if there is one and it answers for the given
+    user, otherwise None.
+    """
+    roles = _current_roles.get()
+    if roles is not None and roles.handles(user):
+        return roles
+    return None
+
+
+def roles_for(user):
+    """
+    Returns a resolver able to answer checks for the given user without a
+    per-check query, or None if checks should go to the database.
+
+    This is the current request's resolver when it answers for the user, or
+    a single-use resolver backed by the membership cache when that is
+    enabled.
+    """
+    roles = current_roles(user)
+    if roles is None and membership_cache.enabled:
+        if getattr(user, "pk", None) is not None:
+            roles = OrganizationRoles(user)
+    return roles
+
+
+def _clear_current_roles(sender, **kwargs):
+    roles = _current_roles.get()
+    if roles is not None:
+        roles.clear()
+
+
+def _clear_on_model_change(sender, **kwargs):
+    _clear_current_roles(sender)
+
+
+def connect_model_signals():
+    """
+    Connects the receiver which clears the current resolver when an
+    organization user or owner is saved or deleted, by sender, to each
+    registered organization user and owner model. Called once the registry
+    is built.
+    """
+    for model in registry.membership_models():
+        for signal in (post_save, post_delete):
+            signal.connect(
+                _clear_on_model_change,
+                sender=model,
+                dispatch_uid="organizations_roles_model_change",
+            )
+
+
+user_added.connect(_clear_current_roles, dispatch_uid="organizations_roles_added")
+user_removed.connect(_clear_current_roles, dispatch_uid="organizations_roles_removed")
+owner_changed.connect(_clear_current_roles, dispatch_uid="organizations_roles_owner")
@@ -4,3 +4,5 @@ user_added = django.dispatch.Signal()
 user_removed = django.dispatch.Signal()
 invitation_accepted = django.dispatch.Signal()
 owner_changed = django.dispatch.Signal()
+users_added = django.dispatch.Signal()
+users_removed = django.dispatch.Signal()
@@ -0,0 +1,149 @@
+"""
+Allocation of unique organization slugs.
+
+The auto slug fields find a unique slug with a query per candidate slug
+(``name``, ``name-2``, ``name-3``...), and cannot see the slugs of other
+instances in the same bulk insert. Slugs are instead allocated by reading
+every existing slug which is one of the candidates, the base slug or a
+numbered variant of it, with a single query and picking the first free
+candidate in memory.
+"""
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.template.defaultfilters import slugify
+
+from organizations.fields import SlugField
+
+# Bound on the number of base slugs matched by a single query
+BASE_QUERY_SIZE = 200
+
+# The longest numeric suffix allowed for when truncating base slugs
+SUFFIX_DIGITS = 6
+
+
+def get_slug_field(model):
+    """Returns the model's organizations ``SlugField``, or None"""
+    for field in model._meta.concrete_fields:
+        if isinstance(field, SlugField):
+            return field
+    return None
+
+
+def numbered_pattern(field, base):
+    """
+    Returns the regular expression matching the numbered candidate slugs for
+    the base slug, allowing for the base being truncated to fit the suffix.
+    """
+    separator = getattr(field, "separator", "-")
+    stems = sorted(
+        {
+            base[: field.max_length - len(separator) - digits].rstrip(separator)
+            for digits in range(1, SUFFIX_DIGITS + 1)
+        }
+    )
+    return "^({0}){1}[0-9]+$".format(
+        "|".join(re.escape(stem) for stem in stems), re.escape(separator)
+    )
+
+
+def taken_slugs(queryset, field, bases):
+    """
+    Returns the set of slugs in the queryset which are candidate slugs for
+    any of the bases, with one query per ``BASE_QUERY_SIZE`` bases.
+    """
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), BASE_QUERY_SIZE):
+        chunk = bases[start:][:BASE_QUERY_SIZE]
+        query = reduce(
+            or_,
+            (
+                Q(**{"{0}__regex".format(field.attname): numbered_pattern(field, base)})
+                for base in chunk
+            ),
+            Q(**{"{0}__in".format(field.attname): chunk}),
+        )
+        taken.update(queryset.filter(query).values_list(field.attname, flat=True))
+    return taken
+
+
+def first_free(candidates, taken):
+    """Returns the first of the candidate slugs which is not taken"""
+    return next(slug for slug in candidates if slug and slug not in taken)
+
+
+def available_slug(model, value):
+    """
+    Returns the slug for the value (e.g. an organization name) if it is not
+    taken, otherwise the first free numbered variant of it.
+    """
+    field = get_slug_field(model)
+    base = slugify(value)[: field.max_length].strip("-") or "organization"
+    return first_free(
+        _candidates(field, base),
+        taken_slugs(field.model._default_manager.all(), field, [base]),
+    )
+
+
+def _slug_source(field, instance):
+    populate_from = getattr(field, "_populate_from", None) or getattr(
+        field, "populate_from", "name"
+    )
+    if callable(populate_from):
+        return populate_from(instance)
+    return getattr(instance, populate_from)
+
+
+def _candidates(field, base):
+    separator = getattr(field, "separator", "-")
+    yield base
+    suffix = 2
+    while True:
+        end = "{0}{1}".format(separator, suffix)
+        yield "{0}{1}".format(
+            base[: field.max_length - len(end)].rstrip(separator), end
+        )
+        suffix += 1
+
+
+def allocate_slugs(model, instances):
+    """
+    Sets a unique slug on each of the unsaved instances which does not have
+    one, from a constant number of queries, numbering duplicates ``name``,
+    ``name-2``, ``name-3`` and so on.
+
+    The slug field keeps both the allocated slugs and those the instances
+    already had when the instances are saved.
+    Does nothing if the model has no organizations ``SlugField``.
+    """
+    field = get_slug_field(model)
+    if field is None:
+        return
+    pending = []
+    taken = set()
+    for instance in instances:
+        slug = getattr(instance, field.attname)
+        if slug:
+            taken.add(slug)
+            instance._slug_allocated = True
+        else:
+            source = _slug_source(field, instance)
+            base = slugify(source)[: field.max_length].strip("-") or "organization"
+            pending.append((instance, base))
+    if not pending:
+        return
+
+    taken.update(
+        taken_slugs(
+            field.model._base_manager.all(), field, [base for _, base in pending]
+        )
+    )
+    for instance, base in pending:
+        slug = first_free(_candidates(field, base), taken)
+        taken.add(slug)
+        setattr(instance, field.attname, slug)
+        instance._slug_allocated = True
@@ -1,14 +1,62 @@
 from django import template
+from django.http import QueryDict
+
+from organizations.pagination import keyset_page
+from organizations.pagination import request_page
 
 register = template.Library()
 
 
+def _request(context):
+    return getattr(context, "request", None) or context.get("request")
+
+
 @register.inclusion_tag("organizations/organization_users.html", takes_context=True)
-def organization_users(context, org):
-    context.update({"organization_users": org.organization_users.all()})
+def organization_users(context, org, per_page=None):
+    """
+    Renders the organization's users, or if ``per_page`` is given a page of
+    them, ordered by user and paginated by keyset from the request's query
+    string
+    """
+    organization_users = org.organization_users.select_related("user")
+    page = None
+    if per_page is not None:
+        ordering, per_page = ("user_id", "pk"), int(per_page)
+        request = _request(context)
+        page = None
+        if request is not None:
+            try:
+                page = request_page(request, organization_users, ordering, per_page)
+            except ValueError:
+                pass
+        if page is None:
+            # Without a request, or with an invalid cursor, the first page
+            page = keyset_page(organization_users, ordering, per_page)
+        organization_users = page.object_list
+    context.update({"organization_users": organization_users, "page_obj": page})
     return context
 
 
+@register.simple_tag(takes_context=True)
+def page_query(context, **kwargs):
+    """
+    Returns the request's query string with the given parameters replaced,
+    or removed if None, and without any page number or cursor not given, e.g.
+
+        <a href="?{% page_query after=page_obj.next_cursor %}">
+    """
+    request = _request(context)
+    params = request.GET.copy() if request is not None else QueryDict(mutable=True)
+    for name in ("page", "after", "before"):
+        params.pop(name, None)
+    for name, value in kwargs.items():
+        if value is None:
+            params.pop(name, None)
+        else:
+            params[name] = value
+    return params.urlencode()
+
+
 @register.filter
 def is_admin(org, user):
     return org.is_admin(user)
@@ -16,4 +64,4 @@ def is_admin(org, user):
 
 @register.filter
 def is_owner(org, user):
-    return org.owner.organization_user.user == user
+    return org.is_owner(user)
@@ -17,6 +17,11 @@ urlpatterns = [
         view=login_required(views.OrganizationCreate.as_view()),
         name="organization_add",
     ),
+    path(
+        "slug-availability/",
+        view=login_required(views.SlugAvailability.as_view()),
+        name="organization_slug_availability",
+    ),
     path(
         "<int:organization_pk>/",
         include(
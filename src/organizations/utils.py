@@ -1,4 +1,14 @@
-from itertools import chain
+from django.db import connections
+from django.db import router
+from django.db import transaction
+
+from asgiref.sync import sync_to_async
+
+from organizations.cache import membership_cache
+from organizations.counters import has_counters
+from organizations.registry import registry
+from organizations.slugs import allocate_slugs
+from organizations.slugs import get_slug_field
 
 
 def default_org_model():
@@ -14,17 +24,28 @@ def model_field_names(model):
 
     Direct from Django upgrade migration guide.
     """
-    return list(
-        set(
-            chain.from_iterable(
-                (field.name, field.attname)
-                if hasattr(field, "attname")
-                else (field.name,)
-                for field in model._meta.get_fields()
-                if not (field.many_to_one and field.related_model is None)
-            )
-        )
-    )
+    return list(registry.field_names(model))
+
+
+def _organization_defaults(
+    has_is_admin, user, name, slug, is_active, org_defaults, org_user_defaults
+):
+    if org_defaults is None:
+        org_defaults = {}
+    if org_user_defaults is None:
+        if has_is_admin:
+            org_user_defaults = {"is_admin": True}
+        else:
+            org_user_defaults = {}
+
+    if slug is not None:
+        org_defaults.update({"slug": slug})
+    if is_active is not None:
+        org_defaults.update({"is_active": is_active})
+
+    org_defaults.update({"name": name})
+    org_user_defaults.update({"user": user})
+    return org_defaults, org_user_defaults
 
 
 def _resolve_organization_models(
@@ -44,24 +65,12 @@ def _resolve_organization_models(
     )
     kwargs.pop("org_user_model", None)  # Discard deprecated argument
 
-    org_owner_model = org_model.owner.related.related_model
-    org_user_model = org_model.organization_users.rel.related_model
-
-    if org_defaults is None:
-        org_defaults = {}
-    if org_user_defaults is None:
-        if "is_admin" in model_field_names(org_user_model):
-            org_user_defaults = {"is_admin": True}
-        else:
-            org_user_defaults = {}
-
-    if slug is not None:
-        org_defaults.update({"slug": slug})
-    if is_active is not None:
-        org_defaults.update({"is_active": is_active})
-
-    org_defaults.update({"name": name})
-    org_user_defaults.update({"user": user})
+    family = registry.family(org_model)
+    org_user_model, org_owner_model = family.organization_user, family.owner
+    has_is_admin = registry.has_field(org_user_model, "is_admin")
+    org_defaults, org_user_defaults = _organization_defaults(
+        has_is_admin, user, name, slug, is_active, org_defaults, org_user_defaults
+    )
     return org_model, org_user_model, org_owner_model, org_defaults, org_user_defaults
 
 
@@ -139,9 +148,130 @@ async def acreate_organization(
     return organization
 
 
+def _can_bulk_create(org_model, slug_field):
+    """
+    Returns True if the organizations can be bulk inserted and their primary
+    keys learned without a query per organization.
+    """
+    if org_model._meta.parents:
+        # Multi-table inherited models cannot be bulk inserted
+        return False
+    connection = connections[router.db_for_write(org_model)]
+    return (
+        connection.features.can_return_rows_from_bulk_insert or slug_field is not None
+    )
+
+
+def create_organizations(specs, model=None, batch_size=None):
+    """
+    Creates an organization for each spec, each with an initial organization
+    user who is the owner, and returns the new organizations.
+
+    Each spec is a dictionary of ``create_organization`` arguments: ``user``
+    and ``name``, and optionally ``slug``, ``is_active``, ``org_defaults``,
+    and ``org_user_defaults``. Organizations without a slug are allocated
+    unique slugs from their names.
+
+    The organizations, organization users, and owners are each inserted with
+    a single bulk insert per ``batch_size`` rows. Backends which cannot return
+    the primary keys of bulk inserted rows take one more query to read them,
+    or for models without a slug, insert the organizations one at a time, as
+    do multi-table inherited organization models.
+
+    >>> from organizations.utils import create_organizations
+    >>> create_organizations(
+    ...     [{"user": dave, "name": "Acme"}, {"user": kurt, "name": "Nirvana"}]
+    ... )
+
+    """
+    org_model = model or default_org_model()
+    family = registry.family(org_model)
+    org_user_model, org_owner_model = family.organization_user, family.owner
+    has_is_admin = registry.has_field(org_user_model, "is_admin")
+    rows = [
+        _organization_defaults(
+            has_is_admin,
+            spec["user"],
+            spec["name"],
+            spec.get("slug"),
+            spec.get("is_active"),
+            dict(spec.get("org_defaults") or {}),
+            (
+                dict(spec["org_user_defaults"])
+                if spec.get("org_user_defaults") is not None
+                else None
+            ),
+        )
+        for spec in specs
+    ]
+    if not rows:
+        return []
+
+    organizations = [org_model(**org_defaults) for org_defaults, _ in rows]
+    if has_counters(org_model):
+        # The bulk inserted organization users bypass the counter updates
+        for organization, (_, org_user_defaults) in zip(organizations, rows):
+            organization.member_count = 1
+            organization.admin_count = int(bool(org_user_defaults.get("is_admin")))
+    slug_field = get_slug_field(org_model)
+
+    with transaction.atomic(using=router.db_for_write(org_model)):
+        allocate_slugs(org_model, organizations)
+        if _can_bulk_create(org_model, slug_field):
+            org_model.objects.bulk_create(organizations, batch_size=batch_size)
+            if organizations[0].pk is None:
+                pks = dict(
+                    org_model._base_manager.filter(
+                        **{
+                            "{0}__in".format(slug_field.attname): [
+                                getattr(org, slug_field.attname)
+                                for org in organizations
+                            ]
+                        }
+                    ).values_list(slug_field.attname, "pk")
+                )
+                for organization in organizations:
+                    organization.pk = pks[getattr(organization, slug_field.attname)]
+                    organization._state.adding = False
+        else:
+            for organization in organizations:
+                organization.save()
+
+        org_users = [
+            org_user_model(organization=organization, **org_user_defaults)
+            for organization, (_, org_user_defaults) in zip(organizations, rows)
+        ]
+        org_user_model.objects.bulk_create(org_users, batch_size=batch_size)
+        if org_users[0].pk is None:
+            pks = dict(
+                org_user_model._base_manager.filter(
+                    organization__in=organizations
+                ).values_list("organization_id", "pk")
+            )
+            for org_user in org_users:
+                org_user.pk = pks[org_user.organization_id]
+                org_user._state.adding = False
+
+        org_owner_model.objects.bulk_create(
+            [
+                org_owner_model(organization=organization, organization_user=org_user)
+                for organization, org_user in zip(organizations, org_users)
+            ],
+            batch_size=batch_size,
+        )
+        membership_cache.invalidate_users(org_user_model, org_users)
+    return organizations
+
+
+async def acreate_organizations(specs, model=None, batch_size=None):
+    """Async version of ``create_organizations``."""
+    return await sync_to_async(create_organizations)(
+        list(specs), model=model, batch_size=batch_size
+    )
+
+
 def model_field_attr(model, model_field, attr):
     """
     Returns the specified attribute for the specified field on the model class.
     """
-    fields = dict([(field.name, field) for field in model._meta.fields])
-    return getattr(fields[model_field], attr)
+    return getattr(registry.fields(model)[model_field], attr)
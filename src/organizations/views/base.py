@@ -1,9 +1,16 @@
+from django.contrib.auth import get_user_model
 from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
 from django.http import HttpResponseGone
+from django.http import JsonResponse
 from django.shortcuts import redirect
+from django.template.defaultfilters import slugify
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext as _
+from django.views import View
 from django.views.generic import CreateView
 from django.views.generic import DeleteView
 from django.views.generic import DetailView
@@ -18,13 +25,17 @@ from organizations.forms import OrganizationForm
 from organizations.forms import OrganizationUserAddForm
 from organizations.forms import OrganizationUserForm
 from organizations.forms import SignUpForm
+from organizations.slugs import available_slug
 from organizations.utils import create_organization
+from organizations.views.mixins import KeysetPaginationMixin
 from organizations.views.mixins import OrganizationMixin
 from organizations.views.mixins import OrganizationUserMixin
 
 
-class BaseOrganizationList(ListView):
+class BaseOrganizationList(KeysetPaginationMixin, ListView):
     context_object_name = "organizations"
+    keyset_ordering = ("name", "pk")
+    paginate_by = 100
 
     def get_queryset(self):
         return self.org_model.active.filter(users=self.request.user)
@@ -65,16 +76,51 @@ class BaseOrganizationDelete(OrganizationMixin, DeleteView):
         return reverse("organization_list")
 
 
-class BaseOrganizationUserList(OrganizationMixin, ListView):
+class BaseOrganizationUserList(KeysetPaginationMixin, OrganizationMixin, ListView):
+    """
+    Lists the organization's users a page at a time, ordered by user.
+
+    The list is filtered by the ``q`` query parameter, matched case
+    insensitively against the start of each of the ``search_fields`` (by
+    default the user's username and email fields). The match is checked for
+    each of the organization's memberships, found by the ``(organization,
+    user)`` index, so a search costs in proportion to the organization's
+    size rather than using an index on the user fields.
+    """
+
+    context_object_name = "organization_users"
+    keyset_ordering = ("user_id", "pk")
+    paginate_by = 100
+    search_param = "q"
+    search_fields = None
+
+    def get_search_fields(self):
+        if self.search_fields is not None:
+            return self.search_fields
+        user_model = get_user_model()
+        fields = [user_model.USERNAME_FIELD, user_model.get_email_field_name()]
+        return ["user__{0}".format(field) for field in dict.fromkeys(fields)]
+
+    def get_search_query(self):
+        return self.request.GET.get(self.search_param, "").strip()
+
+    def get_queryset(self):
+        queryset = self.organization.organization_users.select_related("user")
+        query = self.get_search_query()
+        if query:
+            condition = Q()
+            for field in self.get_search_fields():
+                condition |= Q(**{"{0}__istartswith".format(field): query})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault("search_query", self.get_search_query())
+        return super().get_context_data(**kwargs)
+
     def get(self, request, *args, **kwargs):
         self.organization = self.get_organization()
-        self.object_list = self.organization.organization_users.all()
-        context = self.get_context_data(
-            object_list=self.object_list,
-            organization_users=self.object_list,
-            organization=self.organization,
-        )
-        return self.render_to_response(context)
+        return super().get(request, *args, **kwargs)
 
 
 class BaseOrganizationUserDetail(OrganizationUserMixin, DetailView):
@@ -143,6 +189,9 @@ class BaseOrganizationUserRemind(OrganizationUserMixin, DetailView):
                 "sender": request.user,
             },
         )
+        type(self.object)._base_manager.filter(pk=self.object.pk).update(
+            last_reminded_at=timezone.now()
+        )
         return redirect(self.get_success_url())
 
 
@@ -199,6 +248,37 @@ class OrganizationSignup(FormView):
         return redirect(self.get_success_url())
 
 
+class BaseSlugAvailability(View):
+    """
+    Returns, as JSON, whether the slug given as ``slug`` (or the slug for the
+    organization name given as ``name``) is available, and the first
+    available variant of it, e.g. for checking a signup form as it is filled
+    in.
+
+    Responses are cached for ``cache_timeout`` seconds.
+    """
+
+    cache_timeout = 30
+
+    def get(self, request, *args, **kwargs):
+        slug = slugify(request.GET.get("slug") or request.GET.get("name") or "")
+        if not slug:
+            return JsonResponse({"error": _("A slug or name is required")}, status=400)
+        key = "orgs:slug-availability:{0}:{1}".format(
+            self.org_model._meta.label_lower, slug
+        )
+        data = cache.get(key)
+        if data is None:
+            suggestion = available_slug(self.org_model, slug)
+            data = {
+                "slug": slug,
+                "available": suggestion == slug,
+                "suggestion": suggestion,
+            }
+            cache.set(key, data, self.cache_timeout)
+        return JsonResponse(data)
+
+
 class ViewFactory:
     """
     A class that can create a faked 'module' with model specific views
@@ -274,3 +354,9 @@ class ViewFactory:
         klass = BaseOrganizationUserRemind
         klass.org_model = self.org_model
         return klass
+
+    @property
+    def SlugAvailability(self):
+        klass = BaseSlugAvailability
+        klass.org_model = self.org_model
+        return klass
@@ -53,3 +53,7 @@ class OrganizationUserRemind(AdminRequiredMixin, bases.OrganizationUserRemind):
 
 class OrganizationUserDelete(AdminRequiredMixin, bases.OrganizationUserDelete):
     pass
+
+
+class SlugAvailability(bases.SlugAvailability):
+    pass
@@ -1,10 +1,12 @@
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from organizations.models import Organization
 from organizations.models import OrganizationUser
+from organizations.pagination import request_page
 
 
 class OrganizationMixin:
@@ -74,17 +76,62 @@ class OrganizationUserMixin(OrganizationMixin):
         return self.organization_user
 
 
+class KeysetPaginationMixin:
+    """
+    Mixin for list views which paginates by keyset on ``keyset_ordering``
+    rather than by page number, so that deep pages are as fast as the first.
+
+    Pages hold ``paginate_by`` rows and the template's ``page_obj`` is a
+    ``KeysetPage``. Page numbers are used instead if ``get_page_numbers``
+    returns True, e.g. for lists known to be short.
+    """
+
+    keyset_ordering = ("pk",)
+    page_numbers = False
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_page_numbers(self):
+        return self.page_numbers
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_page_numbers():
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = request_page(
+                self.request, queryset, self.get_keyset_ordering(), page_size
+            )
+        except ValueError:
+            raise Http404(_("Invalid page."))
+        return (None, page, page.object_list, page.has_other_pages())
+
+
+def request_roles(request):
+    """
+    Returns the request's ``OrganizationRoles`` resolver, if the roles
+    middleware is installed and the resolver answers for the request user.
+    """
+    roles = getattr(request, "org_roles", None)
+    if roles is not None and roles.handles(request.user):
+        return roles
+    return None
+
+
 class MembershipRequiredMixin:
     """This mixin presumes that authentication has already been checked"""
 
+    def user_is_member(self, request):
+        roles = request_roles(request)
+        if roles is not None:
+            return roles.is_member(self.organization)
+        return self.organization.is_member(request.user)
+
     def dispatch(self, request, *args, **kwargs):
         self.request = request
         self.args = args
         self.kwargs = kwargs
-        if (
-            not self.organization.is_member(request.user)
-            and not request.user.is_superuser
-        ):
+        if not self.user_is_member(request) and not request.user.is_superuser:
             raise PermissionDenied(_("Wrong organization"))
         return super().dispatch(request, *args, **kwargs)
 
@@ -92,14 +139,17 @@ class MembershipRequiredMixin:
 class AdminRequiredMixin:
     """This mixin presumes that authentication has already been checked"""
 
+    def user_is_admin(self, request):
+        roles = request_roles(request)
+        if roles is not None:
+            return roles.is_admin(self.organization)
+        return self.organization.is_admin(request.user)
+
     def dispatch(self, request, *args, **kwargs):
         self.request = request
         self.args = args
         self.kwargs = kwargs
-        if (
-            not self.organization.is_admin(request.user)
-            and not request.user.is_superuser
-        ):
+        if not self.user_is_admin(request) and not request.user.is_superuser:
             raise PermissionDenied(_("Sorry, admins only"))
         return super().dispatch(request, *args, **kwargs)
 
@@ -107,13 +157,16 @@ class AdminRequiredMixin:
 class OwnerRequiredMixin:
     """This mixin presumes that authentication has already been checked"""
 
+    def user_is_owner(self, request):
+        roles = request_roles(request)
+        if roles is not None:
+            return roles.is_owner(self.organization)
+        return self.organization.owner.organization_user.user == request.user
+
     def dispatch(self, request, *args, **kwargs):
         self.request = request
         self.args = args
         self.kwargs = kwargs
-        if (
-            self.organization.owner.organization_user.user != request.user
-            and not request.user.is_superuser
-        ):
+        if not self.user_is_owner(request) and not request.user.is_superuser:
             raise PermissionDenied(_("You are not the organization owner"))
         return super().dispatch(request, *args, **kwargs)
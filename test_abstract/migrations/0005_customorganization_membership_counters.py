@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("test_abstract", "0004_alter_customorganization_slug"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customorganization",
+            name="admin_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="customorganization",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="customorganization",
+            name="pending_invitation_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from organizations.migration_utils import invitee_key_operations
+
+
+class Migration(migrations.Migration):
+    # The unique index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("test_abstract", "0007_custominvitation_expires_at"),
+    ]
+
+    operations = invitee_key_operations("test_abstract", "CustomInvitation")
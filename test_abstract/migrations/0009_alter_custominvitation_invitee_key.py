@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from organizations.migration_utils import invitee_key_index_operations
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("test_abstract", "0008_custominvitation_invitee_key"),
+    ]
+
+    operations = invitee_key_index_operations("test_abstract", "CustomInvitation")
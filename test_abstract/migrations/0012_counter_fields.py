@@ -0,0 +1,27 @@
+from django.db import migrations
+
+import organizations.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("test_abstract", "0011_alter_customuser_unique_together"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customorganization",
+            name="admin_count",
+            field=organizations.fields.CounterField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="customorganization",
+            name="member_count",
+            field=organizations.fields.CounterField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="customorganization",
+            name="pending_invitation_count",
+            field=organizations.fields.CounterField(default=0, editable=False),
+        ),
+    ]
@@ -5,9 +5,10 @@ from organizations.abstract import AbstractOrganization
 from organizations.abstract import AbstractOrganizationInvitation
 from organizations.abstract import AbstractOrganizationOwner
 from organizations.abstract import AbstractOrganizationUser
+from organizations.abstract import MembershipCountersMixin
 
 
-class CustomOrganization(AbstractOrganization):
+class CustomOrganization(AbstractOrganization, MembershipCountersMixin):
     street_address = models.CharField(max_length=100, default="")
     city = models.CharField(max_length=100, default="")
 
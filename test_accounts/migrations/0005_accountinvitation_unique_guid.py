@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from organizations.migration_utils import unique_guid_operations
+
+
+class Migration(migrations.Migration):
+    # The unique index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("test_accounts", "0004_alter_account_users_and_more"),
+    ]
+
+    operations = unique_guid_operations("test_accounts", "AccountInvitation")
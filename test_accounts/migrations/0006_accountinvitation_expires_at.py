@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db import models
+
+import organizations.invitations
+from organizations.migration_utils import field_index_operations
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("test_accounts", "0005_accountinvitation_unique_guid"),
+    ]
+
+    operations = [
+        # Added without the default first, so that existing invitations are
+        # left without an expiry
+        migrations.AddField(
+            model_name="accountinvitation",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="The invitation cannot be accepted after this time",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="accountinvitation",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                default=organizations.invitations.default_expires_at,
+                help_text="The invitation cannot be accepted after this time",
+                null=True,
+            ),
+        ),
+        *field_index_operations(
+            "test_accounts",
+            "AccountInvitation",
+            "expires_at",
+            models.DateTimeField(
+                blank=True,
+                default=organizations.invitations.default_expires_at,
+                help_text="The invitation cannot be accepted after this time",
+                null=True,
+            ),
+        ),
+    ]
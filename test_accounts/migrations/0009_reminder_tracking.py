@@ -0,0 +1,62 @@
+import django.utils.timezone
+from django.db import migrations
+from django.db import models
+
+from organizations.migration_utils import field_index_operations
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("test_accounts", "0008_alter_accountinvitation_invitee_key"),
+    ]
+
+    operations = [
+        # Added without the default first, so that existing invitations are
+        # left without a send time
+        migrations.AddField(
+            model_name="accountinvitation",
+            name="last_sent_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the invitation, or a reminder of it, was last sent",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="accountinvitation",
+            name="last_sent_at",
+            field=models.DateTimeField(
+                blank=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="When the invitation, or a reminder of it, was last sent",
+                null=True,
+            ),
+        ),
+        *field_index_operations(
+            "test_accounts",
+            "AccountInvitation",
+            "last_sent_at",
+            models.DateTimeField(
+                blank=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="When the invitation, or a reminder of it, was last sent",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="accountuser",
+            name="last_reminded_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the user was last reminded of their invitation",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.db import migrations
+
+from organizations.migration_utils import organization_user_unique_operations
+
+
+class Migration(migrations.Migration):
+    # The unique index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ("test_accounts", "0009_reminder_tracking"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = organization_user_unique_operations("test_accounts", "AccountUser")
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from organizations.migration_utils import unique_guid_operations
+
+
+class Migration(migrations.Migration):
+    # The unique index is built concurrently on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        (
+            "test_vendors",
+            "0004_alter_vendor_users_alter_vendorinvitation_invited_by_and_more",
+        ),
+    ]
+
+    operations = unique_guid_operations("test_vendors", "VendorInvitation")
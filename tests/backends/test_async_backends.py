@@ -0,0 +1,159 @@
+"""
+Tests for the async (``a``-prefixed) backend API
+"""
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.http import HttpResponse
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from organizations.backends.defaults import InvitationBackend
+from organizations.backends.defaults import RegistrationBackend
+from organizations.backends.modeled import ModelInvitation
+from organizations.models import Organization
+from organizations.models import OutboxMessage
+from organizations.utils import create_organization
+from test_accounts.models import Account
+from test_accounts.models import AccountInvitation
+from tests.utils import request_factory_login
+
+
+@override_settings(USE_TZ=True)
+class AsyncInvitationTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.user = User.objects.get(username="krist")
+        self.pending_user = User.objects.create_user(
+            username="theresa", email="t@example.com", password="test"
+        )
+        self.pending_user.is_active = False
+        self.pending_user.save()
+
+    async def test_ainvite_by_email(self):
+        invited = await InvitationBackend().ainvite_by_email(
+            "sedgewick@example.com", sender=self.user
+        )
+        self.assertFalse(invited.is_active)
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual(["sedgewick@example.com"], mail.outbox[0].to)
+
+        self.assertEqual(
+            self.user, await InvitationBackend().ainvite_by_email(self.user.email)
+        )
+        self.assertEqual(1, len(mail.outbox))  # User is active
+
+    async def test_asend_invitations(self):
+        backend = InvitationBackend()
+        sent = await backend.asend_invitations([self.pending_user, self.user])
+        self.assertEqual(1, sent)
+        self.assertEqual(1, await backend.asend_reminders([self.pending_user]))
+        self.assertFalse(await backend.asend_invitation(self.user))
+        self.assertEqual(2, len(mail.outbox))
+
+    async def test_asend_notification(self):
+        org = await Organization.objects.aget(name="Nirvana")
+        backend = InvitationBackend()
+        self.assertFalse(await backend.asend_notification(self.pending_user))
+        self.assertEqual(
+            1,
+            await backend.asend_notification(
+                self.user, organization=org, domain={"name": "x", "domain": "x"}
+            ),
+        )
+        self.assertEqual(1, len(mail.outbox))
+
+    @override_settings(ORGS_EMAIL_OUTBOX=True)
+    async def test_outbox(self):
+        await InvitationBackend().asend_invitation(self.pending_user)
+        self.assertEqual(0, len(mail.outbox))
+        self.assertEqual(1, await OutboxMessage.objects.acount())
+
+    async def test_arun_view_sends_after_view(self):
+        backend = InvitationBackend()
+        outbox_sizes = []
+
+        def view(request):
+            backend.send_invitation(self.pending_user)
+            outbox_sizes.append(len(mail.outbox))
+            return HttpResponse()
+
+        response = await backend.arun_view(view, RequestFactory().get("/"))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([0], outbox_sizes)
+        self.assertEqual(1, len(mail.outbox))
+
+
+@override_settings(USE_TZ=True)
+class AsyncRegistrationTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    async def test_aregister_by_email(self):
+        registered = await RegistrationBackend().aregister_by_email(
+            "greenway@example.com"
+        )
+        self.assertFalse(registered.is_active)
+        self.assertEqual(1, len(mail.outbox))
+
+    async def test_acreate_view(self):
+        request = request_factory_login(RequestFactory())
+        request.POST = QueryDict("name=Mudhoney&slug=mudhoney&email=mark@example.com")
+        response = await RegistrationBackend().acreate_view(request)
+        self.assertEqual(200, response.status_code)
+        organization = await Organization.objects.aget(slug="mudhoney")
+        self.assertFalse(organization.is_active)
+
+
+@override_settings(USE_TZ=True)
+class AsyncModelInvitationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="AccountUser", email="a@example.com")
+        self.account = create_organization(self.user, "Acme", org_model=Account)
+
+    async def test_ainvite_by_email(self):
+        backend = ModelInvitation(org_model=Account)
+        invitation = await backend.ainvite_by_email(
+            "Bob@Example.com", user=self.user, organization=self.account
+        )
+        self.assertIsInstance(invitation, AccountInvitation)
+        self.assertEqual("bob@example.com", invitation.invitee_identifier)
+        self.assertEqual(["bob@example.com"], mail.outbox[0].to)
+
+        self.assertEqual(1, await backend.asend_invitations([invitation]))
+        self.assertEqual(2, len(mail.outbox))
+
+        repeat = await backend.ainvite_by_email(
+            "bob@example.com", user=self.user, organization=self.account
+        )
+        self.assertEqual(invitation.pk, repeat.pk)
+        self.assertEqual(3, len(mail.outbox))
+        self.assertEqual(1, await AccountInvitation.objects.acount())
+
+    async def test_aactivation_router(self):
+        invitation = await AccountInvitation.objects.acreate(
+            invitee_identifier="bob@example.com",
+            invitee=self.user,
+            invited_by=self.user,
+            organization=self.account,
+        )
+        request = request_factory_login(RequestFactory())
+        response = await ModelInvitation(org_model=Account).aactivation_router(
+            request, invitation.guid
+        )
+        self.assertEqual(302, response.status_code)
+
+    async def test_aaccept_pending_invitations(self):
+        await AccountInvitation.objects.acreate(
+            invitee_identifier="bob@example.com",
+            invited_by=self.user,
+            organization=self.account,
+        )
+        bob = await User.objects.acreate(username="bob", email="Bob@example.com")
+        [org_user] = await ModelInvitation(
+            org_model=Account
+        ).aaccept_pending_invitations(bob)
+        self.assertEqual(self.account.pk, org_user.organization_id)
+        self.assertTrue(await AccountInvitation.objects.filter(invitee=bob).aexists())
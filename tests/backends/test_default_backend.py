@@ -1,10 +1,14 @@
+import threading
 import uuid
+from unittest import mock
 
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.core import mail
+from django.core.mail import get_connection
 from django.http import Http404
 from django.http import QueryDict
+from django.template import loader
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
@@ -12,6 +16,9 @@ from django.urls import reverse
 
 import pytest
 
+from organizations.backends import clear_backend_cache
+from organizations.backends import invitation_backend
+from organizations.backends import registration_backend
 from organizations.backends.defaults import BaseBackend
 from organizations.backends.defaults import InvitationBackend
 from organizations.backends.defaults import RegistrationBackend
@@ -87,6 +94,47 @@ class TestInvitations(TestCase):
         self.assertEqual(1, len(mail.outbox))  # User is active
         mail.outbox = []
 
+    def test_send_invitations(self):
+        other = User.objects.create_user(
+            username="marcel", email="m@example.com", password="test"
+        )
+        other.is_active = False
+        other.save()
+        backend = InvitationBackend()
+        with mock.patch(
+            "organizations.outbox.get_connection", wraps=get_connection
+        ) as connection:
+            sent = backend.send_invitations(
+                [self.pending_user, self.user, other], sender=self.user
+            )
+        self.assertEqual(2, sent)
+        self.assertEqual(1, connection.call_count)
+        self.assertEqual(
+            [["t@example.com"], ["m@example.com"]], [m.to for m in mail.outbox]
+        )
+        self.assertNotEqual(mail.outbox[0].body, mail.outbox[1].body)
+
+    def test_send_reminders(self):
+        backend = InvitationBackend()
+        with mock.patch(
+            "organizations.outbox.get_connection", wraps=get_connection
+        ) as connection:
+            self.assertEqual(1, backend.send_reminders([self.pending_user, self.user]))
+            self.assertEqual(0, backend.send_reminders([self.user]))
+        self.assertEqual(1, connection.call_count)
+        self.assertEqual(1, len(mail.outbox))
+
+    def test_templates_are_cached(self):
+        backend = InvitationBackend()
+        with mock.patch(
+            "organizations.backends.defaults.loader.get_template",
+            wraps=loader.get_template,
+        ) as get_template:
+            backend.send_invitations([self.pending_user])
+            backend.send_invitations([self.pending_user])
+        self.assertEqual(2, get_template.call_count)
+        self.assertEqual(2, len(mail.outbox))
+
     def test_urls(self):
         """Ensure no error is raised"""
         reverse(
@@ -242,6 +290,47 @@ class TestConfiguration:
             backend.get_form()
 
 
+class TestBackendCache:
+    def setup_method(self):
+        clear_backend_cache()
+
+    def teardown_method(self):
+        clear_backend_cache()
+
+    def test_backends_are_reused(self):
+        assert invitation_backend() is invitation_backend()
+        assert registration_backend() is registration_backend()
+        assert invitation_backend() is not registration_backend()
+
+    def test_cached_per_path_and_namespace(self):
+        modeled = "organizations.backends.modeled.ModelInvitation"
+        assert invitation_backend(namespace="a") is invitation_backend(namespace="a")
+        assert invitation_backend(namespace="a") is not invitation_backend()
+        assert invitation_backend(namespace="a").namespace == "a"
+        assert invitation_backend(modeled) is not invitation_backend()
+        assert invitation_backend(modeled) is invitation_backend(modeled)
+
+    def test_clear_backend_cache(self):
+        backend = invitation_backend()
+        clear_backend_cache()
+        assert invitation_backend() is not backend
+        assert isinstance(invitation_backend(), InvitationBackend)
+
+    def test_concurrent_first_use(self):
+        backends = []
+
+        def get_backend():
+            backends.append(invitation_backend(namespace="threads"))
+
+        threads = [threading.Thread(target=get_backend) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(backends) == 8
+        assert len({id(backend) for backend in backends}) == 1
+
+
 class TestBackendNamespacing:
     def test_registration_create(self):
         assert reverse("registration_create")
@@ -2,14 +2,23 @@
 Tests for the model based invitation backend
 """
 
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth.models import User
 from django.core import mail
+from django.core.mail import get_connection
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import QuerySet
 
 import pytest
 
 from organizations.backends.defaults import InvitationBackend
 from organizations.backends.modeled import ModelInvitation
 from organizations.base import OrganizationInvitationBase
+from organizations.exceptions import InvitationAlreadyAccepted
+from organizations.invitations import identifier_key
 from organizations.utils import create_organization
 from test_abstract.models import CustomOrganization
 from test_accounts.models import Account
@@ -100,6 +109,27 @@ class TestInvitationModelBackend:
         response = client.get(invitation.get_absolute_url())
         assert response.status_code == 200
 
+    def test_send_invitations(self, invitation_backend, account_user, account_account):
+        invitations = [
+            AccountInvitation.objects.create(
+                invitee_identifier=email,
+                invited_by=account_user,
+                organization=account_account,
+            )
+            for email in ("a@newuser.com", "b@newuser.com", "c@newuser.com")
+        ]
+        outbox_count = len(mail.outbox)
+        with mock.patch(
+            "organizations.outbox.get_connection", wraps=get_connection
+        ) as connection:
+            assert invitation_backend.send_invitations(invitations) == 3
+        assert connection.call_count == 1
+        assert [message.to for message in mail.outbox[outbox_count:]] == [
+            ["a@newuser.com"],
+            ["b@newuser.com"],
+            ["c@newuser.com"],
+        ]
+
     def test_new_user_accepts_invitation(
         self, invitation_backend, account_user, account_account, client
     ):
@@ -158,3 +188,209 @@ class TestInvitationModelBackend:
         client.force_login(invitee_user)
         response = client.get(invitation.get_absolute_url())
         assert response.status_code == 302
+
+
+class TestAcceptInvitationOnce:
+    def test_activate_claims_invitation(
+        self,
+        email_invitation,
+        invitee_user,
+        account_account,
+        django_assert_num_queries,
+    ):
+        stale = AccountInvitation.objects.get(pk=email_invitation.pk)
+        # The claim and the membership insert in a savepoint
+        with django_assert_num_queries(4):
+            email_invitation.activate(invitee_user)
+        assert email_invitation.invitee == invitee_user
+
+        with pytest.raises(InvitationAlreadyAccepted):
+            stale.activate(invitee_user)
+        assert account_account.organization_users.filter(user=invitee_user).count() == 1
+
+    def test_existing_user_accepts_concurrently(
+        self, invitation_backend, email_invitation, invitee_user, account_user, rf
+    ):
+        stale = AccountInvitation.objects.get(pk=email_invitation.pk)
+        email_invitation.activate(invitee_user)
+        request = rf.post("/")
+        request.user = invitee_user
+        response = invitation_backend.activate_existing_user_view(request, stale)
+        assert response.status_code == 302
+
+    def test_new_user_accepts_concurrently(
+        self, invitation_backend, email_invitation, invitee_user, rf
+    ):
+        stale = AccountInvitation.objects.get(pk=email_invitation.pk)
+        email_invitation.activate(invitee_user)
+        request = rf.post(
+            "/",
+            data={
+                "username": "heehaw",
+                "email": "heehaw@hello.com",
+                "password1": "aksjdf83k1j!!",
+                "password2": "aksjdf83k1j!!",
+            },
+        )
+        request.user = AnonymousUser()
+        response = invitation_backend.activate_new_user_view(request, stale)
+        assert response.status_code == 302
+        assert response.url == invitation_backend.get_invitation_accepted_url()
+        assert not User.objects.filter(username="heehaw").exists()
+
+
+class TestRepeatInvitation:
+    def test_repeat_invitation_is_refreshed(
+        self, invitation_backend, account_user, account_account, invitee_user
+    ):
+        first = invitation_backend.invite_by_email(
+            "Bob@Example.com", user=account_user, organization=account_account
+        )
+        outbox_count = len(mail.outbox)
+        second = invitation_backend.invite_by_email(
+            " bob@example.com", user=invitee_user, organization=account_account
+        )
+        assert second.pk == first.pk
+        assert second.guid == first.guid
+        assert second.invited_by == invitee_user
+        assert second.invitee_identifier == "bob@example.com"
+        assert len(mail.outbox) == outbox_count + 1
+        assert AccountInvitation.objects.count() == 1
+
+    def test_accepted_invitation_is_not_reused(
+        self, invitation_backend, account_user, account_account, invitee_user
+    ):
+        invitation = invitation_backend.invite_by_email(
+            invitee_user.email, user=account_user, organization=account_account
+        )
+        invitation.activate(invitee_user)
+        repeat = invitation_backend.invite_by_email(
+            invitee_user.email, user=account_user, organization=account_account
+        )
+        assert repeat.pk != invitation.pk
+        assert repeat.invitee is None
+
+    def test_pending_invitee_is_unique(self, account_user, account_account):
+        AccountInvitation.objects.create(
+            invitee_identifier="bob@example.com",
+            invited_by=account_user,
+            organization=account_account,
+        )
+        with pytest.raises(IntegrityError), transaction.atomic():
+            AccountInvitation.objects.create(
+                invitee_identifier="BOB@example.com",
+                invited_by=account_user,
+                organization=account_account,
+            )
+
+    def test_concurrently_created_invitation_is_used(
+        self, invitation_backend, account_user, account_account
+    ):
+        get = QuerySet.get
+        competing = []
+
+        def racing_get(queryset, *args, **kwargs):
+            if not competing:
+                # Another request creates the invitation after the lookup
+                competing.append(
+                    AccountInvitation.objects.create(
+                        invitee_identifier="bob@example.com",
+                        invited_by=account_user,
+                        organization=account_account,
+                    )
+                )
+                raise AccountInvitation.DoesNotExist
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "get", racing_get):
+            invitation = invitation_backend.invite_by_email(
+                "bob@example.com", user=account_user, organization=account_account
+            )
+        assert invitation.pk == competing[0].pk
+        assert AccountInvitation.objects.count() == 1
+
+
+class TestInviteMany:
+    def test_invite_many(self, invitation_backend, account_user, account_account):
+        outbox_count = len(mail.outbox)
+        result = invitation_backend.invite_many(
+            [" New@Example.com", "new@example.com", "", account_user.email.upper()],
+            user=account_user,
+            organization=account_account,
+        )
+        assert [i.invitee_identifier for i in result.invitations] == ["new@example.com"]
+        assert result.members == [account_user.email.lower()]
+        assert result.invited == []
+        assert len(mail.outbox) == outbox_count + 1
+
+        result = invitation_backend.invite_many(
+            ["new@example.com", "other@example.com"],
+            user=account_user,
+            organization=account_account,
+        )
+        assert [i.invitee_identifier for i in result.invitations] == [
+            "other@example.com"
+        ]
+        assert result.invited == ["new@example.com"]
+        assert (
+            AccountInvitation.objects.filter(organization=account_account).count() == 2
+        )
+        assert all(i.guid for i in AccountInvitation.objects.all())
+        assert all(i.pk for i in result.invitations)
+
+    def test_invite_many_race(self, invitation_backend, account_user, account_account):
+        outbox_count = len(mail.outbox)
+        bulk_create = QuerySet.bulk_create
+
+        def racing_bulk_create(queryset, objs, *args, **kwargs):
+            # Simulate a concurrent invitation of one of the addresses
+            AccountInvitation.objects.create(
+                invitee_identifier="bob@example.com",
+                invitee_key=identifier_key("bob@example.com"),
+                invited_by=account_user,
+                organization=account_account,
+            )
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "bulk_create", racing_bulk_create):
+            result = invitation_backend.invite_many(
+                ["bob@example.com", "new@example.com"],
+                user=account_user,
+                organization=account_account,
+            )
+        assert [i.invitee_identifier for i in result.invitations] == ["new@example.com"]
+        assert result.invitations[0].pk is not None
+        assert result.invited == ["bob@example.com"]
+        assert [m.to for m in mail.outbox[outbox_count:]] == [["new@example.com"]]
+
+    def test_queries(
+        self,
+        invitation_backend,
+        account_user,
+        account_account,
+        django_assert_num_queries,
+    ):
+        emails = ["{0}@example.com".format(i) for i in range(50)]
+        # Members, pending invitations, and the insert and the inserted rows'
+        # primary keys in a savepoint
+        with django_assert_num_queries(6):
+            invitation_backend.create_invitations(emails, account_user, account_account)
+        assert AccountInvitation.objects.count() == 50
+
+
+def test_activation_router_queries(
+    invitation_backend, email_invitation, invitee_user, rf, django_assert_num_queries
+):
+    request = rf.get("/")
+    request.user = invitee_user
+    # The invitation with its organization, inviter, and invitee in one query,
+    # then the template's lookups
+    with django_assert_num_queries(1, exact=False) as context:
+        invitation_backend.activation_router(request, email_invitation.guid)
+    invitation_queries = [
+        query["sql"]
+        for query in context.captured_queries
+        if "test_accounts_accountinvitation" in query["sql"]
+    ]
+    assert len(invitation_queries) == 1
+    assert 'INNER JOIN "test_accounts_account"' in invitation_queries[0]
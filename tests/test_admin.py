@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from organizations.admin import OrganizationUserAdmin
+from organizations.models import Organization
+from organizations.models import OrganizationUser
+
+
+@override_settings(USE_TZ=True)
+class OrganizationUserAdminTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(
+            "admin", email="admin@example.com", password="test"
+        )
+        self.client.force_login(self.superuser)
+        self.nirvana = Organization.objects.get(name="Nirvana")
+        self.url = reverse("admin:organizations_organizationuser_changelist")
+
+    def delete_selected(self, org_users, **data):
+        return self.client.post(
+            self.url,
+            {
+                "action": "delete_selected",
+                "_selected_action": [org_user.pk for org_user in org_users],
+                **data,
+            },
+            follow=True,
+        )
+
+    def test_delete_selected_refuses_owners(self):
+        org_users = list(self.nirvana.organization_users.all())
+        response = self.delete_selected(org_users, post="yes")
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, "Cannot delete organization owner")
+        self.assertEqual(3, self.nirvana.organization_users.count())
+
+    def test_delete_selected(self):
+        org_users = list(self.nirvana.organization_users.exclude(user__username="kurt"))
+        response = self.delete_selected(org_users)
+        self.assertContains(response, "Are you sure you want to delete")
+        self.delete_selected(org_users, post="yes")
+        self.assertEqual(
+            ["kurt"],
+            list(
+                OrganizationUser.objects.filter(organization=self.nirvana).values_list(
+                    "user__username", flat=True
+                )
+            ),
+        )
+
+    def test_delete_queryset_reports_owners(self):
+        model_admin = OrganizationUserAdmin(OrganizationUser, admin.site)
+        request = mock.Mock()
+        with mock.patch.object(model_admin, "message_user") as message_user:
+            model_admin.delete_queryset(
+                request, OrganizationUser.objects.filter(organization=self.nirvana)
+            )
+        message_user.assert_called_once_with(request, mock.ANY, messages.ERROR)
+        self.assertEqual(3, self.nirvana.organization_users.count())
@@ -18,6 +18,7 @@ from organizations.signals import owner_changed
 from organizations.signals import user_added
 from organizations.signals import user_removed
 from organizations.utils import acreate_organization
+from organizations.utils import acreate_organizations
 from test_accounts.models import Account
 from test_accounts.models import AccountInvitation
 
@@ -47,6 +48,14 @@ class AsyncOrgModelTests(TestCase):
         self.assertTrue(await self.foo.ais_member(self.dave))
         self.assertFalse(await self.foo.ais_member(self.kurt))
 
+    async def test_amembership_map(self):
+        memberships = await Organization.objects.amembership_map(
+            [self.kurt, self.dave], [self.nirvana, self.foo]
+        )
+        self.assertTrue(memberships[(self.kurt.pk, self.nirvana.pk)])
+        self.assertFalse(memberships[(self.kurt.pk, self.foo.pk)])
+        self.assertTrue(memberships[(self.dave.pk, self.foo.pk)])
+
     async def test_ais_admin(self):
         self.assertTrue(await self.nirvana.ais_admin(self.kurt))
         self.assertTrue(await self.nirvana.ais_admin(self.krist))
@@ -95,6 +104,23 @@ class AsyncOrgModelTests(TestCase):
         self.assertFalse(await self.foo.users.filter(pk=self.krist.pk).aexists())
         self.assertEqual(received, [self.krist])
 
+    async def test_aadd_users_and_aremove_users(self):
+        received = []
+
+        def receiver(sender, user, **kwargs):
+            received.append(user)
+
+        user_added.connect(receiver, weak=False)
+        try:
+            org_users = await self.foo.aadd_users([self.krist, self.duder])
+        finally:
+            user_added.disconnect(receiver)
+        self.assertEqual(len(org_users), 2)
+        self.assertEqual(set(received), {self.krist, self.duder})
+        removed = await self.foo.aremove_users([self.krist])
+        self.assertEqual(removed, [self.krist])
+        self.assertFalse(await self.foo.ais_member(self.krist))
+
     async def test_aget_or_add_user(self):
         new_guy, created = await self.foo.aget_or_add_user(self.duder)
         self.assertTrue(isinstance(new_guy, OrganizationUser))
@@ -161,8 +187,18 @@ class AsyncBaseOrganizationTests(TestCase):
             invited_by=self.kurt,
             organization=account,
         )
-        org_user = await invitation.aactivate(self.dave)
+        received = []
+
+        def receiver(sender, user, **kwargs):
+            received.append(user)
+
+        user_added.connect(receiver, weak=False)
+        try:
+            org_user = await invitation.aactivate(self.dave)
+        finally:
+            user_added.disconnect(receiver)
         self.assertEqual(org_user.organization_id, account.pk)
+        self.assertEqual(received, [self.dave])
         self.assertTrue(await account.ais_member(self.dave))
         refreshed = await AccountInvitation.objects.aget(pk=invitation.pk)
         self.assertEqual(refreshed.invitee_id, self.dave.pk)
@@ -182,3 +218,10 @@ class AsyncCreateOrganizationTests(TestCase):
         self.assertTrue(await org.ais_owner(self.dave))
         owner_org_user = await OrganizationUser.objects.aget(organization=org)
         self.assertTrue(owner_org_user.is_admin)
+
+    async def test_acreate_organizations(self):
+        orgs = await acreate_organizations(
+            [{"user": self.dave, "name": "Async"}, {"user": self.dave, "name": "Async"}]
+        )
+        self.assertEqual([org.slug for org in orgs], ["async", "async-2"])
+        self.assertTrue(await orgs[1].ais_owner(self.dave))
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import Group
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from organizations.cache import membership_cache
+from organizations.models import Organization
+from organizations.models import OrganizationUser
+from organizations.utils import create_organizations
+
+
+@override_settings(USE_TZ=True, ORGS_MEMBERSHIP_CACHE="default")
+class MembershipCacheTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        cache.clear()
+        membership_cache.reset_stats()
+        self.kurt = User.objects.get(username="kurt")
+        self.krist = User.objects.get(username="krist")
+        self.dave = User.objects.get(username="dave")
+        self.duder = User.objects.get(username="duder")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+        self.foo = Organization.objects.get(name="Foo Fighters")
+
+    def test_checks_are_cached(self):
+        self.assertTrue(self.nirvana.is_member(self.kurt))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.nirvana.is_member(self.kurt))
+            self.assertTrue(self.nirvana.is_admin(self.kurt))
+            self.assertTrue(self.nirvana.is_owner(self.kurt))
+            self.assertFalse(self.foo.is_member(self.kurt))
+        self.assertEqual(membership_cache.stats(), {"hits": 4, "misses": 1})
+
+    def test_reset_stats(self):
+        self.nirvana.is_member(self.kurt)
+        membership_cache.reset_stats()
+        self.assertEqual(membership_cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_add_and_remove_invalidate(self):
+        self.assertFalse(self.nirvana.is_member(self.duder))
+        self.nirvana.add_user(self.duder)
+        self.assertTrue(self.nirvana.is_member(self.duder))
+        self.nirvana.remove_user(self.duder)
+        self.assertFalse(self.nirvana.is_member(self.duder))
+
+    def test_owner_change_invalidates(self):
+        self.assertTrue(self.nirvana.is_owner(self.kurt))
+        self.assertFalse(self.nirvana.is_owner(self.krist))
+        self.nirvana.change_owner(self.nirvana.organization_users.get(user=self.krist))
+        self.assertFalse(self.nirvana.is_owner(self.kurt))
+        self.assertTrue(self.nirvana.is_owner(self.krist))
+
+    def test_save_invalidates(self):
+        self.assertFalse(self.nirvana.is_admin(self.dave))
+        org_user = OrganizationUser.objects.get(
+            organization=self.nirvana, user=self.dave
+        )
+        org_user.is_admin = True
+        org_user.save()
+        self.assertTrue(self.nirvana.is_admin(self.dave))
+
+    def test_delete_invalidates(self):
+        self.assertTrue(self.nirvana.is_member(self.dave))
+        OrganizationUser.objects.get(organization=self.nirvana, user=self.dave).delete()
+        self.assertFalse(self.nirvana.is_member(self.dave))
+
+    def test_bulk_create_invalidates(self):
+        self.assertFalse(self.foo.is_member(self.duder))
+        [org] = create_organizations([{"user": self.duder, "name": "Dudes"}])
+        self.assertTrue(org.is_member(self.duder))
+        self.assertTrue(org.is_owner(self.duder))
+
+    def test_receivers_are_connected_by_sender(self):
+        # Saves and deletes of other models, which keep their fast deletes,
+        # are not observed
+        for signal in (post_save, post_delete):
+            self.assertFalse(signal.has_listeners(Group))
+
+    @override_settings(ORGS_MEMBERSHIP_CACHE=None)
+    def test_disabled(self):
+        self.nirvana.is_member(self.kurt)
+        with self.assertNumQueries(1):
+            self.nirvana.is_member(self.kurt)
+        self.assertEqual(membership_cache.stats(), {"hits": 0, "misses": 0})
+
+
+@override_settings(USE_TZ=True, ORGS_MEMBERSHIP_CACHE="default")
+class AsyncMembershipCacheTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        cache.clear()
+        membership_cache.reset_stats()
+        self.kurt = User.objects.get(username="kurt")
+        self.dave = User.objects.get(username="dave")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+
+    async def test_async_checks_are_cached(self):
+        self.assertTrue(await self.nirvana.ais_member(self.kurt))
+        self.assertTrue(await self.nirvana.ais_admin(self.kurt))
+        self.assertTrue(await self.nirvana.ais_owner(self.kurt))
+        self.assertFalse(await self.nirvana.ais_admin(self.dave))
+        self.assertEqual(membership_cache.stats(), {"hits": 2, "misses": 2})
@@ -0,0 +1,100 @@
+"""
+Tests for membership changes made concurrently from multiple connections.
+
+These run against the file-backed SQLite test database, with each thread using
+its own database connection.
+"""
+
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+
+from organizations.models import Organization
+from organizations.models import OrganizationOwner
+from organizations.models import OrganizationUser
+
+
+def run_concurrently(func, args_list):
+    """Runs ``func`` once per args tuple, each in its own thread"""
+    barrier = threading.Barrier(len(args_list))
+    errors = []
+
+    def target(*args):
+        try:
+            barrier.wait()
+            func(*args)
+        except Exception as exc:  # pragma: no cover
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+@override_settings(USE_TZ=True)
+class ConcurrentAddUserTests(TransactionTestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(
+                username="user{}".format(i), email="u{}@x.com".format(i)
+            )
+            for i in range(6)
+        ]
+        self.org = Organization.objects.create(name="Race", slug="race")
+
+    def assert_single_owner(self):
+        self.assertEqual(
+            OrganizationUser.objects.filter(organization=self.org).count(), 6
+        )
+        self.assertEqual(
+            OrganizationOwner.objects.filter(organization=self.org).count(), 1
+        )
+        owner = OrganizationOwner.objects.get(organization=self.org)
+        admins = OrganizationUser.objects.filter(organization=self.org, is_admin=True)
+        self.assertEqual(list(admins), [owner.organization_user])
+
+    def test_concurrent_add_user(self):
+        def add(user):
+            Organization.objects.get(pk=self.org.pk).add_user(user)
+
+        errors = run_concurrently(add, [(user,) for user in self.users])
+        self.assertEqual(errors, [])
+        self.assert_single_owner()
+
+    def test_concurrent_get_or_add_user(self):
+        results = []
+
+        def get_or_add(user):
+            results.append(
+                Organization.objects.get(pk=self.org.pk).get_or_add_user(user)
+            )
+
+        # Each user is added twice, concurrently
+        errors = run_concurrently(get_or_add, [(user,) for user in self.users * 2])
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(created for _, created in results), 6)
+        self.assert_single_owner()
+
+    def test_constant_statements_per_add(self):
+        self.org.add_user(self.users[0])
+        self.org.add_user(self.users[1])
+        with CaptureQueriesContext(connection) as small:
+            self.org.add_user(self.users[2])
+        for user in self.users[3:]:
+            self.org.add_user(user)
+        org = Organization.objects.create(name="Big", slug="big")
+        for user in self.users:
+            org.add_user(user)
+        newcomer = User.objects.create(username="newcomer")
+        with CaptureQueriesContext(connection) as large:
+            org.add_user(newcomer)
+        self.assertEqual(len(small), len(large))
@@ -0,0 +1,154 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from organizations.counters import has_counters
+from organizations.models import Organization
+from organizations.utils import create_organization
+from test_abstract.models import CustomInvitation
+from test_abstract.models import CustomOrganization
+from test_abstract.models import CustomUser
+from test_accounts.models import Account
+
+
+@override_settings(USE_TZ=True)
+class MembershipCounterTests(TestCase):
+    fixtures = ["users.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.krist = User.objects.get(username="krist")
+        self.dave = User.objects.get(username="dave")
+        self.duder = User.objects.get(username="duder")
+        self.foo = create_organization(
+            self.dave, "Foo Fighters", model=CustomOrganization
+        )
+        self.nirvana = create_organization(
+            self.kurt, "Nirvana", model=CustomOrganization
+        )
+        self.nirvana.add_user(self.dave)
+        self.nirvana.add_user(self.krist, is_admin=True)
+
+    def assertCounts(self, org, members, admins, pending=0):
+        org.refresh_from_db()
+        self.assertEqual(
+            (org.member_count, org.admin_count, org.pending_invitation_count),
+            (members, admins, pending),
+        )
+
+    def test_default_model_has_no_counters(self):
+        self.assertFalse(has_counters(Organization))
+        self.assertTrue(has_counters(CustomOrganization))
+
+    def test_add_and_remove_user(self):
+        self.foo.add_user(self.krist)
+        self.assertCounts(self.foo, 2, 1)
+        self.foo.add_user(self.duder, is_admin=True)
+        self.assertCounts(self.foo, 3, 2)
+        self.foo.remove_user(self.duder)
+        self.assertCounts(self.foo, 2, 1)
+
+    def test_first_user_counted_as_admin(self):
+        org = CustomOrganization.objects.create(name="Empty", slug="empty")
+        org.add_user(self.duder)
+        self.assertCounts(org, 1, 1)
+
+    def test_create_organization(self):
+        self.assertCounts(self.foo, 1, 1)
+        self.assertCounts(self.nirvana, 3, 2)
+
+    def test_admin_status_change(self):
+        org_user = CustomUser.objects.get(organization=self.nirvana, user=self.dave)
+        org_user.is_admin = True
+        org_user.save()
+        self.assertCounts(self.nirvana, 3, 3)
+        org_user.save()
+        self.assertCounts(self.nirvana, 3, 3)
+        org_user.is_admin = False
+        org_user.save()
+        self.assertCounts(self.nirvana, 3, 2)
+
+    def test_delete_org_user(self):
+        CustomUser.objects.get(organization=self.nirvana, user=self.krist).delete()
+        self.assertCounts(self.nirvana, 2, 1)
+
+    def test_cascade_and_queryset_deletes(self):
+        # Cascades from the user
+        self.krist.delete()
+        self.assertCounts(self.nirvana, 2, 1)
+        CustomUser.objects.filter(organization=self.nirvana, user=self.dave).delete()
+        self.assertCounts(self.nirvana, 1, 1)
+
+    def test_organization_reinsert(self):
+        copy = CustomOrganization.objects.get(pk=self.foo.pk)
+        copy.pk = None
+        copy.slug = "foo-fighters-copy"
+        copy.save(force_insert=True)
+        self.assertCounts(copy, 1, 1)
+
+        # Saving a deleted organization inserts it again
+        CustomOrganization.objects.filter(pk=copy.pk).delete()
+        copy.save()
+        self.assertCounts(copy, 1, 1)
+
+    def test_organization_save_keeps_counters(self):
+        stale = CustomOrganization.objects.get(pk=self.foo.pk)
+        self.foo.add_user(self.krist)
+        stale.name = "Foo Fighters!"
+        stale.save()
+        self.assertCounts(self.foo, 2, 1)
+        self.assertEqual(self.foo.name, "Foo Fighters!")
+
+    def test_invitations(self):
+        invitation = CustomInvitation.objects.create(
+            invitee_identifier="new@example.com",
+            invited_by=self.kurt,
+            organization=self.foo,
+        )
+        self.assertCounts(self.foo, 1, 1, pending=1)
+        invitation = CustomInvitation.objects.get(pk=invitation.pk)
+        invitation.activate(self.duder)
+        self.assertCounts(self.foo, 2, 1, pending=0)
+        invitation.delete()
+        self.assertCounts(self.foo, 2, 1, pending=0)
+
+    def test_pending_invitation_deleted(self):
+        invitation = CustomInvitation.objects.create(
+            invitee_identifier="new@example.com",
+            invited_by=self.kurt,
+            organization=self.foo,
+        )
+        invitation.delete()
+        self.assertCounts(self.foo, 1, 1, pending=0)
+
+    def test_models_without_counters(self):
+        account = create_organization(self.dave, "Account", model=Account)
+        account.add_user(self.krist)
+        self.assertEqual(account.organization_users.count(), 2)
+
+    def test_rebuild_command(self):
+        CustomOrganization.objects.update(member_count=0, admin_count=0)
+        CustomInvitation.objects.create(
+            invitee_identifier="new@example.com",
+            invited_by=self.kurt,
+            organization=self.nirvana,
+        )
+        out = StringIO()
+        call_command(
+            "rebuild_org_counters", "test_abstract.CustomOrganization", stdout=out
+        )
+        self.assertIn("Rebuilt counters for 2 organizations", out.getvalue())
+        self.assertCounts(self.nirvana, 3, 2, pending=1)
+        self.assertCounts(self.foo, 1, 1)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_org_counters", "organizations.Organization")
+
+    def test_rebuild_command_all_models(self):
+        out = StringIO()
+        call_command("rebuild_org_counters", stdout=out)
+        # Only the custom organizations have counters
+        self.assertEqual("Rebuilt counters for 2 organizations\n", out.getvalue())
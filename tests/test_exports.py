@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from organizations.exports import iter_export
+from organizations.models import Organization
+from organizations.models import OrganizationUser
+from test_accounts.models import Account
+
+
+@override_settings(USE_TZ=True)
+class ExportTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.nirvana = Organization.objects.get(name="Nirvana")
+
+    def test_iter_export(self):
+        records = list(iter_export())
+        counts = {}
+        for record in records:
+            counts[record["type"]] = counts.get(record["type"], 0) + 1
+        self.assertEqual(
+            counts,
+            {
+                "organization": Organization.objects.count(),
+                "organization_user": OrganizationUser.objects.count(),
+                "owner": Organization.objects.count(),
+            },
+        )
+        self.assertEqual(records[0]["type"], "organization")
+        self.assertIn("slug", records[0])
+
+    def test_filters(self):
+        records = list(iter_export(active=True, types=["organization_user"]))
+        self.assertEqual(
+            {record["organization_id"] for record in records},
+            set(Organization.active.values_list("pk", flat=True)),
+        )
+        self.assertEqual(len(records), 4)
+
+        later = timezone.now() + timedelta(seconds=1)
+        self.assertEqual(list(iter_export(modified_since=later)), [])
+        since = timezone.now()
+        self.nirvana.add_user(User.objects.get(username="duder"))
+        recent = list(iter_export(modified_since=since))
+        self.assertEqual([record["type"] for record in recent], ["organization_user"])
+
+    def test_base_models(self):
+        account = Account.objects.create(name="Acme")
+        account.add_user(User.objects.get(username="dave"))
+        self.assertEqual(
+            [record["type"] for record in iter_export(Account)],
+            ["organization", "organization_user"],
+        )
+        with self.assertRaises(ValueError):
+            list(iter_export(Account, modified_since=timezone.now()))
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "orgs.jsonl")
+            out = StringIO()
+            call_command(
+                "export_organizations", output=path, types=["organization"], stdout=out
+            )
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), Organization.objects.count())
+        self.assertIn("Exported 3 records; latest modified", out.getvalue())
+
+        out, err = StringIO(), StringIO()
+        call_command(
+            "export_organizations",
+            model="test_accounts.Account",
+            stdout=out,
+            stderr=err,
+        )
+        self.assertEqual(out.getvalue(), "")
+        self.assertIn("Exported 0 records", err.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("export_organizations", modified_since="yesterday")
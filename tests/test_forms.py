@@ -1,13 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
 
+from organizations.backends.defaults import InvitationBackend
+from organizations.backends.modeled import ModelInvitation
 from organizations.forms import OrganizationAddForm
 from organizations.forms import OrganizationForm
+from organizations.forms import OrganizationInvitationsForm
 from organizations.forms import OrganizationUserAddForm
 from organizations.forms import OrganizationUserForm
 from organizations.models import Organization
+from organizations.models import OrganizationInvitation
 from tests.utils import request_factory_login
 
 User = get_user_model()
@@ -101,6 +107,66 @@ class TestOrganizationUserAddForm(TestCase):
         form.save()
 
 
+@override_settings(USE_TZ=True)
+class TestOrganizationInvitationsForm(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.org = Organization.objects.get(name="Nirvana")
+        self.request = request_factory_login(
+            RequestFactory(), User.objects.get(username="kurt")
+        )
+
+    def form(self, emails):
+        return OrganizationInvitationsForm(
+            self.request, self.org, ModelInvitation(), data={"emails": emails}
+        )
+
+    def test_requires_bulk_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            OrganizationInvitationsForm(self.request, self.org, InvitationBackend())
+
+    def test_parses_pasted_addresses(self):
+        form = self.form("a@example.com, B@Example.com;\nJo Smith <jo@example.com>\n\n")
+        self.assertTrue(form.is_valid())
+        self.assertEqual(
+            ["a@example.com", "b@example.com", "jo@example.com"],
+            form.cleaned_data["emails"],
+        )
+
+    def test_invalid_addresses(self):
+        form = self.form("a@example.com\nnot-an-address")
+        self.assertFalse(form.is_valid())
+        self.assertIn("not-an-address", form.errors["emails"][0])
+        self.assertFalse(self.form(" ,\n").is_valid())
+
+    def test_max_emails(self):
+        form = self.form(",".join("{0}@example.com".format(i) for i in range(3)))
+        form.max_emails = 2
+        self.assertFalse(form.is_valid())
+
+    def test_save(self):
+        member = self.org.users.first()
+        form = self.form(
+            "new@example.com, NEW@example.com, {0}".format(member.email.upper())
+        )
+        self.assertTrue(form.is_valid())
+        result = form.save()
+        self.assertEqual(
+            ["new@example.com"], [i.invitee_identifier for i in result.invitations]
+        )
+        self.assertEqual([member.email.lower()], result.members)
+        self.assertEqual(1, len(mail.outbox))
+
+        form = self.form("new@example.com, other@example.com")
+        self.assertTrue(form.is_valid())
+        result = form.save()
+        self.assertEqual(["new@example.com"], result.invited)
+        self.assertEqual(
+            2, OrganizationInvitation.objects.filter(organization=self.org).count()
+        )
+
+
 @override_settings(USE_TZ=True)
 class TestOrganizationForm(TestCase):
     fixtures = ["users.json", "orgs.json"]
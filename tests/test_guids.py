@@ -0,0 +1,43 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from organizations.guids import new_guid
+from organizations.guids import uuid7
+from organizations.utils import create_organization
+from test_accounts.models import Account
+from test_accounts.models import AccountInvitation
+
+
+class GuidTests(TestCase):
+    def test_uuid7(self):
+        guid = uuid7()
+        self.assertEqual(7, guid.version)
+        self.assertEqual(uuid.RFC_4122, guid.variant)
+        self.assertAlmostEqual(time.time() * 1000, guid.int >> 80, delta=1000)
+        time.sleep(0.002)
+        self.assertGreater(uuid7(), guid)
+
+    def test_new_guid(self):
+        self.assertEqual(4, new_guid().version)
+        with override_settings(ORGS_TIME_ORDERED_GUIDS=True):
+            self.assertEqual(7, new_guid().version)
+
+    def test_unique(self):
+        user = User.objects.create(username="inviter", email="i@example.com")
+        account = create_organization(user, "Acme", org_model=Account)
+        invitation = AccountInvitation.objects.create(
+            invitee_identifier="a@example.com", invited_by=user, organization=account
+        )
+        self.assertIsInstance(invitation.guid, uuid.UUID)
+        with self.assertRaises(IntegrityError):
+            AccountInvitation.objects.create(
+                guid=invitation.guid,
+                invitee_identifier="b@example.com",
+                invited_by=user,
+                organization=account,
+            )
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from organizations.imports import import_batch
+from organizations.models import Organization
+from test_accounts.models import Account
+
+CSV_ROWS = """organization,name,user,role
+gods,The Gods,duder,member
+gods,The Gods,kurt,owner
+gods,,dave,admin
+nirvana,,duder,member
+nirvana,,dave,member
+ghosts,,krist,member
+gods,,nobody,member
+"""
+
+
+@override_settings(USE_TZ=True)
+class ImportOrganizationsTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def call(self, *args, **kwargs):
+        out, err = StringIO(), StringIO()
+        call_command("import_organizations", *args, stdout=out, stderr=err, **kwargs)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        out, err = self.call(self.write("orgs.csv", CSV_ROWS), batch_size=3)
+        self.assertIn("Created 1 organizations and added 3 members from 7 rows", out)
+        self.assertIn("rows/sec", out)
+        self.assertIn("Skipped row 6: unknown organization 'ghosts'", err)
+        self.assertIn("Skipped row 7: unknown user 'nobody'", err)
+
+        gods = Organization.objects.get(slug="gods")
+        self.assertEqual(gods.name, "The Gods")
+        self.assertEqual(gods.owner.organization_user.user.username, "kurt")
+        self.assertTrue(gods.is_admin(User.objects.get(username="dave")))
+        self.assertFalse(gods.is_admin(User.objects.get(username="duder")))
+        self.assertEqual(gods.organization_users.count(), 3)
+        nirvana = Organization.objects.get(slug="nirvana")
+        self.assertTrue(nirvana.is_member(User.objects.get(username="duder")))
+        self.assertEqual(nirvana.organization_users.count(), 4)
+
+    def test_import_is_repeatable(self):
+        path = self.write("orgs.csv", CSV_ROWS)
+        self.call(path)
+        out, _ = self.call(path)
+        self.assertIn("Created 0 organizations and added 0 members", out)
+        self.assertEqual(
+            Organization.objects.get(slug="gods").organization_users.count(), 3
+        )
+
+    @override_settings(ORGS_MEMBERSHIP_CACHE="default")
+    def test_import_invalidates_cached_memberships(self):
+        cache.clear()
+        duder = User.objects.get(username="duder")
+        nirvana = Organization.objects.get(slug="nirvana")
+        self.assertFalse(nirvana.is_member(duder))
+        import_batch([{"organization": "nirvana", "user": "duder"}])
+        self.assertTrue(nirvana.is_member(duder))
+
+    def test_import_jsonl_into_model(self):
+        rows = [
+            {"organization": "Acme", "user": "dave", "role": "owner"},
+            {"organization": "Acme", "user": "krist"},
+        ]
+        path = self.write("accounts.jsonl", "\n".join(json.dumps(r) for r in rows))
+        self.call(path, model="test_accounts.Account")
+        acme = Account.objects.get(name="Acme")
+        self.assertEqual(acme.owner.organization_user.user.username, "dave")
+        self.assertEqual(acme.organization_users.count(), 2)
+
+    def test_import_invalid_jsonl(self):
+        lines = [
+            json.dumps({"organization": "Acme", "user": "dave", "role": "owner"}),
+            "",
+            '{"organization": "Acme", "user": ',
+            json.dumps(["Acme", "krist"]),
+            json.dumps({"organization": "Acme", "user": "kurt"}),
+        ]
+        path = self.write("accounts.jsonl", "\n".join(lines))
+        out, err = self.call(path, model="test_accounts.Account")
+        self.assertIn("added 1 members from 4 rows; skipped 2 rows", out)
+        self.assertIn("Skipped row 2: invalid JSON on line 3: Expecting value", err)
+        self.assertIn("Skipped row 3: not an object", err)
+        acme = Account.objects.get(name="Acme")
+        self.assertEqual(acme.organization_users.count(), 2)
+
+    def test_checkpoint(self):
+        path = self.write("orgs.csv", CSV_ROWS)
+        checkpoint = os.path.join(self.directory.name, "import.checkpoint")
+        with open(checkpoint, "w") as f:
+            json.dump({"path": os.path.abspath(path), "rows": 3}, f)
+
+        out, _ = self.call(path, checkpoint=checkpoint)
+        self.assertIn("Resuming after row 3", out)
+        self.assertFalse(Organization.objects.filter(slug="gods").exists())
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f)["rows"], 7)
+
+        with self.assertRaises(CommandError):
+            self.call(self.write("other.csv", CSV_ROWS), checkpoint=checkpoint)
+
+    def test_unknown_format(self):
+        with self.assertRaises(CommandError):
+            self.call(self.write("orgs.txt", CSV_ROWS))
+
+    def test_batch_queries(self):
+        rows = [
+            {"organization": "org-{0}".format(i), "user": "dave", "role": "owner"}
+            for i in range(20)
+        ] + [{"organization": "org-{0}".format(i), "user": "kurt"} for i in range(20)]
+        with self.assertNumQueries(11):
+            result = import_batch(rows)
+        self.assertEqual(result, (20, 20, []))
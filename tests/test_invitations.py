@@ -0,0 +1,247 @@
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from organizations.backends.modeled import ModelInvitation
+from organizations.invitations import accept_pending_invitations
+from organizations.invitations import default_expires_at
+from organizations.invitations import identifier_key
+from organizations.invitations import purge_invitations
+from organizations.migration_utils import populate_invitee_keys
+from organizations.models import Organization
+from organizations.models import OrganizationInvitation
+from organizations.models import OrganizationUser
+from organizations.signals import user_added
+from tests.utils import request_factory_login
+
+
+@override_settings(USE_TZ=True)
+class InvitationExpiryTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+
+    def invite(self, identifier, **kwargs):
+        return OrganizationInvitation.objects.create(
+            invitee_identifier=identifier,
+            invited_by=self.kurt,
+            organization=self.nirvana,
+            **kwargs,
+        )
+
+    def test_default_expires_at(self):
+        self.assertIsNone(default_expires_at())
+        self.assertIsNone(self.invite("a@example.com").expires_at)
+        with override_settings(ORGS_INVITATION_EXPIRY=3600):
+            invitation = self.invite("b@example.com")
+        self.assertAlmostEqual(
+            timezone.now() + timedelta(hours=1),
+            invitation.expires_at,
+            delta=timedelta(seconds=10),
+        )
+
+    def test_expired_invitations_are_not_available(self):
+        current = self.invite(
+            "a@example.com", expires_at=timezone.now() + timedelta(days=1)
+        )
+        expired = self.invite(
+            "b@example.com", expires_at=timezone.now() - timedelta(days=1)
+        )
+        backend = ModelInvitation()
+        self.assertEqual(
+            {current, self.invite("c@example.com")},
+            set(backend.get_invitation_queryset()),
+        )
+        request = request_factory_login(RequestFactory())
+        with self.assertRaises(Http404):
+            backend.activation_router(request, expired.guid)
+
+    def test_purge_invitations(self):
+        past = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            self.invite("{0}@example.com".format(i), expires_at=past)
+        pending = self.invite("pending@example.com")
+        accepted = self.invite("accepted@example.com", invitee=self.kurt)
+
+        self.assertEqual(
+            [2, 2, 1], list(purge_invitations(OrganizationInvitation, batch_size=2))
+        )
+        self.assertEqual({pending, accepted}, set(OrganizationInvitation.objects.all()))
+
+        self.assertEqual(
+            [1],
+            list(
+                purge_invitations(OrganizationInvitation, expired=False, accepted=True)
+            ),
+        )
+        self.assertEqual([pending], list(OrganizationInvitation.objects.all()))
+
+    def test_command(self):
+        self.invite("a@example.com", expires_at=timezone.now() - timedelta(days=1))
+        self.invite("b@example.com")
+        with self.assertRaises(CommandError):
+            call_command("purge_org_invitations")
+        with self.assertRaises(CommandError):
+            call_command("purge_org_invitations", "auth.User", expired=True)
+
+        stdout = StringIO()
+        call_command(
+            "purge_org_invitations",
+            "organizations.OrganizationInvitation",
+            expired=True,
+            dry_run=True,
+            stdout=stdout,
+        )
+        self.assertIn("Would delete 1 organization invitations", stdout.getvalue())
+        self.assertEqual(2, OrganizationInvitation.objects.count())
+
+        stdout = StringIO()
+        call_command("purge_org_invitations", expired=True, stdout=stdout)
+        self.assertIn("Deleted 1 organization invitations", stdout.getvalue())
+        self.assertEqual(1, OrganizationInvitation.objects.count())
+
+
+@override_settings(USE_TZ=True)
+class AcceptPendingInvitationsTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.dave = User.objects.get(username="dave")
+        self.user = User.objects.create_user(
+            "newbie", email="New@Example.com", password="test"
+        )
+
+    def invite(self, organization, identifier="new@example.com", **kwargs):
+        return OrganizationInvitation.objects.create(
+            invitee_identifier=identifier,
+            invited_by=self.kurt,
+            organization=organization,
+            **kwargs,
+        )
+
+    def test_accept_pending_invitations(self):
+        nirvana = Organization.objects.get(name="Nirvana")
+        foo_fighters = Organization.objects.get(name="Foo Fighters")
+        scream = Organization.objects.get(name="Scream")
+        invitations = [self.invite(org) for org in (nirvana, foo_fighters)]
+        expired = self.invite(scream, expires_at=timezone.now() - timedelta(days=1))
+        other = self.invite(nirvana, "other@example.com")
+        self.assertEqual(
+            set(invitations),
+            set(ModelInvitation().get_pending_invitations(self.user)),
+        )
+
+        added = []
+
+        def receiver(sender, user, **kwargs):
+            added.append((sender, user))
+
+        user_added.connect(receiver)
+        self.addCleanup(user_added.disconnect, receiver)
+        # The invitations, the memberships' insert, the invitations' update,
+        # and the new memberships, within a savepoint
+        with self.assertNumQueries(6):
+            org_users = ModelInvitation().accept_pending_invitations(self.user)
+
+        self.assertEqual([foo_fighters, nirvana], [ou.organization for ou in org_users])
+        self.assertEqual([(foo_fighters, self.user), (nirvana, self.user)], added)
+        for invitation in invitations:
+            invitation.refresh_from_db()
+            self.assertEqual(self.user, invitation.invitee)
+        for invitation in (expired, other):
+            invitation.refresh_from_db()
+            self.assertIsNone(invitation.invitee)
+        self.assertEqual(4, nirvana.organization_users.count())
+        self.assertEqual(
+            [], accept_pending_invitations(OrganizationInvitation, self.user)
+        )
+
+    def test_first_member_becomes_owner(self):
+        empty = Organization.objects.create(name="Empty", slug="empty")
+        self.invite(empty)
+        [org_user] = accept_pending_invitations(OrganizationInvitation, self.user)
+        self.assertTrue(org_user.is_admin)
+        self.assertEqual(org_user, empty.owner.organization_user)
+
+    def test_existing_membership(self):
+        nirvana = Organization.objects.get(name="Nirvana")
+        invitation = self.invite(nirvana, self.dave.email)
+        self.assertEqual(
+            [], accept_pending_invitations(OrganizationInvitation, self.dave)
+        )
+        invitation.refresh_from_db()
+        self.assertEqual(self.dave, invitation.invitee)
+        self.assertEqual(
+            1,
+            OrganizationUser.objects.filter(
+                organization=nirvana, user=self.dave
+            ).count(),
+        )
+
+
+class InviteeKeyTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+
+    def test_identifier_key(self):
+        self.assertEqual(64, len(identifier_key("bob@example.com")))
+        self.assertEqual(
+            identifier_key("bob@example.com"), identifier_key(" Bob@Example.COM ")
+        )
+        invitation = OrganizationInvitation.objects.create(
+            invitee_identifier="Bob@Example.com",
+            invited_by=self.kurt,
+            organization=self.nirvana,
+        )
+        self.assertEqual(identifier_key("bob@example.com"), invitation.invitee_key)
+
+    def test_populate_invitee_keys(self):
+        invitations = OrganizationInvitation.objects.bulk_create(
+            [
+                OrganizationInvitation(
+                    invitee_identifier=identifier,
+                    invited_by=self.kurt,
+                    organization=self.nirvana,
+                    invitee=invitee,
+                )
+                for identifier, invitee in [
+                    ("a@example.com", None),
+                    ("A@example.com", None),
+                    ("a@example.com", self.kurt),
+                    ("b@example.com", None),
+                ]
+            ]
+        )
+        forwards = populate_invitee_keys(
+            "organizations", "OrganizationInvitation", batch_size=3
+        )
+        forwards(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(
+            [
+                identifier_key("a@example.com"),
+                None,
+                identifier_key("a@example.com"),
+                identifier_key("b@example.com"),
+            ],
+            [
+                OrganizationInvitation.objects.get(pk=invitation.pk).invitee_key
+                for invitation in invitations
+            ],
+        )
@@ -1,5 +1,6 @@
 from functools import partial
 
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth.models import User
 from django.db import IntegrityError
 from django.test import TestCase
@@ -24,6 +25,25 @@ class ActiveManagerTests(TestCase):
         self.assertEqual(3, Organization.objects.all().count())
         self.assertEqual(2, Organization.active.all().count())
 
+    def test_membership_map(self):
+        kurt = User.objects.get(username="kurt")
+        dave = User.objects.get(username="dave")
+        nirvana = Organization.objects.get(name="Nirvana")
+        foo = Organization.objects.get(name="Foo Fighters")
+        with self.assertNumQueries(1):
+            memberships = Organization.objects.membership_map(
+                [kurt, dave], [nirvana, foo.pk]
+            )
+        self.assertEqual(
+            memberships,
+            {
+                (kurt.pk, nirvana.pk): True,
+                (kurt.pk, foo.pk): False,
+                (dave.pk, nirvana.pk): True,
+                (dave.pk, foo.pk): True,
+            },
+        )
+
     def test_by_user(self):
         user = User.objects.get(username="dave")
         self.assertEqual(3, Organization.objects.get_for_user(user).count())
@@ -66,6 +86,12 @@ class OrgModelTests(TestCase):
         self.assertTrue(self.foo.is_member(self.dave))
         self.assertFalse(self.foo.is_member(self.kurt))
 
+    def test_is_member_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.nirvana.is_member(self.kurt))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.nirvana.is_member(AnonymousUser()))
+
     def test_is_admin(self):
         self.assertTrue(self.nirvana.is_admin(self.kurt))
         self.assertTrue(self.nirvana.is_admin(self.krist))
@@ -127,6 +153,80 @@ class OrgModelTests(TestCase):
         self.assertRaises(OrganizationMismatch, self.nirvana.owner.save)
 
 
+@override_settings(USE_TZ=True)
+class BulkMembershipTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.dave = User.objects.get(username="dave")
+        self.krist = User.objects.get(username="krist")
+        self.duder = User.objects.get(username="duder")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+        self.foo = Organization.objects.get(name="Foo Fighters")
+        self.new_users = [
+            User.objects.create(username="bulk{}".format(i)) for i in range(20)
+        ]
+
+    def test_add_users(self):
+        org_users = self.foo.add_users(
+            [self.krist, self.dave, self.duder] + self.new_users
+        )
+        self.assertEqual(
+            {org_user.user for org_user in org_users},
+            {self.krist, self.duder, *self.new_users},
+        )
+        self.assertEqual(self.foo.organization_users.count(), 23)
+        self.assertFalse(
+            self.foo.organization_users.filter(user=self.krist).get().is_admin
+        )
+
+    def test_add_users_constant_queries(self):
+        with self.assertNumQueries(6):
+            self.foo.add_users(self.new_users[:2])
+        with self.assertNumQueries(6):
+            self.foo.add_users(self.new_users[2:])
+
+    def test_add_users_first_owner(self):
+        org = Organization.objects.create(name="Empty", slug="empty")
+        org.add_users([self.duder, self.krist])
+        self.assertTrue(org.is_owner(self.duder))
+        self.assertTrue(org.is_admin(self.duder))
+        self.assertFalse(org.is_admin(self.krist))
+
+    def test_add_users_as_admins(self):
+        self.foo.add_users(self.new_users[:3], is_admin=True)
+        self.assertEqual(self.foo.organization_users.filter(is_admin=True).count(), 4)
+
+    def test_add_no_new_users(self):
+        self.assertEqual(self.foo.add_users([self.dave]), [])
+        self.assertEqual(self.foo.add_users([]), [])
+
+    def test_remove_users(self):
+        self.foo.add_users(self.new_users)
+        removed = self.foo.remove_users(self.new_users[:10] + [self.kurt])
+        self.assertEqual(removed, self.new_users[:10])
+        self.assertEqual(self.foo.organization_users.count(), 11)
+
+    def test_remove_users_refuses_owner(self):
+        from organizations.exceptions import OwnershipRequired
+
+        self.assertRaises(
+            OwnershipRequired, self.nirvana.remove_users, [self.dave, self.kurt]
+        )
+        self.assertEqual(self.nirvana.organization_users.count(), 3)
+
+    def test_queryset_delete_refuses_owner(self):
+        from organizations.exceptions import OwnershipRequired
+
+        with self.assertRaises(OwnershipRequired):
+            OrganizationUser.objects.filter(organization=self.nirvana).delete()
+        OrganizationUser.objects.filter(
+            organization=self.nirvana, is_admin=False
+        ).delete()
+        self.assertEqual(self.nirvana.organization_users.count(), 2)
+
+
 @override_settings(USE_TZ=True)
 class OrgDeleteTests(TestCase):
     fixtures = ["users.json", "orgs.json"]
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail import EmailMultiAlternatives
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from organizations import outbox
+from organizations.backends.defaults import InvitationBackend
+from organizations.models import OutboxMessage
+
+
+@override_settings(USE_TZ=True, ORGS_EMAIL_OUTBOX=True)
+class OutboxTests(TestCase):
+    fixtures = ["users.json"]
+
+    def setUp(self):
+        self.sender = User.objects.get(username="dave")
+        self.pending = []
+        for username in ("sonny", "cher"):
+            user = User.objects.create_user(
+                username=username, email="{0}@example.com".format(username)
+            )
+            user.is_active = False
+            user.save()
+            self.pending.append(user)
+
+    def test_backend_enqueues(self):
+        backend = InvitationBackend()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                2, backend.send_invitations(self.pending, sender=self.sender)
+            )
+        self.assertEqual(0, len(mail.outbox))
+        self.assertEqual(
+            [["sonny@example.com"], ["cher@example.com"]],
+            list(OutboxMessage.objects.order_by("pk").values_list("to", flat=True)),
+        )
+        self.assertEqual(1, backend.send_reminder(self.pending[0]))
+        self.assertEqual(3, OutboxMessage.objects.count())
+
+    @override_settings(ORGS_EMAIL_OUTBOX=False)
+    def test_disabled(self):
+        InvitationBackend().send_invitation(self.pending[0])
+        self.assertEqual(1, len(mail.outbox))
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_drain(self):
+        InvitationBackend().send_invitations(self.pending, sender=self.sender)
+        message = EmailMultiAlternatives("Hi", "Hi", "a@example.com", ["b@example.com"])
+        message.attach_alternative("<p>Hi</p>", "text/html")
+        outbox.enqueue([message])
+
+        self.assertEqual(outbox.DrainResult(2, 0), outbox.drain(batch_size=2))
+        self.assertEqual(outbox.DrainResult(1, 0), outbox.drain(batch_size=2))
+        self.assertEqual(outbox.DrainResult(0, 0), outbox.drain(batch_size=2))
+
+        self.assertEqual(3, len(mail.outbox))
+        self.assertEqual(["sonny@example.com"], mail.outbox[0].to)
+        self.assertIn("Reply-To", mail.outbox[0].extra_headers)
+        self.assertEqual([("<p>Hi</p>", "text/html")], mail.outbox[2].alternatives)
+        # Sent messages are deleted
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_drain_keep_sent(self):
+        InvitationBackend().send_invitations(self.pending, sender=self.sender)
+        self.assertEqual(outbox.DrainResult(2, 0), outbox.drain(keep_sent=True))
+        self.assertEqual(2, len(mail.outbox))
+        self.assertFalse(OutboxMessage.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(
+            {1}, set(OutboxMessage.objects.values_list("attempts", flat=True))
+        )
+        self.assertEqual(outbox.DrainResult(0, 0), outbox.drain())
+
+    def test_recipients(self):
+        message = EmailMessage(
+            "Hi",
+            "Hi",
+            "a@example.com",
+            ["b@example.com"],
+            bcc=["c@example.com"],
+            cc=["d@example.com"],
+            reply_to=["e@example.com"],
+        )
+        outbox.enqueue([message])
+        outbox.drain()
+        sent = mail.outbox[0]
+        self.assertEqual(["b@example.com"], sent.to)
+        self.assertEqual(["c@example.com"], sent.bcc)
+        self.assertEqual(["d@example.com"], sent.cc)
+        self.assertEqual(["e@example.com"], sent.reply_to)
+
+    def test_attachments_rejected(self):
+        message = EmailMessage("Hi", "Hi", "a@example.com", ["b@example.com"])
+        message.attach("notes.txt", "Notes", "text/plain")
+        with self.assertRaises(ValueError):
+            outbox.send_messages([message])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_retry_with_backoff(self):
+        InvitationBackend().send_invitation(self.pending[0])
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("connection refused"),
+        ):
+            self.assertEqual(outbox.DrainResult(0, 1), outbox.drain(backoff=10))
+        row = OutboxMessage.objects.get()
+        self.assertEqual(1, row.attempts)
+        self.assertEqual("OSError: connection refused", row.last_error)
+        self.assertIsNone(row.sent_at)
+        self.assertGreater(row.next_attempt_at, timezone.now() + timedelta(seconds=8))
+        # Not due yet
+        self.assertEqual(outbox.DrainResult(0, 0), outbox.drain())
+
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("connection refused"),
+        ):
+            outbox.drain(max_attempts=2)
+        row.refresh_from_db()
+        self.assertEqual(2, row.attempts)
+        self.assertIsNone(row.next_attempt_at)
+        self.assertEqual(0, len(mail.outbox))
+
+    def test_retry_delay(self):
+        self.assertEqual(timedelta(seconds=60), outbox.retry_delay(1, 60))
+        self.assertEqual(timedelta(seconds=240), outbox.retry_delay(3, 60))
+
+    def test_claimed_messages_are_leased(self):
+        InvitationBackend().send_invitations(self.pending)
+        claimed = outbox.claim(batch_size=1)
+        self.assertEqual(1, len(claimed))
+        self.assertEqual([self.pending[1].email], outbox.claim(batch_size=5)[0].to)
+        self.assertEqual([], outbox.claim(batch_size=5))
+
+    def test_command(self):
+        InvitationBackend().send_invitations(self.pending)
+        stdout = StringIO()
+        call_command("drain_org_outbox", batch_size=1, stdout=stdout)
+        self.assertEqual(2, len(mail.outbox))
+        self.assertIn("Sent 2 messages; 0 failed", stdout.getvalue())
+        self.assertFalse(OutboxMessage.objects.exists())
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from organizations.models import Organization
+from organizations.pagination import decode_cursor
+from organizations.pagination import encode_cursor
+from organizations.pagination import keyset_page
+
+
+@override_settings(USE_TZ=True)
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        # Names repeat, so the primary key breaks ties
+        for i, name in enumerate(["b", "a", "c", "a", "b", "a", "c"]):
+            Organization.objects.create(name=name, slug="org-{0}".format(i))
+        self.ordering = ("name", "pk")
+        self.rows = list(Organization.objects.order_by(*self.ordering))
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(["Acme & Co", 12])
+        self.assertEqual(["Acme & Co", 12], decode_cursor(cursor, self.ordering))
+        for bad in [
+            "",
+            "garbage",
+            encode_cursor([12]),
+            encode_cursor({"a": 1}),
+            encode_cursor([{}, 1]),
+            encode_cursor([[1], 2]),
+        ]:
+            with self.assertRaises(ValueError):
+                decode_cursor(bad, self.ordering)
+
+    def test_cursor_values_of_the_wrong_type(self):
+        queryset = Organization.objects.all()
+        with self.assertRaises(ValueError):
+            keyset_page(queryset, self.ordering, 3, after=encode_cursor(["a", "b"]))
+        with self.assertRaises(ValueError):
+            keyset_page(
+                queryset, ("created", "pk"), 3, before=encode_cursor(["never", 1])
+            )
+
+    def test_forward_and_back(self):
+        queryset = Organization.objects.all()
+        page = keyset_page(queryset, self.ordering, 3)
+        self.assertEqual(self.rows[:3], page.object_list)
+        self.assertFalse(page.has_previous())
+        self.assertIsNone(page.previous_cursor)
+
+        page = keyset_page(queryset, self.ordering, 3, after=page.next_cursor)
+        self.assertEqual(self.rows[3:6], page.object_list)
+        self.assertTrue(page.has_previous())
+
+        last = keyset_page(queryset, self.ordering, 3, after=page.next_cursor)
+        self.assertEqual(self.rows[6:], last.object_list)
+        self.assertFalse(last.has_next())
+        self.assertIsNone(last.next_cursor)
+
+        page = keyset_page(queryset, self.ordering, 3, before=last.previous_cursor)
+        self.assertEqual(self.rows[3:6], page.object_list)
+        self.assertTrue(page.has_next())
+        page = keyset_page(queryset, self.ordering, 3, before=page.previous_cursor)
+        self.assertEqual(self.rows[:3], page.object_list)
+        self.assertFalse(page.has_previous())
+
+    def test_deep_page_is_one_query(self):
+        cursor = encode_cursor([self.rows[4].name, self.rows[4].pk])
+        with self.assertNumQueries(1):
+            page = keyset_page(Organization.objects.all(), self.ordering, 2, cursor)
+        self.assertEqual(self.rows[5:7], page.object_list)
+
+    def test_empty(self):
+        page = keyset_page(Organization.objects.none(), self.ordering, 3)
+        self.assertEqual([], page.object_list)
+        self.assertFalse(page.has_other_pages())
+
+
+@override_settings(USE_TZ=True)
+class MemberPageTests(TestCase):
+    def test_members_by_user(self):
+        users = [User.objects.create(username="user{0}".format(i)) for i in range(5)]
+        org = Organization.objects.create(name="Acme", slug="acme")
+        for user in reversed(users):
+            org.add_user(user)
+        queryset = org.organization_users.all()
+        page = keyset_page(queryset, ("user_id", "pk"), 2)
+        page = keyset_page(queryset, ("user_id", "pk"), 2, after=page.next_cursor)
+        self.assertEqual(users[2:4], [org_user.user for org_user in page])
@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+
+from organizations.models import Organization
+from organizations.models import OrganizationInvitation
+from organizations.models import OrganizationOwner
+from organizations.models import OrganizationUser
+from organizations.registry import ModelFamily
+from organizations.registry import ModelRegistry
+from organizations.registry import registry
+from test_abstract.models import CustomInvitation
+from test_abstract.models import CustomOrganization
+from test_abstract.models import CustomOwner
+from test_abstract.models import CustomUser
+from test_accounts.models import Account
+from test_accounts.models import AccountInvitation
+from test_accounts.models import AccountOwner
+from test_accounts.models import AccountUser
+from test_custom.models import Team
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def test_families(self):
+        for family in [
+            ModelFamily(
+                Organization,
+                OrganizationUser,
+                OrganizationOwner,
+                OrganizationInvitation,
+            ),
+            ModelFamily(CustomOrganization, CustomUser, CustomOwner, CustomInvitation),
+            ModelFamily(Account, AccountUser, AccountOwner, AccountInvitation),
+        ]:
+            for model in family:
+                self.assertEqual(registry.family(model), family)
+
+    def test_inherited_organization_model(self):
+        family = registry.family(Team)
+        self.assertEqual(family.organization, Team)
+        self.assertEqual(family.organization_user, OrganizationUser)
+        self.assertEqual(registry.family(OrganizationUser).organization, Organization)
+
+    def test_registry_is_read_only(self):
+        with self.assertRaises(TypeError):
+            registry._families[User] = None
+
+    def test_lazy_fallback(self):
+        unbuilt = ModelRegistry()
+        self.assertEqual(unbuilt.family(AccountOwner), registry.family(Account))
+        self.assertIn(AccountOwner, unbuilt._families)
+        self.assertTrue(unbuilt.has_field(AccountUser, "user_type"))
+
+    def test_field_metadata(self):
+        self.assertIn("organization_id", registry.field_names(OrganizationUser))
+        self.assertTrue(registry.has_field(OrganizationUser, "is_admin"))
+        self.assertFalse(registry.has_field(AccountUser, "is_admin"))
+        self.assertEqual(registry.fields(User)["username"].max_length, 150)
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from organizations.backends.defaults import InvitationBackend
+from organizations.backends.modeled import ModelInvitation
+from organizations.models import Organization
+from organizations.models import OrganizationInvitation
+from organizations.models import OrganizationUser
+from organizations.reminders import parse_age
+from organizations.reminders import remind_inactive_members
+from organizations.reminders import remind_invitations
+from organizations.reminders import stale_invitations
+from test_accounts.models import Account
+from test_accounts.models import AccountInvitation
+
+
+@override_settings(USE_TZ=True)
+class ReminderTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+        self.week_ago = timezone.now() - timedelta(days=7)
+
+    def invite(self, identifier, **kwargs):
+        return OrganizationInvitation.objects.create(
+            invitee_identifier=identifier,
+            invited_by=self.kurt,
+            organization=self.nirvana,
+            **kwargs,
+        )
+
+    def test_parse_age(self):
+        self.assertEqual(timedelta(days=3), parse_age("3d"))
+        self.assertEqual(timedelta(days=3), parse_age("3"))
+        self.assertEqual(timedelta(hours=12), parse_age("12h"))
+        self.assertEqual(timedelta(weeks=2), parse_age("2W"))
+        with self.assertRaises(ValueError):
+            parse_age("soon")
+
+    def test_stale_invitations(self):
+        stale = [self.invite("{0}@example.com".format(i)) for i in range(3)]
+        OrganizationInvitation.objects.update(last_sent_at=self.week_ago)
+        self.invite("recent@example.com")
+        self.invite("expired@example.com", expires_at=timezone.now())
+        self.invite("accepted@example.com", invitee=self.kurt)
+        # Invitations from before sends were tracked count from their creation
+        untracked = self.invite("untracked@example.com", last_sent_at=None)
+        OrganizationInvitation.objects.filter(pk=untracked.pk).update(
+            last_sent_at=None, created=self.week_ago
+        )
+        OrganizationInvitation.objects.filter(
+            invitee_identifier__in=["expired@example.com", "accepted@example.com"]
+        ).update(last_sent_at=self.week_ago)
+        self.invite("new@example.com", last_sent_at=None)
+
+        self.assertEqual(
+            set(stale) | {untracked},
+            set(stale_invitations(OrganizationInvitation, timedelta(days=3))),
+        )
+
+    def account_invite(self, identifier, **kwargs):
+        account = Account.objects.get_or_create(name="Acme")[0]
+        return AccountInvitation.objects.create(
+            invitee_identifier=identifier,
+            invited_by=self.kurt,
+            organization=account,
+            **kwargs,
+        )
+
+    def test_remind_invitations(self):
+        for i in range(5):
+            self.account_invite("{0}@example.com".format(i), last_sent_at=self.week_ago)
+        backend = ModelInvitation(org_model=Account)
+        older_than = timedelta(days=3)
+        self.assertEqual(
+            [5], list(remind_invitations(backend, older_than, dry_run=True))
+        )
+        self.assertEqual(0, len(mail.outbox))
+
+        with mock.patch(
+            "organizations.outbox.get_connection", wraps=get_connection
+        ) as connection:
+            self.assertEqual(
+                [2, 2, 1], list(remind_invitations(backend, older_than, batch_size=2))
+            )
+        self.assertEqual(3, connection.call_count)
+        self.assertEqual(5, len(mail.outbox))
+        self.assertEqual("Just a reminder", mail.outbox[0].subject)
+        self.assertIn("Acme", mail.outbox[0].body)
+        self.assertIn(
+            AccountInvitation.objects.order_by("pk")[0].get_absolute_url(),
+            mail.outbox[0].body,
+        )
+
+        # Reminded invitations are skipped until they are stale again
+        self.assertEqual([], list(remind_invitations(backend, older_than)))
+
+    def test_remind_inactive_members(self):
+        inactive = User.objects.create_user(
+            "inactive", email="inactive@example.com", is_active=False
+        )
+        OrganizationUser.objects.create(user=inactive, organization=self.nirvana)
+        backend = InvitationBackend()
+        older_than = timedelta(days=3)
+        # Added too recently
+        self.assertEqual([], list(remind_inactive_members(backend, older_than)))
+
+        OrganizationUser.objects.filter(user=inactive).update(created=self.week_ago)
+        self.assertEqual([1], list(remind_inactive_members(backend, older_than)))
+        self.assertEqual(["inactive@example.com"], mail.outbox[0].to)
+        self.assertIsNotNone(
+            OrganizationUser.objects.get(user=inactive).last_reminded_at
+        )
+        self.assertEqual([], list(remind_inactive_members(backend, older_than)))
+
+    def test_command(self):
+        self.account_invite("a@example.com", last_sent_at=self.week_ago)
+        with self.assertRaises(CommandError):
+            call_command("send_org_reminders", "--older-than", "soon")
+
+        stdout = StringIO()
+        call_command(
+            "send_org_reminders", "--older-than", "3d", "--dry-run", stdout=stdout
+        )
+        self.assertIn(
+            "Would send 1 reminders for account invitations", stdout.getvalue()
+        )
+        self.assertIn("Would send 0 reminders to inactive users", stdout.getvalue())
+        self.assertEqual(0, len(mail.outbox))
+
+        stdout = StringIO()
+        call_command("send_org_reminders", "--older-than", "3d", stdout=stdout)
+        self.assertIn("Sent 1 reminders for account invitations", stdout.getvalue())
+        self.assertEqual(1, len(mail.outbox))
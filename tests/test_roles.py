@@ -0,0 +1,182 @@
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import Group
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.template import Context
+from django.template import Template
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from organizations.middleware import OrganizationRolesMiddleware
+from organizations.models import Organization
+from organizations.models import OrganizationOwner
+from organizations.models import OrganizationUser
+from organizations.roles import OrganizationRoles
+from organizations.roles import current_roles
+from organizations.roles import reset_current_roles
+from organizations.roles import set_current_roles
+from organizations.views.mixins import AdminRequiredMixin
+from organizations.views.mixins import MembershipRequiredMixin
+from organizations.views.mixins import OrganizationMixin
+from organizations.views.mixins import OwnerRequiredMixin
+from test_accounts.models import Account
+from tests.utils import request_factory_login
+
+
+class RolesView(
+    MembershipRequiredMixin, AdminRequiredMixin, OwnerRequiredMixin, OrganizationMixin
+):
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def dispatch(self, request, *args, **kwargs):
+        return HttpResponse("Success")
+
+
+@override_settings(USE_TZ=True)
+class OrganizationRolesTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.krist = User.objects.get(username="krist")
+        self.dave = User.objects.get(username="dave")
+        self.duder = User.objects.get(username="duder")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+        self.foo = Organization.objects.get(name="Foo Fighters")
+
+    def test_single_query_for_all_checks(self):
+        roles = OrganizationRoles(self.kurt)
+        with self.assertNumQueries(1):
+            self.assertTrue(roles.is_member(self.nirvana))
+            self.assertTrue(roles.is_admin(self.nirvana))
+            self.assertTrue(roles.is_owner(self.nirvana))
+            self.assertFalse(roles.is_member(self.foo))
+            self.assertFalse(roles.is_admin(self.foo))
+
+    def test_member_roles(self):
+        roles = OrganizationRoles(self.dave)
+        self.assertTrue(roles.is_member(self.nirvana))
+        self.assertFalse(roles.is_admin(self.nirvana))
+        self.assertFalse(roles.is_owner(self.nirvana))
+        self.assertTrue(roles.is_owner(self.foo))
+
+    def test_anonymous_user(self):
+        roles = OrganizationRoles(AnonymousUser())
+        with self.assertNumQueries(0):
+            self.assertFalse(roles.is_member(self.nirvana))
+
+    def test_base_organization_models(self):
+        account = Account.objects.create(name="Acme")
+        account.add_user(self.dave)
+        roles = OrganizationRoles(self.dave)
+        self.assertTrue(roles.is_member(account))
+        self.assertFalse(roles.is_admin(account))
+
+    def test_models_consult_current_roles(self):
+        token = set_current_roles(OrganizationRoles(self.kurt))
+        try:
+            with self.assertNumQueries(1):
+                self.assertTrue(self.nirvana.is_member(self.kurt))
+                self.assertTrue(self.nirvana.is_admin(self.kurt))
+                self.assertTrue(self.nirvana.is_owner(self.kurt))
+            # Checks for other users are not answered by the resolver
+            self.assertIsNone(current_roles(self.dave))
+            self.assertTrue(self.nirvana.is_member(self.dave))
+        finally:
+            reset_current_roles(token)
+        self.assertIsNone(current_roles(self.kurt))
+
+    def test_membership_changes_clear_roles(self):
+        roles = OrganizationRoles(self.duder)
+        token = set_current_roles(roles)
+        try:
+            self.assertFalse(self.nirvana.is_member(self.duder))
+            self.nirvana.add_user(self.duder)
+            self.assertTrue(self.nirvana.is_member(self.duder))
+            self.nirvana.remove_user(self.duder)
+            self.assertFalse(self.nirvana.is_member(self.duder))
+        finally:
+            reset_current_roles(token)
+
+    def test_model_receivers_are_connected_by_sender(self):
+        for signal in (post_save, post_delete):
+            self.assertTrue(signal.has_listeners(OrganizationUser))
+            self.assertTrue(signal.has_listeners(OrganizationOwner))
+
+        roles = OrganizationRoles(self.kurt)
+        token = set_current_roles(roles)
+        try:
+            self.assertTrue(self.nirvana.is_member(self.kurt))
+            # Saving other models leaves the loaded memberships alone
+            Group.objects.create(name="Roadies")
+            with self.assertNumQueries(0):
+                self.assertTrue(self.nirvana.is_member(self.kurt))
+        finally:
+            reset_current_roles(token)
+
+    def test_template_filters(self):
+        token = set_current_roles(OrganizationRoles(self.kurt))
+        try:
+            with self.assertNumQueries(1):
+                out = Template(
+                    "{% load org_tags %}"
+                    "{% if organization|is_admin:user %}Admin {% endif %}"
+                    "{% if organization|is_owner:user %}Owner{% endif %}"
+                ).render(Context({"organization": self.nirvana, "user": self.kurt}))
+        finally:
+            reset_current_roles(token)
+        self.assertEqual(out, "Admin Owner")
+
+    def test_mixins_use_request_roles(self):
+        request = request_factory_login(RequestFactory(), self.kurt)
+        request.org_roles = OrganizationRoles(self.kurt)
+        view = RolesView(organization_pk=self.nirvana.pk)
+        view.organization  # Load the organization up front
+        with self.assertNumQueries(1):
+            self.assertEqual(200, view.dispatch(request).status_code)
+            self.assertTrue(view.user_is_member(request))
+            self.assertTrue(view.user_is_admin(request))
+            self.assertTrue(view.user_is_owner(request))
+
+    def test_middleware(self):
+        seen = {}
+
+        def get_response(request):
+            seen["roles"] = current_roles(request.user)
+            return HttpResponse()
+
+        request = request_factory_login(RequestFactory(), self.kurt)
+        OrganizationRolesMiddleware(get_response)(request)
+        self.assertIsInstance(request.org_roles, OrganizationRoles)
+        self.assertIs(seen["roles"], request.org_roles)
+        self.assertIsNone(current_roles(self.kurt))
+
+
+@override_settings(USE_TZ=True)
+class AsyncOrganizationRolesTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.kurt = User.objects.get(username="kurt")
+        self.dave = User.objects.get(username="dave")
+        self.nirvana = Organization.objects.get(name="Nirvana")
+
+    async def test_async_checks(self):
+        roles = OrganizationRoles(self.dave)
+        self.assertTrue(await roles.ais_member(self.nirvana))
+        self.assertFalse(await roles.ais_admin(self.nirvana))
+        self.assertFalse(await roles.ais_owner(self.nirvana))
+
+    async def test_async_models_consult_current_roles(self):
+        roles = OrganizationRoles(self.kurt)
+        token = set_current_roles(roles)
+        try:
+            self.assertTrue(await self.nirvana.ais_admin(self.kurt))
+            self.assertTrue(await self.nirvana.ais_owner(self.kurt))
+        finally:
+            reset_current_roles(token)
+        self.assertTrue(roles._memberships)
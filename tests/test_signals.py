@@ -1,4 +1,5 @@
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.test import TestCase
 from django.test.utils import override_settings
 
@@ -6,9 +7,14 @@ from mock import call
 from mock_django.signals import mock_signal_receiver
 
 from organizations.models import Organization
+from organizations.roles import OrganizationRoles
+from organizations.roles import reset_current_roles
+from organizations.roles import set_current_roles
 from organizations.signals import owner_changed
 from organizations.signals import user_added
 from organizations.signals import user_removed
+from organizations.signals import users_added
+from organizations.signals import users_removed
 
 
 @override_settings(USE_TZ=True)
@@ -73,3 +79,93 @@ class SignalsTestCase(TestCase):
                     )
                 ],
             )
+
+    def test_batch_signals(self):
+        with mock_signal_receiver(users_added) as add_receiver:
+            org_users = self.foo.add_users([self.krist, self.duder])
+
+            self.assertEqual(
+                add_receiver.call_args_list,
+                [
+                    call(
+                        signal=users_added,
+                        sender=self.foo,
+                        users=[org_user.user for org_user in org_users],
+                        organization_users=org_users,
+                    )
+                ],
+            )
+
+        with mock_signal_receiver(users_removed) as remove_receiver:
+            self.foo.remove_user(self.krist)
+
+            self.assertEqual(remove_receiver.call_count, 1)
+            self.assertEqual(remove_receiver.call_args.kwargs["users"], [self.krist])
+
+
+@override_settings(USE_TZ=True, ORGS_DEFER_SIGNALS=True)
+class DeferredSignalsTestCase(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.krist = User.objects.get(username="krist")
+        self.duder = User.objects.get(username="duder")
+        self.foo = Organization.objects.get(name="Foo Fighters")
+
+    def test_sent_on_commit(self):
+        with mock_signal_receiver(user_added) as add_receiver:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.foo.add_user(self.krist)
+                self.assertEqual(add_receiver.call_count, 0)
+            self.assertEqual(add_receiver.call_count, 0)
+            for callback in callbacks:
+                callback()
+            self.assertEqual(
+                add_receiver.call_args_list,
+                [call(signal=user_added, sender=self.foo, user=self.krist)],
+            )
+
+    def test_coalesced(self):
+        with mock_signal_receiver(users_added) as add_receiver:
+            with self.captureOnCommitCallbacks(execute=True):
+                krist = self.foo.add_user(self.krist)
+                duder = self.foo.add_user(self.duder)
+
+            self.assertEqual(
+                add_receiver.call_args_list,
+                [
+                    call(
+                        signal=users_added,
+                        sender=self.foo,
+                        users=[self.krist, self.duder],
+                        organization_users=[krist, duder],
+                    )
+                ],
+            )
+
+    def test_not_sent_on_rollback(self):
+        with mock_signal_receiver(user_added) as add_receiver:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        self.foo.add_user(self.krist)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                self.foo.add_user(self.duder)
+
+            self.assertEqual(
+                add_receiver.call_args_list,
+                [call(signal=user_added, sender=self.foo, user=self.duder)],
+            )
+        self.assertFalse(self.foo.is_member(self.krist))
+
+    def test_memberships_current_before_commit(self):
+        token = set_current_roles(OrganizationRoles(self.krist))
+        try:
+            self.assertFalse(self.foo.is_member(self.krist))
+            with self.captureOnCommitCallbacks():
+                self.foo.add_users([self.krist])
+                self.assertTrue(self.foo.is_member(self.krist))
+        finally:
+            reset_current_roles(token)
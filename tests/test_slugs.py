@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from mock import patch
+
+from organizations.models import Organization
+from organizations.slugs import available_slug
+from organizations.slugs import taken_slugs
+from test_abstract.models import CustomOrganization
+from test_custom.models import Team
+
+
+@override_settings(USE_TZ=True)
+class SlugAllocationTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def test_single_query_allocation(self):
+        for i in range(5):
+            Organization.objects.create(name="Acme")
+        # Savepoint, slug prefix query, insert, savepoint release
+        with self.assertNumQueries(4):
+            org = Organization.objects.create(name="Acme")
+        self.assertEqual(org.slug, "acme-6")
+        self.assertEqual(Organization.objects.create(name="Nirvana").slug, "nirvana-2")
+
+    def test_prefix_matches_are_not_candidates(self):
+        Organization.objects.create(name="Acme Corp")
+        self.assertEqual(Organization.objects.create(name="Acme").slug, "acme")
+
+    def test_only_candidates_are_read(self):
+        for slug in ["acme", "acme-2", "acme-corp", "acme-corp-2", "acmes"]:
+            Organization.objects.create(name=slug, slug=slug)
+        field = Organization._meta.get_field("slug")
+        self.assertEqual(
+            {"acme", "acme-2"}, taken_slugs(Organization.objects.all(), field, ["acme"])
+        )
+
+    def test_long_names(self):
+        name = "x" * 250
+        first = Organization.objects.create(name=name)
+        second = Organization.objects.create(name=name)
+        self.assertEqual(len(first.slug), 200)
+        self.assertEqual(second.slug, "x" * 198 + "-2")
+
+    def test_other_models(self):
+        CustomOrganization.objects.create(name="Acme")
+        self.assertEqual(CustomOrganization.objects.create(name="Acme").slug, "acme-2")
+        Organization.objects.create(name="Team")
+        self.assertEqual(Team.objects.create(name="Team").slug, "team-2")
+
+    def test_retries_slug_race(self):
+        Organization.objects.create(name="Acme")
+        # Simulate a concurrent insert of the slug after the slug was found free
+        with patch("organizations.slugs.taken_slugs", return_value=set()):
+            org = Organization.objects.create(name="Acme")
+        self.assertEqual(org.slug, "acme-2")
+
+    def test_available_slug(self):
+        self.assertEqual(available_slug(Organization, "Nirvana"), "nirvana-2")
+        self.assertEqual(available_slug(Organization, "Pearl Jam"), "pearl-jam")
+
+
+@override_settings(USE_TZ=True)
+class SlugAvailabilityViewTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("organization_slug_availability")
+        self.client.force_login(User.objects.get(username="dave"))
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(302, self.client.get(self.url, {"slug": "acme"}).status_code)
+
+    def test_taken_slug(self):
+        response = self.client.get(self.url, {"slug": "nirvana"})
+        self.assertEqual(
+            response.json(),
+            {"slug": "nirvana", "available": False, "suggestion": "nirvana-2"},
+        )
+
+    def test_available_name(self):
+        response = self.client.get(self.url, {"name": "Pearl Jam"})
+        self.assertEqual(
+            response.json(),
+            {"slug": "pearl-jam", "available": True, "suggestion": "pearl-jam"},
+        )
+
+    def test_cached(self):
+        self.client.get(self.url, {"slug": "nirvana"})
+        with patch("organizations.views.base.available_slug") as available:
+            response = self.client.get(self.url, {"slug": "nirvana"})
+        available.assert_not_called()
+        self.assertFalse(response.json()["available"])
+
+    def test_missing_slug(self):
+        self.assertEqual(400, self.client.get(self.url).status_code)
@@ -2,6 +2,7 @@ from django.contrib.auth.models import User
 from django.template import Context
 from django.template import Template
 from django.test import TestCase
+from django.test.client import RequestFactory
 from django.test.utils import override_settings
 
 from organizations.models import Organization
@@ -26,6 +27,30 @@ class TestTagsAndFilters(TestCase):
         self.assertIn("Kurt", out)
         self.assertIn("Dave", out)
 
+    def test_paginated_organization_users_tag(self):
+        template = Template(
+            "{% load org_tags %}" "{% organization_users organization per_page=2 %}"
+        )
+        out = template.render(Context({"organization": self.nirvana}))
+        self.assertIn("Dave", out)
+        self.assertNotIn("Kurt", out)
+
+        cursor = out.split("?after=")[1].split('"')[0]
+        request = RequestFactory().get("/", {"q": "k", "after": cursor})
+        out = template.render(
+            Context({"organization": self.nirvana, "request": request})
+        )
+        self.assertIn("Kurt", out)
+        self.assertNotIn("Dave", out)
+        self.assertIn("?q=k&amp;before=", out)
+
+    def test_page_query_tag(self):
+        request = RequestFactory().get("/", {"q": "k", "page": "2", "after": "x"})
+        out = Template(
+            "{% load org_tags %}" "{% page_query before=cursor %}"
+        ).render(Context({"request": request, "cursor": "y"}))
+        self.assertEqual("q=k&amp;before=y", out)
+
     def test_is_owner_org_filter(self):
         self.context = {"organization": self.nirvana, "user": self.kurt}
         out = Template(
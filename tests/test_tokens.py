@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core import signing
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from organizations import tokens
+from organizations.backends.defaults import InvitationBackend
+from organizations.backends.modeled import ModelInvitation
+from organizations.models import Organization
+from organizations.utils import create_organization
+from test_accounts.models import Account
+from test_accounts.models import AccountInvitation
+
+
+class TokenTests(TestCase):
+    def test_round_trip(self):
+        expires = timezone.now() + timedelta(hours=1)
+        token = tokens.make_token(tokens.INVITATION, 12, 3, expires, "value")
+        self.assertEqual(
+            tokens.SignedToken(12, 3, int(expires.timestamp()), "value"),
+            tokens.read_token(tokens.INVITATION, token),
+        )
+
+    def test_bad_tokens(self):
+        token = tokens.make_token(tokens.INVITATION, 12, 3)
+        with self.assertRaises(signing.BadSignature):
+            tokens.read_token(tokens.INVITATION, token[:-1])
+        with self.assertRaises(signing.BadSignature):
+            tokens.read_token(tokens.INVITATION, "garbage")
+        with self.assertRaises(signing.BadSignature):
+            tokens.read_token(tokens.USER, token)
+
+        expired = tokens.make_token(
+            tokens.INVITATION, 12, 3, timezone.now() - timedelta(seconds=1)
+        )
+        with self.assertRaises(signing.SignatureExpired):
+            tokens.read_token(tokens.INVITATION, expired)
+
+
+@override_settings(USE_TZ=True, ORGS_SIGNED_INVITATION_LINKS=True)
+class SignedModelInvitationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="AccountUser", email="a@example.com")
+        self.account = create_organization(self.user, "Acme", org_model=Account)
+        self.backend = ModelInvitation(org_model=Account)
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    def test_signed_link(self):
+        invitation = self.backend.invite_by_email(
+            "bob@example.com", user=self.user, organization=self.account
+        )
+        url = self.backend.get_invitation_url(invitation)
+        self.assertNotIn(str(invitation.guid), url)
+        self.assertIn(url, mail.outbox[0].body)
+        self.assertEqual(200, self.client.get(url).status_code)
+        # Links by GUID keep working
+        self.assertEqual(
+            200, self.client.get(invitation.get_absolute_url()).status_code
+        )
+
+    def test_invite_many_signed_links(self):
+        result = self.backend.invite_many(
+            ["bob@example.com", "jo@example.com"],
+            user=self.user,
+            organization=self.account,
+        )
+        self.assertEqual(2, len(mail.outbox))
+        for invitation, message in zip(result.invitations, mail.outbox):
+            url = self.backend.get_invitation_url(invitation)
+            self.assertNotIn(str(invitation.guid), url)
+            self.assertIn(url, message.body)
+            self.assertEqual(200, self.client.get(url).status_code)
+
+    def test_bad_links_are_rejected_without_queries(self):
+        invitation = AccountInvitation.objects.create(
+            invitee_identifier="bob@example.com",
+            invited_by=self.user,
+            organization=self.account,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        expired = tokens.make_token(
+            tokens.INVITATION, invitation.pk, self.account.pk, invitation.expires_at
+        )
+        for token in ("garbage", expired):
+            with self.assertNumQueries(0), self.assertRaises(Http404):
+                self.backend.token_activation_router(self.request, token)
+
+    def test_valid_link_is_loaded_by_primary_key(self):
+        invitation = AccountInvitation.objects.create(
+            invitee_identifier="bob@example.com",
+            invited_by=self.user,
+            organization=self.account,
+        )
+        token = tokens.make_token(tokens.INVITATION, invitation.pk, self.account.pk)
+        with self.assertNumQueries(1):
+            response = self.backend.token_activation_router(self.request, token)
+        self.assertEqual(200, response.status_code)
+
+        other = tokens.make_token(tokens.INVITATION, invitation.pk, 0)
+        with self.assertRaises(Http404):
+            self.backend.token_activation_router(self.request, other)
+
+
+@override_settings(USE_TZ=True, ORGS_SIGNED_INVITATION_LINKS=True)
+class SignedUserInvitationTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.backend = InvitationBackend()
+        self.user = User.objects.create_user(
+            "inactive", email="inactive@example.com", is_active=False
+        )
+        self.nirvana = Organization.objects.get(name="Nirvana")
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    def test_signed_token(self):
+        token = self.backend.get_token(self.user, organization=self.nirvana)
+        signed = tokens.read_token(tokens.USER, token)
+        self.assertEqual((self.user.pk, self.nirvana.pk), signed[:2])
+        response = self.backend.activate_view(self.request, self.user.pk, token)
+        self.assertEqual(200, response.status_code)
+
+    def test_bad_tokens_are_rejected_without_queries(self):
+        token = self.backend.get_token(self.user)
+        for user_id, bad_token in ((self.user.pk, "garbage"), (0, token)):
+            with self.assertNumQueries(0), self.assertRaises(Http404):
+                self.backend.activate_view(self.request, user_id, bad_token)
+
+    def test_invitation_email(self):
+        self.backend.send_invitation(self.user, organization=self.nirvana)
+        self.assertEqual(1, len(mail.outbox))
+        path = mail.outbox[0].body.split("/invite/")[1].split()[0]
+        token = path.rstrip("/").split("-", 1)[1]
+        self.assertEqual(self.user.pk, tokens.read_token(tokens.USER, token).pk)
@@ -1,14 +1,20 @@
 from functools import partial
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
 from django.test.utils import override_settings
 
+from mock import patch
+
 from organizations.models import Organization
+from organizations.models import OrganizationOwner
 from organizations.utils import create_organization
+from organizations.utils import create_organizations
 from organizations.utils import model_field_attr
 from test_abstract.models import CustomOrganization
 from test_accounts.models import Account
+from test_custom.models import Team
 
 
 @override_settings(USE_TZ=True)
@@ -67,6 +73,78 @@ class CreateOrgTests(TestCase):
         self.assertTrue(isinstance(custom, Account))
 
 
+@override_settings(USE_TZ=True)
+class CreateOrgsTests(TestCase):
+    fixtures = ["users.json", "orgs.json"]
+
+    def setUp(self):
+        self.users = list(User.objects.order_by("pk"))
+
+    def specs(self, *names):
+        return [
+            {"user": self.users[i % len(self.users)], "name": name}
+            for i, name in enumerate(names)
+        ]
+
+    def test_create_organizations(self):
+        orgs = create_organizations(self.specs("Acme", "Acme", "Nirvana"))
+        self.assertEqual([org.slug for org in orgs], ["acme", "acme-2", "nirvana-2"])
+        for org, user in zip(orgs, self.users):
+            org.refresh_from_db()
+            self.assertEqual(org.owner.organization_user.user, user)
+            self.assertTrue(org.owner.organization_user.is_admin)
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(6):
+            create_organizations(self.specs("One", "Two"))
+        with self.assertNumQueries(6):
+            create_organizations(self.specs(*["Org {}".format(i) for i in range(50)]))
+
+    def test_defaults(self):
+        (org,) = create_organizations(
+            [
+                {
+                    "user": self.users[0],
+                    "name": "Given",
+                    "slug": "given-slug",
+                    "is_active": False,
+                    "org_user_defaults": {"is_admin": False},
+                }
+            ]
+        )
+        org.refresh_from_db()
+        self.assertEqual(org.slug, "given-slug")
+        self.assertFalse(org.is_active)
+        self.assertFalse(org.owner.organization_user.is_admin)
+
+    def test_without_returned_primary_keys(self):
+        with patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ):
+            orgs = create_organizations(self.specs("Acme", "Beta"))
+            accounts = create_organizations(self.specs("Acme", "Beta"), model=Account)
+        for org in orgs + accounts:
+            self.assertTrue(org.pk)
+            self.assertEqual(org.owner.organization_user.organization, org)
+
+    def test_custom_models(self):
+        customs = create_organizations(
+            self.specs("Custom", "Custom"), model=CustomOrganization
+        )
+        self.assertEqual([org.slug for org in customs], ["custom", "custom-2"])
+        accounts = create_organizations(self.specs("Account"), model=Account)
+        self.assertEqual(accounts[0].owner.organization_user.user, self.users[0])
+        teams = create_organizations(self.specs("Team"), model=Team)
+        self.assertTrue(isinstance(teams[0], Team))
+        self.assertTrue(
+            OrganizationOwner.objects.filter(organization=teams[0]).exists()
+        )
+
+    def test_no_specs(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(create_organizations([]), [])
+
+
 class AttributeUtilTests(TestCase):
     def test_present_field(self):
         self.assertTrue(model_field_attr(User, "username", "max_length"))
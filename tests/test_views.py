@@ -256,6 +256,80 @@ class TestBasicOrgViews(TestCase):
             .status_code,
         )
 
+    def test_org_list_pagination(self):
+        class OrgList(base.BaseOrganizationList):
+            paginate_by = 1
+
+        response = OrgList.as_view()(self.dave_request)
+        page = response.context_data["page_obj"]
+        self.assertEqual(["Foo Fighters"], [o.name for o in page.object_list])
+        self.assertTrue(response.context_data["is_paginated"])
+
+        request = request_factory_login(
+            self.factory,
+            self.dave,
+            path="/",
+            method="get",
+            data={"after": page.next_cursor},
+        )
+        response = OrgList.as_view()(request)
+        organizations = response.context_data["organizations"]
+        self.assertEqual(["Nirvana"], [o.name for o in organizations])
+        self.assertFalse(response.context_data["page_obj"].has_next())
+
+        request = request_factory_login(
+            self.factory, self.dave, path="/", method="get", data={"after": "garbage"}
+        )
+        self.assertRaises(Http404, OrgList.as_view(), request)
+
+    def test_user_list_pagination(self):
+        class UserList(base.BaseOrganizationUserList):
+            paginate_by = 2
+
+        kwargs = {"organization_pk": self.nirvana.pk}
+        response = UserList.as_view()(self.kurt_request, **kwargs)
+        self.assertEqual(
+            [self.dave, User.objects.get(username="krist")],
+            [o.user for o in response.context_data["organization_users"]],
+        )
+        cursor = response.context_data["page_obj"].next_cursor
+        request = request_factory_login(
+            self.factory, self.kurt, path="/", method="get", data={"after": cursor}
+        )
+        response = UserList.as_view()(request, **kwargs)
+        self.assertEqual(
+            [self.kurt], [o.user for o in response.context_data["organization_users"]]
+        )
+        response.render()
+        self.assertIn("?before=", response.content.decode())
+
+        UserList.page_numbers = True
+        request = request_factory_login(
+            self.factory, self.kurt, path="/", method="get", data={"page": 2}
+        )
+        response = UserList.as_view()(request, **kwargs)
+        self.assertEqual(2, response.context_data["page_obj"].number)
+        self.assertEqual(
+            [self.kurt], [o.user for o in response.context_data["organization_users"]]
+        )
+
+    def test_user_list_search(self):
+        kwargs = {"organization_pk": self.nirvana.pk}
+        for query, usernames in [
+            ("k", ["krist", "kurt"]),
+            ("KURT@", ["kurt"]),
+            ("nirvana", []),
+        ]:
+            request = request_factory_login(
+                self.factory, self.kurt, path="/", method="get", data={"q": query}
+            )
+            response = base.BaseOrganizationUserList.as_view()(request, **kwargs)
+            self.assertEqual(
+                usernames,
+                [o.user.username for o in response.context_data["organization_users"]],
+            )
+            self.assertEqual(query, response.context_data["search_query"])
+
     def test_user_detail(self):
         kwargs = {"organization_pk": self.nirvana.pk, "user_pk": self.kurt.pk}
         self.assertEqual(